@@ -0,0 +1,53 @@
+import argparse
+import time
+from importlib.resources import files
+
+from cyberwheel.network.network_base import Network
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compile a network config into a binary snapshot that Network.load_snapshot() can load quickly."
+    )
+    parser.add_argument(
+        "--network-config",
+        help="Input the network config filename",
+        type=str,
+        default="15-host-network.yaml",
+    )
+    parser.add_argument(
+        "--host-config",
+        help="Input the host config filename",
+        type=str,
+        default="host_defs_services.yaml",
+    )
+    parser.add_argument(
+        "--output",
+        help="Path to write the snapshot to. Defaults to snapshots/<network-config>.snapshot",
+        type=str,
+        default=None,
+    )
+    return parser.parse_args()
+
+
+def compile_network():
+    """
+    Builds the network from its YAML config once and stores it as a snapshot.
+    Training and evaluation load the snapshot instead of re-parsing the YAML,
+    and rebuild it automatically when any of the config files change.
+    """
+    args = parse_args()
+    network_config = files("cyberwheel.resources.configs.network").joinpath(
+        args.network_config
+    )
+
+    print(f"Compiling network: {args.network_config} ...")
+    start = time.time()
+    snapshot_path = Network.compile_snapshot(
+        network_config, args.host_config, args.output
+    )
+    print(f"Wrote {snapshot_path} in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    compile_network()
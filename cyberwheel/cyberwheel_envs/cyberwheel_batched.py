@@ -0,0 +1,127 @@
+from importlib.resources import files
+from typing import Any, Iterable
+
+import numpy as np
+from gymnasium.vector import VectorEnv
+
+from .cyberwheel_dynamic import DynamicCyberwheel
+from cyberwheel.network.network_base import Network
+from cyberwheel.observation import HistoryObservation
+from cyberwheel.profiling import PROFILER
+
+
+class BatchedDynamicCyberwheel(VectorEnv):
+    """
+    Runs num_envs DynamicCyberwheel episodes in one process as a single
+    vector environment.
+
+    All episodes fork one Network, so the topology, host types and services
+    exist once in memory and each episode only owns its dynamic state (see
+    Network.fork). Every episode writes its observation straight into a row
+    of one stacked float32 array, and rewards, terminations and truncations
+    go into preallocated arrays. This avoids the per-step concatenate/copy
+    of SyncVectorEnv and the pipe pickling of AsyncVectorEnv.
+
+    Each step runs the agents, detector and reward of every episode (see
+    DynamicCyberwheel.transition), then converts all episodes' alerts into
+    the stacked observation array in one pass
+    (HistoryObservation.create_obs_batch) instead of one vector per episode.
+
+    The arrays returned by reset() and step() are reused and overwritten by
+    the next call; copy them if they need to outlive it.
+    """
+
+    def __init__(self, num_envs: int, network: Network | None = None, **env_kwargs):
+        """
+        :param int num_envs: number of episodes to run side by side
+        :param Network network: network the episodes fork. If not passed, it is
+            loaded from env_kwargs['network_config'].
+        :param **env_kwargs: keyword arguments passed to every DynamicCyberwheel
+        """
+        if network is None:
+            network = Network.load_snapshot(
+                files("cyberwheel.resources.configs.network").joinpath(
+                    env_kwargs.get("network_config", "15-host-network.yaml")
+                )
+            )
+        env_kwargs.pop("network", None)
+        env_kwargs.pop("obs_buffer", None)
+
+        self.observations = np.zeros(
+            (num_envs, 2 * network.num_hosts()), dtype=np.float32
+        )
+        self.envs = [
+            DynamicCyberwheel(
+                network=network.fork(), obs_buffer=self.observations[i], **env_kwargs
+            )
+            for i in range(num_envs)
+        ]
+        super().__init__(
+            num_envs, self.envs[0].observation_space, self.envs[0].action_space
+        )
+        self.rewards = np.zeros(num_envs, dtype=np.float64)
+        self.terminateds = np.zeros(num_envs, dtype=bool)
+        self.truncateds = np.zeros(num_envs, dtype=bool)
+        self._actions = None
+
+    def reset_wait(
+        self,
+        seed: int | list[int] | None = None,
+        options: dict | None = None,
+    ) -> tuple[np.ndarray, dict]:
+        if seed is None or isinstance(seed, int):
+            seed = [None if seed is None else seed + i for i in range(self.num_envs)]
+        infos = {}
+        for i, (env, env_seed) in enumerate(zip(self.envs, seed)):
+            _, info = env.reset(seed=env_seed, options=options)
+            infos = self._add_info(infos, info, i)
+        return self.observations, infos
+
+    def step_async(self, actions: Iterable) -> None:
+        self._actions = actions
+
+    def step_wait(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        alert_indices, step_infos = [], []
+        for i, (env, action) in enumerate(zip(self.envs, self._actions)):
+            alerts, self.rewards[i], self.terminateds[i], info = env.transition(action)
+            alert_indices.append(env.alert_converter.alert_indices(alerts))
+            step_infos.append(info)
+        self.truncateds[:] = False
+        with PROFILER.timer("step/observation"):
+            HistoryObservation.create_obs_batch(self.observations, alert_indices)
+
+        infos = {}
+        for i, (env, info) in enumerate(zip(self.envs, step_infos)):
+            if self.terminateds[i] or self.truncateds[i]:
+                # autoreset overwrites the row, keep the final observation
+                final_info = info
+                final_observation = self.observations[i].copy()
+                _, info = env.reset()
+                info["final_observation"] = final_observation
+                info["final_info"] = final_info
+            if info:
+                infos = self._add_info(infos, info, i)
+        return (
+            self.observations,
+            self.rewards,
+            self.terminateds,
+            self.truncateds,
+            infos,
+        )
+
+    def call(self, name: str, *args, **kwargs) -> tuple[Any, ...]:
+        results = []
+        for env in self.envs:
+            attr = getattr(env, name)
+            results.append(attr(*args, **kwargs) if callable(attr) else attr)
+        return tuple(results)
+
+    def set_attr(self, name: str, values) -> None:
+        if not isinstance(values, (list, tuple)):
+            values = [values] * self.num_envs
+        for env, value in zip(self.envs, values):
+            setattr(env, name, value)
+
+    def close_extras(self, **kwargs) -> None:
+        for env in self.envs:
+            env.close()
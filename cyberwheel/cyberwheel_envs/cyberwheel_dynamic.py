@@ -1,9 +1,11 @@
 import copy
+import csv
 from importlib.resources import files
 import os
 import random
 from gymnasium import spaces
 import gymnasium as gym
+import numpy as np
 from typing import Dict, Iterable, List
 import yaml
 
@@ -12,8 +14,10 @@ from cyberwheel.blue_agents import DynamicBlueAgent
 from cyberwheel.observation import HistoryObservation
 from cyberwheel.detectors.alert import Alert
 from cyberwheel.detectors.handler import DetectorHandler
+from cyberwheel.network.command import CommandLog, CommandSink
 from cyberwheel.network.network_base import Network
 from cyberwheel.network.host import Host
+from cyberwheel.profiling import PROFILER
 from cyberwheel.red_agents import ARTAgent
 from cyberwheel.red_agents.strategies import ServerDowntime
 from cyberwheel.reward import DecoyReward, StepDetectedReward
@@ -140,6 +144,22 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
               behavior by providing stored seeds for reproducibility across different runs.
             - Default: "runs/seed_log.txt"
 
+        * `obs_buffer`: optional
+            - A preallocated float32 array of shape (2 * num_hosts,) that observations are written into in place,
+              e.g. one row of a batched observation array. step() and reset() return this buffer.
+            - Default: None
+
+        * `command_history_size`: optional
+            - How many of the commands run on hosts (e.g. by atomic tests) to keep per episode. None keeps all of them,
+              a positive number keeps the most recent ones and 0 only counts them. Nothing in the environment reads
+              the commands, so training can use 0.
+            - Default: None
+
+        * `command_log_file`: optional
+            - Path of a CSV file that every command run on a host is streamed to as it happens, with its episode,
+              step, host, executor and privilege. Independent of `command_history_size`.
+            - Default: None
+
         """
         network_conf_file = files("cyberwheel.resources.configs.network").joinpath(
             network_config
@@ -166,11 +186,23 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
 
         self.decoy_types = list(self.decoy_info.keys())
 
-        num_hosts = len(self.network.get_hosts())
+        self.episode = -1  # incremented by reset(), so the first episode is 0
+        self._command_log_fp = None
+        command_log_file = kwargs.get("command_log_file")
+        self.network.set_command_log(
+            CommandLog(
+                kwargs.get("command_history_size"),
+                sink=self._open_command_log(command_log_file) if command_log_file else None,
+            )
+        )
+
+        num_hosts = self.network.num_hosts()
 
-        self.observation_space = spaces.Box(0, 1, shape=(2 * num_hosts,), dtype=float)
+        self.observation_space = spaces.Box(0, 1, shape=(2 * num_hosts,), dtype=np.float32)
         self.alert_converter = HistoryObservation(
-            self.observation_space.shape, host_to_index_mapping(self.network)
+            self.observation_space.shape,
+            host_to_index_mapping(self.network),
+            out=kwargs.get("obs_buffer"),
         )
         self.red_agent_choice = red_agent
         self.service_mapping = service_mapping
@@ -179,6 +211,7 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
 
         self.deterministic = deterministic
         self.seed_log = []  # List to track generated seeds for reproducibility  
+        self.episode_seed = None  # seed of the current episode, taken from the seed log
         self.seed_file = seed_file
 
         if self.deterministic:
@@ -217,11 +250,33 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
         4. Convert Alerts from Detector into observation space
         5. Return obs and related metadata
         """
-        blue_agent_result = self.blue_agent.act(action)
+        alerts, reward, done, info = self.transition(action)
+        with PROFILER.timer("step/observation"):
+            obs_vec = self._get_obs(alerts)
+        return (
+            obs_vec,
+            reward,
+            done,
+            False,
+            info,
+        )
+
+    def transition(self, action):
+        """
+        Runs every stage of step() except building the observation, and
+        returns the step's alerts instead. Lets BatchedDynamicCyberwheel
+        convert the alerts of all its episodes in one pass.
+
+        :param action: blue agent action
+        :return: (alerts, reward, done, info)
+        """
+        with PROFILER.timer("step/blue_action"):
+            blue_agent_result = self.blue_agent.act(action)
         self.reward_calculator.handle_blue_action_output(blue_agent_result.name, blue_agent_result.id, blue_agent_result.success, blue_agent_result.recurring)
-        red_action_name = (
-            self.red_agent.act().get_name()
-        )  # red_action includes action, and target of action
+        with PROFILER.timer("step/red_action"):
+            red_action_name = (
+                self.red_agent.act().get_name()
+            )  # red_action includes action, and target of action
         action_metadata = self.red_agent.history.history[-1]
 
         red_action_type = action_metadata["action"]
@@ -235,17 +290,18 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
             self.red_agent.history.recent_history()
         )
 
-        alerts = self.detector.obs([red_action_result.detector_alert])
-        obs_vec = self._get_obs(alerts)
-        
-        if self.reward_function == "step_detected":
-            reward = self.reward_calculator.calculate_reward(
-                blue_agent_result.name, blue_agent_result.success, self.red_agent.history.mapping[red_action_dst].decoy, self.current_step
-            )
-        else:
-            reward = self.reward_calculator.calculate_reward(
-                red_action_name, blue_agent_result.name, red_action_success, blue_agent_result.success, self.red_agent.history.mapping[red_action_dst].decoy
-            )
+        with PROFILER.timer("step/detector"):
+            alerts = self.detector.obs([red_action_result.detector_alert])
+
+        with PROFILER.timer("step/reward"):
+            if self.reward_function == "step_detected":
+                reward = self.reward_calculator.calculate_reward(
+                    blue_agent_result.name, blue_agent_result.success, self.red_agent.history.mapping[red_action_dst].decoy, self.current_step
+                )
+            else:
+                reward = self.reward_calculator.calculate_reward(
+                    red_action_name, blue_agent_result.name, red_action_success, blue_agent_result.success, self.red_agent.history.mapping[red_action_dst].decoy
+                )
         self.total += reward
 
         done = self.current_step >= self.max_steps
@@ -264,13 +320,29 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
                 "killchain": self.red_agent.killchain,
             }
         self.detector.reset()
-        return (
-            obs_vec,
-            reward,
-            done,
-            False,
-            info,
-        )
+        return alerts, reward, done, info
+
+    def drain_profile(self) -> Dict[str, List[float]]:
+        """
+        Returns and clears this process's profiling samples. Lets the training
+        loop collect timings from envs running in subprocesses via envs.call().
+        """
+        return PROFILER.drain()
+
+    def _open_command_log(self, path) -> CommandSink:
+        """
+        Opens the CSV file commands are streamed to and returns the CommandLog
+        sink that writes them
+        """
+        self._command_log_fp = open(path, "w", newline="")
+        writer = csv.writer(self._command_log_fp)
+        writer.writerow(["episode", "step", "host", "executor", "command", "privilege"])
+
+        def sink(host_id: int, executor: str, content: str, privilege: str) -> None:
+            host = self.network.get_host_by_id(host_id)
+            writer.writerow([self.episode, self.current_step, host.name, executor, content, privilege])
+
+        return sink
 
     def _get_obs(self, alerts: List[Alert]) -> Iterable:
         return self.alert_converter.create_obs_vector(alerts)
@@ -296,6 +368,7 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
             self.seed_log.append(seed)
             self.save_seeds_to_file()
 
+        self.episode_seed = seed
         random.seed(seed)
         return self.network.get_random_user_host()
     
@@ -321,20 +394,25 @@ class DynamicCyberwheel(gym.Env, Cyberwheel):
     def reset(self, seed=None, options=None):
         self.total = 0
         self.current_step = 0
+        self.episode += 1
         self.network.reset()
 
         self.red_agent.reset(
             self._get_random_user_host(), network=self.network
         )
+        # Seed the detectors from the reset seed, or from the episode seed of
+        # the seed log, without drawing from `random` so the red and blue
+        # agents' draws still line up with existing seed logs
+        self.detector.reseed(self.episode_seed if seed is None else seed)
 
         self.blue_agent.reset()
-        
-        self.alert_converter = HistoryObservation(
-            self.observation_space.shape, host_to_index_mapping(self.network)
-        )
+
+        # network.reset() removes decoys, so the host -> index mapping is unchanged
         self.reward_calculator.reset()
         return self._reset_obs(), {}
 
     # if you open any other processes close them here
     def close(self):
-        pass
+        if self._command_log_fp is not None:
+            self._command_log_fp.close()
+            self._command_log_fp = None
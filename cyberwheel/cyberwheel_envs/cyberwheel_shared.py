@@ -0,0 +1,257 @@
+import multiprocessing as mp
+import traceback
+from importlib.resources import files
+from typing import Any, Iterable
+
+import numpy as np
+from gymnasium.vector import VectorEnv
+
+from .cyberwheel_dynamic import DynamicCyberwheel
+from cyberwheel.network.network_base import Network
+
+
+def _load_network(env_kwargs: dict) -> Network:
+    return Network.load_snapshot(
+        files("cyberwheel.resources.configs.network").joinpath(
+            env_kwargs.get("network_config", "15-host-network.yaml")
+        )
+    )
+
+
+class _SharedBuffers:
+    """
+    NumPy views over the shared-memory arrays the parent and workers exchange
+    step data through. Only the raw arrays are sent to workers, each side
+    builds its own views.
+    """
+
+    def __init__(self, raw: dict, num_envs: int, obs_size: int):
+        self.raw = raw
+        self.observations = np.frombuffer(raw["observations"], dtype=np.float32).reshape(num_envs, obs_size)
+        self.final_observations = np.frombuffer(raw["final_observations"], dtype=np.float32).reshape(num_envs, obs_size)
+        self.actions = np.frombuffer(raw["actions"], dtype=np.int64)
+        self.rewards = np.frombuffer(raw["rewards"], dtype=np.float64)
+        self.terminateds = np.frombuffer(raw["terminateds"], dtype=np.bool_)
+        self.truncateds = np.frombuffer(raw["truncateds"], dtype=np.bool_)
+
+    @classmethod
+    def allocate(cls, ctx, num_envs: int, obs_size: int) -> "_SharedBuffers":
+        raw = {
+            "observations": ctx.RawArray("f", num_envs * obs_size),
+            "final_observations": ctx.RawArray("f", num_envs * obs_size),
+            "actions": ctx.RawArray("q", num_envs),
+            "rewards": ctx.RawArray("d", num_envs),
+            "terminateds": ctx.RawArray("b", num_envs),
+            "truncateds": ctx.RawArray("b", num_envs),
+        }
+        return cls(raw, num_envs, obs_size)
+
+
+def _worker(index, pipe, parent_pipe, raw_buffers, num_envs, obs_size, network, env_kwargs, forward_info):
+    """
+    Runs one DynamicCyberwheel in a subprocess. The environment writes its
+    observations straight into its row of the shared observation array, and
+    step results go into the shared arrays. Only short commands and acks (plus
+    infos if forward_info is set) travel through the pipe.
+    """
+    parent_pipe.close()
+    buffers = _SharedBuffers(raw_buffers, num_envs, obs_size)
+    env = None
+    try:
+        if network is None:
+            network = _load_network(env_kwargs)
+        env = DynamicCyberwheel(
+            network=network.fork(), obs_buffer=buffers.observations[index], **env_kwargs
+        )
+        pipe.send((True, (env.observation_space, env.action_space)))
+        while True:
+            command, data = pipe.recv()
+            if command == "step":
+                _, reward, terminated, truncated, info = env.step(buffers.actions[index])
+                buffers.rewards[index] = reward
+                buffers.terminateds[index] = terminated
+                buffers.truncateds[index] = truncated
+                if terminated or truncated:
+                    # autoreset overwrites the row, keep the final observation
+                    buffers.final_observations[index] = buffers.observations[index]
+                    _, reset_info = env.reset()
+                    info = {**reset_info, "final_info": info} if forward_info else None
+                pipe.send((True, info if forward_info else None))
+            elif command == "reset":
+                seed, options = data
+                _, info = env.reset(seed=seed, options=options)
+                pipe.send((True, info if forward_info else None))
+            elif command == "call":
+                name, args, kwargs = data
+                attr = getattr(env, name)
+                pipe.send((True, attr(*args, **kwargs) if callable(attr) else attr))
+            elif command == "setattr":
+                name, value = data
+                setattr(env, name, value)
+                pipe.send((True, None))
+            elif command == "close":
+                pipe.send((True, None))
+                break
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        pipe.send((False, traceback.format_exc()))
+    finally:
+        if env is not None:
+            env.close()
+        pipe.close()
+
+
+class SharedMemoryDynamicCyberwheel(VectorEnv):
+    """
+    Runs num_envs DynamicCyberwheel environments in worker processes that
+    exchange observations, actions, rewards and terminations through
+    shared-memory NumPy arrays instead of pickling them through pipes.
+
+    Each worker builds its environment once from a fork of `network`. With the
+    default 'fork' start method the network is inherited from the parent
+    without being serialized; otherwise workers load it from its compiled
+    snapshot. Environment infos (which in evaluation mode carry the whole
+    network and red agent history) are dropped unless forward_info is set, so
+    the pipes only carry short commands on the hot path.
+
+    Like BatchedDynamicCyberwheel, the arrays returned by reset() and step()
+    are reused and overwritten by the next call.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        network: Network | None = None,
+        context: str | None = None,
+        forward_info: bool = False,
+        **env_kwargs,
+    ):
+        """
+        :param int num_envs: number of worker processes/environments
+        :param Network network: network the workers fork. If not passed, it is
+            loaded from env_kwargs['network_config'].
+        :param str context: multiprocessing start method, defaults to the
+            platform default ('fork' on Linux)
+        :param bool forward_info: send the environments' info dicts back to the
+            parent on every step and reset
+        :param **env_kwargs: keyword arguments passed to every DynamicCyberwheel
+        """
+        env_kwargs.pop("obs_buffer", None)
+        ctx = mp.get_context(context)
+        if network is None:
+            network = _load_network(env_kwargs)
+            # workers can load the snapshot themselves unless they'd inherit it
+            worker_network = network if ctx.get_start_method() == "fork" else None
+        else:
+            worker_network = network
+
+        obs_size = 2 * network.num_hosts()
+        self.buffers = _SharedBuffers.allocate(ctx, num_envs, obs_size)
+        self.forward_info = forward_info
+        self.closed = False
+
+        self.parent_pipes, self.processes = [], []
+        for index in range(num_envs):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                name=f"SharedMemoryDynamicCyberwheel-{index}",
+                args=(
+                    index,
+                    child_pipe,
+                    parent_pipe,
+                    self.buffers.raw,
+                    num_envs,
+                    obs_size,
+                    worker_network,
+                    env_kwargs,
+                    forward_info,
+                ),
+                daemon=True,
+            )
+            self.parent_pipes.append(parent_pipe)
+            self.processes.append(process)
+            process.start()
+            child_pipe.close()
+
+        observation_space, action_space = self._receive()[0]
+        super().__init__(num_envs, observation_space, action_space)
+
+    def _send(self, command: str, data=None) -> None:
+        for pipe in self.parent_pipes:
+            pipe.send((command, data))
+
+    def _receive(self) -> list:
+        results = []
+        errors = []
+        for index, pipe in enumerate(self.parent_pipes):
+            success, result = pipe.recv()
+            if success:
+                results.append(result)
+            else:
+                errors.append(f"worker {index}:\n{result}")
+        if errors:
+            raise RuntimeError("\n".join(errors))
+        return results
+
+    def reset_wait(
+        self,
+        seed: int | list[int] | None = None,
+        options: dict | None = None,
+    ) -> tuple[np.ndarray, dict]:
+        if seed is None or isinstance(seed, int):
+            seed = [None if seed is None else seed + i for i in range(self.num_envs)]
+        for pipe, env_seed in zip(self.parent_pipes, seed):
+            pipe.send(("reset", (env_seed, options)))
+        infos = {}
+        for i, info in enumerate(self._receive()):
+            if info:
+                infos = self._add_info(infos, info, i)
+        return self.buffers.observations, infos
+
+    def step_async(self, actions: Iterable) -> None:
+        self.buffers.actions[:] = actions
+        self._send("step")
+
+    def step_wait(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        infos = {}
+        results = self._receive()
+        finished = np.flatnonzero(self.buffers.terminateds | self.buffers.truncateds)
+        for i in finished.tolist():
+            infos = self._add_info(
+                infos, {"final_observation": self.buffers.final_observations[i].copy()}, i
+            )
+        for i, info in enumerate(results):
+            if info:
+                infos = self._add_info(infos, info, i)
+        return (
+            self.buffers.observations,
+            self.buffers.rewards,
+            self.buffers.terminateds,
+            self.buffers.truncateds,
+            infos,
+        )
+
+    def call(self, name: str, *args, **kwargs) -> tuple[Any, ...]:
+        self._send("call", (name, args, kwargs))
+        return tuple(self._receive())
+
+    def set_attr(self, name: str, values) -> None:
+        if not isinstance(values, (list, tuple)):
+            values = [values] * self.num_envs
+        for pipe, value in zip(self.parent_pipes, values):
+            pipe.send(("setattr", (name, value)))
+        self._receive()
+
+    def close_extras(self, **kwargs) -> None:
+        for pipe, process in zip(self.parent_pipes, self.processes):
+            if process.is_alive():
+                try:
+                    pipe.send(("close", None))
+                    pipe.recv()
+                except (BrokenPipeError, EOFError):
+                    pass
+            pipe.close()
+        for process in self.processes:
+            process.join()
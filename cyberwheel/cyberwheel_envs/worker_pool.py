@@ -0,0 +1,70 @@
+import gc
+import multiprocessing as mp
+from contextlib import contextmanager
+from importlib.resources import files
+from typing import Callable, Sequence
+
+import gymnasium as gym
+from gymnasium.vector import VectorEnv
+
+from cyberwheel.network.network_base import Network
+from cyberwheel.red_agents import ARTAgent
+
+
+class ForkedWorkerPool:
+    """
+    Builds the Network and the ART service map once in the parent process and
+    starts environment workers with the 'fork' start method, so every worker
+    inherits both copy-on-write instead of receiving its own pickled copy.
+    Environments fork the shared network for their dynamic state (see
+    Network.fork), so the topology, host types and service map exist once in
+    physical memory no matter how many workers are started.
+
+    On platforms without 'fork' the default start method is used, which falls
+    back to pickling the environment factories.
+    """
+
+    def __init__(self, network_config: str, red_agent: str = "art_agent"):
+        """
+        :param str network_config: name (not filepath) of the network config
+        :param str red_agent: red agent the environments use. The service map
+            is only built for 'art_agent'.
+        """
+        self.network = Network.load_snapshot(
+            files("cyberwheel.resources.configs.network").joinpath(network_config)
+        )
+        self.service_mapping = {}
+        if red_agent == "art_agent":
+            self.service_mapping = ARTAgent.get_service_map(self.network)
+        self.context = "fork" if "fork" in mp.get_all_start_methods() else None
+
+    @contextmanager
+    def forking(self):
+        """
+        Moves every object built so far into the garbage collector's permanent
+        generation while workers are forked. Collections in the workers then
+        skip the inherited objects instead of touching (and copying) their
+        pages.
+        """
+        gc.collect()
+        gc.freeze()
+        try:
+            yield self.context
+        finally:
+            gc.unfreeze()
+
+    def vector_env(
+        self, env_fns: Sequence[Callable[[], gym.Env]], asynchronous: bool = True
+    ) -> VectorEnv:
+        """
+        Creates a vector env from env_fns. Asynchronous envs fork their workers
+        from this process.
+
+        :param env_fns: environment factories, which should fork self.network
+            when called rather than before
+        :param bool asynchronous: use AsyncVectorEnv instead of SyncVectorEnv
+        """
+        if not asynchronous:
+            return gym.vector.SyncVectorEnv(env_fns)
+        with self.forking() as context:
+            return gym.vector.AsyncVectorEnv(env_fns, context=context)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 from ipaddress import IPv4Address, IPv6Address
 from typing import Any, List, Dict, Union
-from copy import deepcopy
 from cyberwheel.network.host import Host
 from cyberwheel.network.service import Service
 from cyberwheel.red_actions.technique import Technique
@@ -9,15 +8,19 @@ IPAddress = Union[IPv4Address, IPv6Address, None]
 
 class Alert():
     FIELD_NAMES = set(['src_host', 'dst_hosts', 'services'])
+    __slots__ = ('src_host', 'techniques', 'dst_hosts', 'services', 'src_ip', 'dst_ips',
+                 'dst_ports', 'user', 'command', 'files', 'other_resources', 'os',
+                 'os_version', '_key', '_hash')
+
     def __init__(self, 
                  src_host: Union[None, Host] = None, 
-                 techniques: List[Technique]=[], 
-                 dst_hosts: List[Host] = [], 
-                 services: List[Service]=[],
+                 techniques: Union[List[Technique], None] = None, 
+                 dst_hosts: Union[List[Host], None] = None, 
+                 services: Union[List[Service], None] = None,
                  user: str="", 
                  command: str="", 
-                 files: List[Any]=[], 
-                 other_resources: Dict[str, Any]={}, 
+                 files: Union[List[Any], None] = None, 
+                 other_resources: Union[Dict[str, Any], None] = None, 
                  os: str="", 
                  os_version: str=""):
         """
@@ -42,78 +45,93 @@ class Alert():
             - other_resources: other resources used in an abnormal way that are specifically targeted by an action. I.e. a local database
             - os: the OS of the system
             - os_version: version of the OS
+
+        Lists passed in are used as is, not copied. Alerts are hashed on
+        (src host, dst hosts, services), so change those through the add_*/remove_*
+        methods, which invalidate the cached hash.
         """
         
         self.src_host = src_host
-        self.techniques = techniques 
+        self.techniques = [] if techniques is None else techniques
 
-        self.dst_hosts = dst_hosts
-        self.services = services
+        self.dst_hosts = [] if dst_hosts is None else dst_hosts
+        self.services = [] if services is None else services
 
-        if self.src_host is not None: self.src_ip = self.src_host.mac_address
-        if self.dst_hosts is not None: self.dst_ips = [h.mac_address for h in self.dst_hosts]
-        if self.services is not None: self.dst_ports = [s.port for s in self.services]
+        self.src_ip = self.src_host.mac_address if self.src_host is not None else None
+        self.dst_ips = [h.mac_address for h in self.dst_hosts]
+        self.dst_ports = [s.port for s in self.services]
 
         self.user = user
         self.command = command
-        self.files = files
-        self.other_resources = other_resources
+        self.files = [] if files is None else files
+        self.other_resources = {} if other_resources is None else other_resources
         self.os = os
         self.os_version = os_version
-
-        
+        self._key = None
+        self._hash = None
 
     def add_dst_host(self, host: Host) -> None:
         self.dst_hosts.append(host)
         self.dst_ips.append(host.mac_address)
+        self._key = None
 
     def add_src_host(self, host: Host) -> None:
         self.src_host = host
+        self.src_ip = host.mac_address
+        self._key = None
 
     def add_service(self, service: Service) -> None:
         self.services.append(service)
         self.dst_ports.append(service.port)
+        self._key = None
 
     def remove_src_host(self) -> None:
         self.src_host = None
+        self.src_ip = None
+        self._key = None
 
     def remove_dst_host(self, host: Host) -> None:
         if host in self.dst_hosts:
             self.dst_hosts.remove(host)
+            self._key = None
 
     def remove_service(self, service: Service) -> None:
         if service in self.services:
             self.services.remove(service)
+            self._key = None
 
     def add_techniques(self, techniques: List[str])-> None:
         self.techniques.extend(techniques)
 
     def to_dict(self) -> Dict:
-        d = deepcopy(self.__dict__)
-        for k in self.__dict__.keys():
-            if k not in self.FIELD_NAMES:
-                d.pop(k)
-        return d
+        # references, not copies: the hosts and services belong to the network
+        return {name: getattr(self, name) for name in self.FIELD_NAMES}
+
+    def key(self) -> tuple:
+        """
+        Returns the identity of this alert: (src host name, frozenset of dst host
+        names, frozenset of services). Services are keyed by (port, protocol,
+        version), the fields Service.__eq__ compares. Computed once and cached
+        until the alert is modified.
+        """
+        if self._key is None:
+            src_name = self.src_host.name if self.src_host is not None else None
+            services = frozenset((s.port, s.protocol, s.version) for s in self.services)
+            self._key = (src_name, frozenset(h.name for h in self.dst_hosts), services)
+            self._hash = hash(self._key)
+        return self._key
+
+    def __hash__(self) -> int:
+        if self._key is None:
+            self.key()
+        return self._hash
 
-    # TODO Check the performance on this.
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, Alert):
             return False
-        # return True # DELETE 
-        src_host = self.src_host == __value.src_host
-        dst_hosts = len(self.dst_hosts) == len(__value.dst_hosts)
-        if dst_hosts:
-            for host in self.dst_hosts:
-                if host not in __value.dst_hosts:
-                    dst_hosts = False
-        services = len(self.services) == len(__value.services)
-        if services:
-            for service in self.services:
-                if service not in __value.services:
-                    services = False
-        if src_host and dst_hosts and services:
+        if self is __value:
             return True
-        return False 
+        return hash(self) == hash(__value) and self._key == __value._key
 
     def __str__(self) -> str:
         return f"Alert: dst_hst: {[str(h) for h in self.dst_hosts]}, services: {[str(s) for s in self.services]}"
@@ -15,4 +15,11 @@ class Detector:
 
     @abstractmethod
     def obs(self, perfect_alerts: Iterable[Alert]) -> Iterable[Alert]:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def reseed(self, seed) -> None:
+        """
+        Reseeds the detector's random number generator, if it has one. Called
+        at the start of every episode so deterministic runs reproduce detections.
+        """
+        pass
@@ -1,4 +1,4 @@
-import random
+import numpy as np
 import yaml
 from typing import Iterable
 
@@ -14,37 +14,70 @@ class ProbabilityDetector(Detector):
     """
     A detector that can detect techniques with some probability.
     The techniques that a detector supports should be defined in a YAML file along with a probabilty of detection for that technique.
+
+    Technique ids are mapped to integer columns of a probability array at load time.
+    Each call to `obs()` draws the samples for every (alert, destination, technique)
+    triple in one call to a NumPy `Generator`, and a destination is detected if any
+    of its techniques is.
     """
 
     name = "ProbabilityDetector"
-    def __init__(self, config) -> None:
-        self.technique_probabilites = _read_detector_yaml(config)
+    def __init__(self, config, seed: int | None = None) -> None:
+        """
+        - `config`: YAML file mapping MITRE technique ids to detection probabilities
+        - `seed`: optional seed for the detector's random number generator
+        """
+        self.technique_probabilites = _read_detector_yaml(config) or {}
+        self.technique_columns = {
+            str(technique): column
+            for column, technique in enumerate(self.technique_probabilites)
+        }
+        self.probabilities = np.array(
+            [float(p) for p in self.technique_probabilites.values()], dtype=np.float64
+        )
+        self.rng = np.random.default_rng(seed)
+        self._column_cache: dict[tuple, np.ndarray] = {}
+
+    def reseed(self, seed) -> None:
+        self.rng = np.random.default_rng(seed)
+
+    def technique_columns_for(self, alert: Alert) -> np.ndarray:
+        """Returns the columns of the alert's techniques that this detector knows"""
+        key = tuple(getattr(t, "mitre_id", t) for t in alert.techniques)
+        columns = self._column_cache.get(key)
+        if columns is None:
+            known = {self.technique_columns[t] for t in key if t in self.technique_columns}
+            columns = np.array(sorted(known), dtype=np.intp)
+            self._column_cache[key] = columns
+        return columns
 
     def obs(self, perfect_alerts: Iterable[Alert]) -> Iterable[Alert]:
-        alerts = []
+        # If the YAML file is empty, then only accessing decoys can create alerts
+        if not self.technique_columns:
+            return []
+
+        pairs = []
+        column_chunks = []
         for perfect_alert in perfect_alerts:
+            columns = self.technique_columns_for(perfect_alert)
+            if columns.size == 0:
+                continue
             for dst in perfect_alert.dst_hosts:
-                detection_failed = True
-
-                # If the YAML file is empty, then only accessing decoys can create alerts
-                if not self.technique_probabilites:
-                    continue
-
-                techniques = set(perfect_alert.techniques) & set(self.technique_probabilites.keys())
-                # Check to see if the detector can successfully detect the action based on the technique used
-                for technique in techniques:
-                    # Use probability of successful detection to determine if the action was noticed
-                    detection_probability = float(self.technique_probabilites[technique])
-                    if random.random() > detection_probability:
-                        continue
-                    
-                    # Detector only has to be successful on 1 technique
-                    detection_failed = False
-                    break
-            
-                if detection_failed:
-                    continue
-        
-                new_alert = Alert(src_host=perfect_alert.src_host, dst_hosts=[dst], services=perfect_alert.services)
-                alerts.append(new_alert)
-        return alerts
+                pairs.append((perfect_alert, dst))
+                column_chunks.append(columns)
+        if not pairs:
+            return []
+
+        columns = np.concatenate(column_chunks)
+        starts = np.zeros(len(column_chunks), dtype=np.intp)
+        np.cumsum([c.size for c in column_chunks[:-1]], out=starts[1:])
+        # Use probability of successful detection to determine if the action was noticed.
+        # Detector only has to be successful on 1 technique
+        hits = self.rng.random(columns.size) <= self.probabilities[columns]
+        detected = np.logical_or.reduceat(hits, starts)
+
+        return [
+            Alert(src_host=perfect_alert.src_host, dst_hosts=[dst], services=perfect_alert.services)
+            for (perfect_alert, dst), hit in zip(pairs, detected.tolist())
+            if hit
+        ]
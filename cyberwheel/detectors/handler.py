@@ -6,6 +6,7 @@ from typing import Iterator
 
 from cyberwheel.detectors.detector_base import Detector
 from cyberwheel.detectors.alert import Alert
+from cyberwheel.profiling import PROFILER
 
 class DetectorHandler:
     def __init__(self, config: str) -> None:
@@ -52,33 +53,77 @@ class DetectorHandler:
             elif node != 'end' and out_degree == 0:
                 raise ValueError(f"node '{node}' must have an out-degree > 0")
 
+        self._compile_plan()
         return self.DG
 
+    def _compile_plan(self) -> None:
+        """
+        Compiles the detector graph into an execution plan.
+
+        Every node gets an integer slot holding its input alerts. Detectors
+        are grouped into levels by their longest distance from 'start', so a
+        detector only runs once all of its parents have, and detectors on the
+        same level don't depend on each other. Each level is a list of
+        (input slot, detector, child slots, profiling timer name).
+        """
+        if not nx.is_directed_acyclic_graph(self.DG):
+            raise ValueError("detector graph must not contain cycles")
+        self._slots = {node: slot for slot, node in enumerate(self.DG.nodes)}
+        self._end_slot = self._slots['end']
+
+        depth = {}
+        for node in nx.topological_sort(self.DG):
+            depth[node] = max((depth[p] + 1 for p in self.DG.predecessors(node)), default=0)
+
+        self._start_children = tuple(self._slots[c] for c in self.DG.successors('start'))
+        levels: dict[int, list] = {}
+        for node in nx.topological_sort(self.DG):
+            if node in ('start', 'end'):
+                continue
+            edges = list(self.DG.out_edges(node, data='attr'))
+            detector = edges[0][2]['detector']
+            children = tuple(self._slots[child] for _, child, _ in edges)
+            levels.setdefault(depth[node], []).append(
+                (self._slots[node], detector, children, f"detector/{node}")
+            )
+        self._plan = [levels[d] for d in sorted(levels)]
+        self._outputs: list[list[Alert]] = [[] for _ in self._slots]
+
     def obs(self, perfect_alerts: Iterator[Alert]) -> Iterator[Alert]:
         """
         Traverses the detector graph and executing each detector's `obs()` method.
 
         - `perfect_alerts`: an iterable of Alerts produced by the red agent. Used as input to the detector graph.
         """
-        for edge in self.DG.edges:
-            node_data_view = self.DG.nodes.data("detector_output", default=[])
-            next_node_input = node_data_view[edge[1]]
-            if edge[0] == 'start':
-                result = perfect_alerts
-            else:
-                input_alerts = node_data_view[edge[0]]
-                detector = self.DG.get_edge_data(*edge)['attr']['detector'] 
-                result = detector.obs(input_alerts)
-            #print(len(next_node_input))
-            for r in result:
-                if r not in next_node_input:
-                    next_node_input.append(r)
-            self.DG.add_node(edge[1], detector_output=next_node_input)
-        return self.DG.nodes.data("detector_output", default=[])['end']
+        outputs = [[] for _ in self._outputs]
+        seen = [set() for _ in self._outputs]
+        perfect_alerts = list(perfect_alerts)
+        for child in self._start_children:
+            _extend_unique(outputs[child], seen[child], perfect_alerts)
+        for level in self._plan:
+            for slot, detector, children, timer_name in level:
+                with PROFILER.timer(timer_name):
+                    result = detector.obs(outputs[slot])
+                if len(children) > 1:
+                    result = list(result)
+                for child in children:
+                    _extend_unique(outputs[child], seen[child], result)
+        self._outputs = outputs
+        return outputs[self._end_slot]
 
     def reset(self) -> None:
-        for node in self.DG.nodes:
-            self.DG.add_node(node, detector_output=[])
+        self._outputs = [[] for _ in self._outputs]
+
+    def reseed(self, seed: int) -> None:
+        """
+        Reseeds every detector in the graph. Each detector gets its own stream
+        derived from seed and its slot.
+
+        - `seed`: episode seed
+        """
+        for level in self._plan:
+            for slot, detector, _, _ in level:
+                detector.reseed([seed, slot])
 
     def draw(self, filename="detector.png"):
         """
@@ -107,6 +152,14 @@ class DetectorHandler:
         plt.savefig(filename)
 
 
+def _extend_unique(alerts: list[Alert], seen: set[Alert], new_alerts) -> None:
+    # hash-based dedup, keeping first-seen order
+    for alert in new_alerts:
+        if alert not in seen:
+            seen.add(alert)
+            alerts.append(alert)
+
+
 def import_detector(module: str, class_: str, config: str | None) -> Detector:
     """
     Imports the specifed detector.
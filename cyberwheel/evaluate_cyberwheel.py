@@ -9,15 +9,13 @@ import numpy as np
 import pandas as pd
 from distutils.util import strtobool
 
-from copy import deepcopy
 from importlib.resources import files
 from tqdm import tqdm
 from torch.distributions.categorical import Categorical
 
 from cyberwheel.cyberwheel_envs.cyberwheel_dynamic import DynamicCyberwheel
-from cyberwheel.red_agents import ARTAgent
+from cyberwheel.cyberwheel_envs.worker_pool import ForkedWorkerPool
 from cyberwheel.red_agents.strategies import DFSImpact, ServerDowntime
-from cyberwheel.network.network_base import Network
 from cyberwheel.visualize import visualize
 
 
@@ -98,6 +96,8 @@ def make_env(
     red_strategy=ServerDowntime,
     deterministic=True,
     seed_file="runs/seed_log.txt",
+    command_history_size=None,
+    command_log_file=None,
 ):
     """
     Utility function for multiprocessed env.
@@ -121,12 +121,14 @@ def make_env(
             red_agent=red_agent,
             blue_config=blue_config,
             num_steps=num_steps,
-            network=network,
+            network=network.fork() if network is not None else None,
             service_mapping=service_mapping,
             evaluation=True,
             red_strategy=red_strategy,
             deterministic=deterministic,
             seed_file=seed_file,
+            command_history_size=command_history_size,
+            command_log_file=command_log_file,
         )
         env.reset(seed=seed + rank)  # Reset the environment with a specific seed
         env = gym.wrappers.RecordEpisodeStatistics(
@@ -279,6 +281,19 @@ def parse_args():
         default="runs/seed_log.txt"
     )
 
+    parser.add_argument(
+        "--command-history-size",
+        help="Number of host commands to keep per episode. 0 only counts them, a negative value (default) keeps all of them",
+        type=int,
+        default=-1,
+    )
+
+    parser.add_argument(
+        "--log-commands",
+        help="Streams every command run on a host to action_logs/<graph name>_commands.csv",
+        action="store_true",
+    )
+
     return parser.parse_args()
 
 
@@ -299,19 +314,25 @@ def evaluate_cyberwheel():
 
     # Set up network and Host-Technique mapping outside of environment.
     # This keeps the time-consuming processes from running for each environment.
-    network_config = files("cyberwheel.resources.configs.network").joinpath(
-        args.network_config
-    )
-    network = Network.create_network_from_yaml(network_config)
+    pool = ForkedWorkerPool(args.network_config, args.red_agent)
 
-    service_mapping = {}
-    if args.red_agent == "art_agent":
-        service_mapping = ARTAgent.get_service_map(network)
     if args.red_strategy == "dfs_impact":
         args.red_strategy = DFSImpact
     else:
         args.red_strategy = ServerDowntime
 
+    experiment_name = args.experiment
+
+    # Set up dirpath to store action logs CSV
+    if args.graph_name != None:
+        now_str = args.graph_name
+    else:
+        now_str = f"{experiment_name}_evaluate_{args.network_config.split('.')[0]}_{args.red_agent}_{args.red_strategy.__name__}_{args.min_decoys}-{args.max_decoys}_scaling{int(args.reward_scaling)}_{args.reward_function}reward"
+    log_file = files("cyberwheel.action_logs").joinpath(f"{now_str}.csv")
+    command_log_file = None
+    if args.log_commands:
+        command_log_file = files("cyberwheel.action_logs").joinpath(f"{now_str}_commands.csv")
+
     env_funcs = [
         make_env(
             1,
@@ -327,20 +348,20 @@ def evaluate_cyberwheel():
             red_agent=args.red_agent,
             blue_config=args.blue_config,
             num_steps=args.num_steps,
-            network=deepcopy(network),
-            service_mapping=service_mapping,
+            network=pool.network,
+            service_mapping=pool.service_mapping,
             red_strategy=args.red_strategy,
             deterministic=args.deterministic,
             seed_file=args.seed_file,
+            command_history_size=None if args.command_history_size < 0 else args.command_history_size,
+            command_log_file=command_log_file,
         )
         for i in range(1)
     ]
-    envs = gym.vector.SyncVectorEnv(env_funcs)
+    envs = pool.vector_env(env_funcs, asynchronous=False)
 
     agent = Agent(envs).to(device)
 
-    experiment_name = args.experiment
-
     agent_filename = f"{args.checkpoint}.pt"
 
     # If download from W&B, use API to get run data.
@@ -371,13 +392,6 @@ def evaluate_cyberwheel():
 
     print("Playing environment...")
 
-    # Set up dirpath to store action logs CSV
-    if args.graph_name != None:
-        now_str = args.graph_name
-    else:
-        now_str = f"{experiment_name}_evaluate_{args.network_config.split('.')[0]}_{args.red_agent}_{args.red_strategy.__name__}_{args.min_decoys}-{args.max_decoys}_scaling{int(args.reward_scaling)}_{args.reward_function}reward"
-    log_file = files("cyberwheel.action_logs").joinpath(f"{now_str}.csv")
-
     actions_df = pd.DataFrame()
     full_episodes = []
     full_steps = []
@@ -453,6 +467,8 @@ def evaluate_cyberwheel():
 
     # Save action metadata to CSV in action_logs/
     actions_df.to_csv(log_file)
+    # flushes the streamed command log
+    envs.close()
 
     total_time = time.time() - start_time
     print("charts/SPS", int(2000 / total_time))
@@ -0,0 +1,57 @@
+"""
+Generalized advantage estimation (GAE) for the PPO update in train_cyberwheel.py.
+"""
+import torch
+
+
+def discounted_reverse_cumsum(deltas: torch.Tensor, discounts: torch.Tensor) -> torch.Tensor:
+    """
+    Solves x[t] = deltas[t] + discounts[t] * x[t + 1] (with x[T] = 0) along
+    the first dimension.
+
+    This is a scan over the affine maps x -> deltas[t] + discounts[t] * x,
+    which compose associatively. Each pass doubles the number of steps every
+    element has accumulated (Hillis-Steele), so a rollout of T steps takes
+    ceil(log2(T)) passes of whole-buffer tensor ops instead of T passes of
+    per-step ones. Discounts stay in [0, 1], so the products can't overflow,
+    and episode boundaries (discount 0) need no special handling.
+
+    :param Tensor deltas: (T, ...) values to accumulate
+    :param Tensor discounts: (T, ...) factor applied to the next step's sum
+    """
+    sums, factors = deltas, discounts
+    offset = 1
+    num_steps = deltas.shape[0]
+    while offset < num_steps:
+        sums = torch.cat((sums[:-offset] + factors[:-offset] * sums[offset:], sums[-offset:]))
+        factors = torch.cat((factors[:-offset] * factors[offset:], factors[-offset:]))
+        offset *= 2
+    return sums
+
+
+def compute_gae(
+    rewards: torch.Tensor,
+    values: torch.Tensor,
+    dones: torch.Tensor,
+    next_value: torch.Tensor,
+    next_done: torch.Tensor,
+    gamma: float,
+    gae_lambda: float,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Computes the advantages and returns of a (num_steps, num_envs) rollout.
+
+    :param Tensor rewards: reward received after each step
+    :param Tensor values: value estimate of the observation at each step
+    :param Tensor dones: whether the observation at each step starts a new episode
+    :param Tensor next_value: value estimate of the observation after the rollout
+    :param Tensor next_done: whether that observation starts a new episode
+    :param float gamma: discount factor
+    :param float gae_lambda: GAE lambda
+    :return: (advantages, returns)
+    """
+    next_values = torch.cat((values[1:], next_value.reshape(1, -1)))
+    nextnonterminal = 1.0 - torch.cat((dones[1:], next_done.reshape(1, -1)))
+    deltas = rewards + gamma * next_values * nextnonterminal - values
+    advantages = discounted_reverse_cumsum(deltas, gamma * gae_lambda * nextnonterminal)
+    return advantages, advantages + values
@@ -1,3 +1,8 @@
+from typing import Callable, List
+
+import numpy as np
+
+
 class Command:
     executor: str
     content: str
@@ -6,4 +11,192 @@ class Command:
     def __init__(self, executor, content, privilege):
         self.executor = executor
         self.content = content
-        self.privilege = privilege
\ No newline at end of file
+        self.privilege = privilege
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Command):
+            return False
+        return (self.executor, self.content, self.privilege) == (
+            other.executor,
+            other.content,
+            other.privilege,
+        )
+
+    def __repr__(self) -> str:
+        return f"Command({self.executor!r}, {self.content!r}, {self.privilege!r})"
+
+
+# Process-wide string table. Command contents, executor names and privileges
+# repeat heavily (every run of an atomic test issues the same lines), so logs
+# store integer codes into this table instead of the strings.
+_strings: List[str] = []
+_codes: dict[str, int] = {}
+
+
+def intern_command_string(value: str) -> int:
+    """Returns the code of value in the command string table, adding it if needed"""
+    code = _codes.get(value)
+    if code is None:
+        code = len(_strings)
+        _strings.append(value)
+        _codes[value] = code
+    return code
+
+
+def _executor_name(executor) -> str:
+    # atomic tests pass their Executor, everything else passes a name
+    return executor if isinstance(executor, str) else getattr(executor, "name", str(executor))
+
+
+CommandSink = Callable[[int, str, str, str], None]
+
+
+class CommandLog:
+    """
+    Compact log of the commands run on the hosts of one network.
+
+    Each command is one row of four int32 codes (host id, executor, content,
+    privilege) with strings interned in a process-wide table. The number of
+    commands run per host is always tracked. What else is kept depends on
+    capacity:
+
+    * None: every command is kept (the default)
+    * N > 0: a ring buffer keeps the most recent N commands across all hosts
+    * 0: only the per-host counts are kept
+
+    An optional sink is called with (host id, executor, content, privilege) for
+    every command as it is run, regardless of capacity, to stream the log out
+    (e.g. to a CSV file during evaluation).
+    """
+
+    def __init__(self, capacity: int | None = None, sink: CommandSink | None = None):
+        """
+        :param int capacity: number of commands to keep, None for all of them
+            and 0 to only count them
+        :param CommandSink sink: optional callable that receives every command
+        """
+        if capacity is not None and capacity < 0:
+            raise ValueError(f"capacity must be None or >= 0, got {capacity}")
+        self.capacity = capacity
+        self.sink = sink
+        self._rows = np.zeros((16 if capacity is None else capacity, 4), dtype=np.int32)
+        self.counts = np.zeros(16, dtype=np.int64)
+        # commands stored since the last clear(), including overwritten ones
+        self.total = 0
+
+    def __len__(self) -> int:
+        """Returns the number of commands currently kept"""
+        return min(self.total, len(self._rows))
+
+    def copy(self) -> "CommandLog":
+        """Returns an independent log with the same contents and no sink"""
+        log = CommandLog.__new__(CommandLog)
+        log.capacity = self.capacity
+        log.sink = None
+        log._rows = self._rows.copy()
+        log.counts = self.counts.copy()
+        log.total = self.total
+        return log
+
+    def append(self, host_id: int, executor, content: str, privilege: str) -> None:
+        """
+        Records a command run on host_id
+
+        :param int host_id: id of the host in its HostState
+        :param executor: executor name or object with a name
+        :param str content: command line
+        :param str privilege: privilege the command ran with
+        """
+        if self.sink is not None:
+            self.sink(host_id, _executor_name(executor), content, privilege)
+        self._store(
+            host_id,
+            intern_command_string(_executor_name(executor)),
+            intern_command_string(content),
+            intern_command_string(privilege),
+        )
+
+    def _store(self, host_id: int, executor: int, content: int, privilege: int) -> None:
+        if host_id >= len(self.counts):
+            counts = np.zeros(max(2 * len(self.counts), host_id + 1), dtype=np.int64)
+            counts[: len(self.counts)] = self.counts
+            self.counts = counts
+        self.counts[host_id] += 1
+        if self.capacity == 0:
+            self.total += 1
+            return
+        if self.capacity is None and self.total == len(self._rows):
+            rows = np.zeros((2 * len(self._rows), 4), dtype=np.int32)
+            rows[: self.total] = self._rows
+            self._rows = rows
+        row = self._rows[self.total % len(self._rows)]
+        row[0], row[1], row[2], row[3] = host_id, executor, content, privilege
+        self.total += 1
+
+    def _kept_rows(self) -> np.ndarray:
+        """Returns the kept rows, oldest first"""
+        size = len(self._rows)
+        if self.total <= size or size == 0:
+            return self._rows[: self.total]
+        start = self.total % size
+        return np.concatenate((self._rows[start:], self._rows[:start]))
+
+    def count(self, host_id: int) -> int:
+        """Returns how many commands ran on host_id, including ones no longer kept"""
+        return int(self.counts[host_id]) if host_id < len(self.counts) else 0
+
+    def commands(self, host_id: int | None = None) -> List[Command]:
+        """
+        Returns the kept commands of host_id (or of every host), oldest first
+        """
+        rows = self._kept_rows()
+        if host_id is None:
+            rows = rows[rows[:, 0] >= 0]
+        else:
+            rows = rows[rows[:, 0] == host_id]
+        strings = _strings
+        return [
+            Command(strings[executor], strings[content], strings[privilege])
+            for _, executor, content, privilege in rows.tolist()
+        ]
+
+    def transfer(self, other: "CommandLog", other_id: int, host_id: int) -> None:
+        """Copies the kept commands of other_id in other to host_id in this log"""
+        rows = other._kept_rows()
+        for _, executor, content, privilege in rows[rows[:, 0] == other_id].tolist():
+            self._store(host_id, executor, content, privilege)
+
+    def drop_host(self, host_id: int) -> None:
+        """Forgets the commands of host_id, so the id can be reused"""
+        if self.capacity != 0:
+            host_ids = self._rows[:, 0]
+            host_ids[host_ids == host_id] = -1
+        if host_id < len(self.counts):
+            self.counts[host_id] = 0
+
+    def clear(self) -> None:
+        self.total = 0
+        self.counts[:] = 0
+
+    def __getstate__(self):
+        # codes are only valid in the process that interned them, so pickle strings
+        state = self.__dict__.copy()
+        state["sink"] = None
+        state["_rows"] = [
+            (host_id, _strings[executor], _strings[content], _strings[privilege])
+            for host_id, executor, content, privilege in self._kept_rows().tolist()
+        ]
+        return state
+
+    def __setstate__(self, state):
+        rows = state.pop("_rows")
+        self.__dict__.update(state)
+        counts, self.counts = self.counts, np.zeros_like(self.counts)
+        self._rows = np.zeros(
+            (16 if self.capacity is None else self.capacity, 4), dtype=np.int32
+        )
+        self.total = 0
+        for host_id, executor, content, privilege in rows:
+            if host_id >= 0:
+                self.append(host_id, executor, content, privilege)
+        self.counts = counts
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+from importlib.resources import files
 import ipaddress as ipa
+from os import PathLike
 from pydantic import BaseModel
 import random
 import json
-from typing import Union, List, Type
+from typing import Dict, Union, List, Type
+import yaml
 from .network_object import NetworkObject
 from .service import Service
 from .subnet import Subnet
 from .process import Process
 from .command import Command
+from .host_state import HostState
 
 
 class HostType(BaseModel):
@@ -21,6 +25,106 @@ class HostType(BaseModel):
     os: str = ""
 
 
+
+class HostTypeCatalog:
+    """
+    Parses host type and service definitions once per process and interns the
+    resulting HostType and Service objects.
+
+    Every host of a given type shares the same HostType (and Services), both
+    within one network and across networks built in the same worker. Use
+    `HostTypeCatalog.get_catalog()` so catalogs are cached per config file.
+    """
+
+    _catalogs: Dict[tuple[str, str], "HostTypeCatalog"] = {}
+
+    def __init__(self, host_config: PathLike, services_config: PathLike):
+        """
+        :param PathLike host_config: host definitions YAML file path
+        :param PathLike services_config: service definitions YAML file path
+        """
+        self.host_config = host_config
+        self.services_config = services_config
+        with open(host_config, "r") as f:
+            self.type_definitions: dict = yaml.safe_load(f)["host_types"]
+        with open(services_config, "r") as f:
+            self.service_definitions: dict = yaml.safe_load(f)
+        self._services: Dict[str, Service] = {}
+        self._host_types: Dict[str, HostType] = {}
+
+    @classmethod
+    def get_catalog(
+        cls, host_config: PathLike, services_config: PathLike | None = None
+    ) -> "HostTypeCatalog":
+        """
+        Returns the cached catalog for the given config files, parsing them on first use
+
+        :param PathLike host_config: host definitions YAML file path
+        :param PathLike services_config: service definitions YAML file path,
+                defaults to windows_exploitable_services.yaml
+        """
+        if services_config is None:
+            services_config = files("cyberwheel.resources.configs.services").joinpath(
+                "windows_exploitable_services.yaml"
+            )  # type: ignore
+        key = (str(host_config), str(services_config))
+        catalog = cls._catalogs.get(key)
+        if catalog is None:
+            catalog = cls(host_config, services_config)
+            cls._catalogs[key] = catalog
+        return catalog
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drops every cached catalog so config files are re-read on next use"""
+        cls._catalogs.clear()
+
+    def get_service(self, name: str) -> Service:
+        """
+        Returns the interned Service defined under `name`
+        """
+        service = self._services.get(name)
+        if service is None:
+            service = Service.create_service_from_yaml(self.service_definitions, name)
+            self._services[name] = service
+        return service
+
+    def get_host_type(self, name: str) -> HostType:
+        """
+        Returns the interned HostType defined under `name` (case insensitive)
+
+        Unknown names produce an empty HostType, matching the behavior of
+        Network.create_host_type_from_yaml.
+        """
+        key = name.lower()
+        host_type = self._host_types.get(key)
+        if host_type is not None:
+            return host_type
+
+        if key in self.type_definitions:
+            host_type_name = key
+            definition = self.type_definitions[key] or {}
+        else:
+            host_type_name = ""
+            definition = {}
+
+        cve_list = set()
+        running_services = []
+        for service_name in definition.get("services", []):
+            service = self.get_service(service_name)
+            running_services.append(service)
+            cve_list.update(service.vulns)
+
+        host_type = HostType(
+            name=host_type_name,
+            services=running_services,
+            decoy=definition.get("decoy", False),
+            os=definition.get("os", ""),
+            cve_list=cve_list,
+        )
+        self._host_types[key] = host_type
+        return host_type
+
 # not using this yet
 class ArpEntry(BaseModel):
     mac: str
@@ -41,14 +145,17 @@ class Host(NetworkObject):
         :param list[FirewallRule] | list[None] **firewall_rules: list of FirewallRules
         :param list[Service] | list[None] **services: list of services
         """
+        # dynamic flags live in a HostState; a standalone host owns a private
+        # one until a Network binds it to the network-wide state
+        self._state = HostState(capacity=1)
+        self.host_id: int = self._state.allocate()
         super().__init__(name, kwargs.get("firewall_rules", []))
         self.subnet: Subnet = subnet
         self.host_type: HostType | None = host_type
         self.services: list[Service] = kwargs.get("services", [])
-        self.is_compromised: bool = False  # Default to not compromised
+        self.is_compromised = False  # Default to not compromised
         self.mac_address = self._generate_mac_address()
         self.default_route = None
-        self.routes = set()
         self.decoy = False
         self.os = "windows"  # 'windows', 'macos', or 'linux'
         self.isolated = False  # For isolate action
@@ -59,7 +166,6 @@ class Host(NetworkObject):
             self._apply_host_type(self.host_type)
         self.vulnerabilities = []
         self.processes = []
-        self.command_history = []
         self.dns_server = None
 
     def __str__(self) -> str:
@@ -84,13 +190,68 @@ class Host(NetworkObject):
         new_host.services = self.services
         new_host.mac_address = self.mac_address
         new_host.default_route = self.default_route
-        new_host.routes = self.routes
+        new_host.routing_table = self.routing_table
         new_host.interfaces = self.interfaces
         new_host.vulnerabilities = self.vulnerabilities
         new_host.processes = self.processes
         new_host.dns_server = self.dns_server
         new_host.ip_address = self.ip_address
+        new_host.firewall_rules = self.firewall_rules
         return new_host
+
+    def get_scope_names(self) -> tuple[str, ...]:
+        return (self.name, self.subnet.name, self.subnet.router.name)
+
+    @property
+    def is_compromised(self) -> bool:
+        return bool(self._state.is_compromised[self.host_id])
+
+    @is_compromised.setter
+    def is_compromised(self, value: bool) -> None:
+        self._state.set("is_compromised", self.host_id, value)
+
+    @property
+    def isolated(self) -> bool:
+        return bool(self._state.isolated[self.host_id])
+
+    @isolated.setter
+    def isolated(self, value: bool) -> None:
+        self._state.set("isolated", self.host_id, value)
+
+    @property
+    def restored(self) -> bool:
+        return bool(self._state.restored[self.host_id])
+
+    @restored.setter
+    def restored(self, value: bool) -> None:
+        self._state.set("restored", self.host_id, value)
+
+    def bind_state(self, state: HostState) -> None:
+        """
+        Moves this host's dynamic flags into state under a newly allocated id
+
+        :param HostState state: state shared by the hosts of a network
+        """
+        if self._state is state:
+            return
+        host_id = state.allocate()
+        state.copy_flags(host_id, self._state, self.host_id)
+        if self._state.commands.count(self.host_id):
+            state.commands.transfer(self._state.commands, self.host_id, host_id)
+            state.dirty.add(host_id)
+        self._state, self.host_id = state, host_id
+
+    def unbind_state(self) -> None:
+        """
+        Moves this host's dynamic flags back into a private HostState and
+        releases its id in the shared one
+        """
+        state = HostState(capacity=1)
+        host_id = state.allocate()
+        state.copy_flags(host_id, self._state, self.host_id)
+        state.commands.transfer(self._state.commands, self.host_id, host_id)
+        self._state.release(self.host_id)
+        self._state, self.host_id = state, host_id
     
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Host):
@@ -227,8 +388,22 @@ class Host(NetworkObject):
             Process(name=process_name, privilege=process_privilege_level)
         )
     
+    @property
+    def command_history(self) -> list[Command]:
+        """
+        The commands run on this host that its network's CommandLog still keeps,
+        oldest first
+        """
+        return self._state.commands.commands(self.host_id)
+
+    @property
+    def command_count(self) -> int:
+        """Number of commands run on this host since the last reset"""
+        return self._state.commands.count(self.host_id)
+
     def run_command(self, command_executor, command_content, privilege):
-        self.command_history.append(Command(command_executor, command_content, privilege))
+        self._state.commands.append(self.host_id, command_executor, command_content, privilege)
+        self._state.dirty.add(self.host_id)
 
     def remove_process(self, process_name: str):
         new_processes = [p for p in self.processes if p.name != process_name]
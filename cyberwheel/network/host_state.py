@@ -0,0 +1,103 @@
+import numpy as np
+
+from .command import CommandLog
+
+
+class HostState:
+    """
+    Struct-of-arrays storage for the per-host flags that change during an
+    episode.
+
+    Each host bound to the state owns a stable integer id that indexes one
+    slot of every flag array. Ids of removed hosts are reused, so the arrays
+    only grow to the largest number of hosts that existed at once. Every id
+    whose flags or command history were touched is recorded in a dirty set,
+    which lets Network.reset() undo an episode in time proportional to what
+    the episode changed instead of the size of the network. The commands run
+    on the hosts are kept in one CommandLog, indexed by the same ids.
+    """
+
+    FLAGS = ("is_compromised", "isolated", "restored")
+
+    def __init__(self, capacity: int = 16, commands: CommandLog | None = None):
+        """
+        :param int capacity: number of host slots to preallocate
+        :param CommandLog commands: command log of the hosts, defaults to one
+            that keeps every command
+        """
+        capacity = max(capacity, 1)
+        self.commands = CommandLog() if commands is None else commands
+        self.is_compromised = np.zeros(capacity, dtype=bool)
+        self.isolated = np.zeros(capacity, dtype=bool)
+        self.restored = np.zeros(capacity, dtype=bool)
+        self.dirty: set[int] = set()
+        self._next_id = 0
+        self._free_ids: list[int] = []
+
+    def __len__(self) -> int:
+        return self._next_id - len(self._free_ids)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.is_compromised)
+
+    def copy(self) -> "HostState":
+        """Returns an independent state with the same ids and flags"""
+        state = HostState.__new__(HostState)
+        for flag in self.FLAGS:
+            setattr(state, flag, getattr(self, flag).copy())
+        state.commands = self.commands.copy()
+        state.dirty = set(self.dirty)
+        state._next_id = self._next_id
+        state._free_ids = list(self._free_ids)
+        return state
+
+    def allocate(self) -> int:
+        """Returns a host id whose flags are all False"""
+        if self._free_ids:
+            return self._free_ids.pop()
+        host_id = self._next_id
+        if host_id == self.capacity:
+            self._grow(2 * self.capacity)
+        self._next_id += 1
+        return host_id
+
+    def release(self, host_id: int) -> None:
+        """Clears host_id's flags and commands and makes the id available for reuse"""
+        self.clear([host_id])
+        self.commands.drop_host(host_id)
+        self.dirty.discard(host_id)
+        self._free_ids.append(host_id)
+
+    def _grow(self, capacity: int) -> None:
+        for flag in self.FLAGS:
+            old = getattr(self, flag)
+            new = np.zeros(capacity, dtype=bool)
+            new[: len(old)] = old
+            setattr(self, flag, new)
+
+    def get(self, flag: str, host_id: int) -> bool:
+        return bool(getattr(self, flag)[host_id])
+
+    def set(self, flag: str, host_id: int, value: bool) -> None:
+        getattr(self, flag)[host_id] = value
+        self.dirty.add(host_id)
+
+    def copy_flags(self, host_id: int, other: "HostState", other_id: int) -> None:
+        """Copies the flags of other_id in other into host_id"""
+        for flag in self.FLAGS:
+            value = getattr(other, flag)[other_id]
+            getattr(self, flag)[host_id] = value
+            if value:
+                self.dirty.add(host_id)
+
+    def clear(self, host_ids) -> None:
+        """Sets every flag of host_ids to False"""
+        for flag in self.FLAGS:
+            getattr(self, flag)[host_ids] = False
+
+    def pop_dirty(self) -> np.ndarray:
+        """Returns the ids touched since the last call and forgets them"""
+        dirty = np.fromiter(self.dirty, dtype=np.intp, count=len(self.dirty))
+        self.dirty.clear()
+        return dirty
@@ -0,0 +1,142 @@
+import ipaddress as ipa
+import random
+from typing import Iterator
+
+
+class IPPool:
+    """
+    Lazily tracks the unassigned host addresses of an IP network.
+
+    Addresses are stored as integer offsets from the first usable host
+    address. Free offsets occupy positions [0, len(pool)) of a virtual
+    permutation of range(num_hosts); only positions that have been swapped are
+    stored, so a fresh /16 costs two empty dicts instead of 65k IP objects.
+    Random leases, specific acquires and releases are all O(1).
+    """
+
+    def __init__(self, ip_network: ipa.IPv4Network | ipa.IPv6Network):
+        """
+        :param (IPv4Network | IPv6Network) ip_network: network to allocate from
+        """
+        self.ip_network = ip_network
+        self._address_cls = type(ip_network.network_address)
+        self._first, self._size = self._host_range(ip_network)
+        self._free = self._size
+        self._value_at: dict[int, int] = {}
+        self._position_of: dict[int, int] = {}
+
+    @staticmethod
+    def _host_range(ip_network) -> tuple[int, int]:
+        """
+        Returns (first host address as int, number of host addresses),
+        matching the addresses yielded by ip_network.hosts()
+        """
+        if ip_network.num_addresses <= 2:
+            hosts = list(ip_network.hosts())
+            return int(hosts[0]), len(hosts)
+        first = int(ip_network.network_address) + 1
+        last = int(ip_network.broadcast_address)
+        # IPv6 has no broadcast address, only the subnet-router anycast is excluded
+        if ip_network.version == 4:
+            last -= 1
+        return first, last - first + 1
+
+    def __len__(self) -> int:
+        return self._free
+
+    def __contains__(self, ip) -> bool:
+        offset = int(ip) - self._first
+        return 0 <= offset < self._size and self._position(offset) < self._free
+
+    def __iter__(self) -> Iterator[ipa.IPv4Address | ipa.IPv6Address]:
+        """Yields the unassigned addresses in ascending order"""
+        for offset in range(self._size):
+            if self._position(offset) < self._free:
+                yield self._address(offset)
+
+    def __repr__(self) -> str:
+        return f"IPPool(ip_network={self.ip_network!r}, unassigned={self._free})"
+
+    def copy(self) -> "IPPool":
+        """Returns an independent pool with the same unassigned addresses"""
+        pool = IPPool.__new__(IPPool)
+        pool.__dict__.update(self.__dict__)
+        pool._value_at = dict(self._value_at)
+        pool._position_of = dict(self._position_of)
+        return pool
+
+    def _value(self, position: int) -> int:
+        return self._value_at.get(position, position)
+
+    def _position(self, value: int) -> int:
+        return self._position_of.get(value, value)
+
+    def _place(self, position: int, value: int) -> None:
+        if position == value:
+            self._value_at.pop(position, None)
+            self._position_of.pop(value, None)
+        else:
+            self._value_at[position] = value
+            self._position_of[value] = position
+
+    def _swap(self, i: int, j: int) -> None:
+        vi, vj = self._value(i), self._value(j)
+        self._place(i, vj)
+        self._place(j, vi)
+
+    def _address(self, offset: int) -> ipa.IPv4Address | ipa.IPv6Address:
+        return self._address_cls(self._first + offset)
+
+    def _take(self, position: int) -> ipa.IPv4Address | ipa.IPv6Address:
+        last = self._free - 1
+        self._swap(position, last)
+        self._free = last
+        return self._address(self._value(last))
+
+    def lease_random(self) -> ipa.IPv4Address | ipa.IPv6Address:
+        """
+        Removes and returns a random unassigned address
+
+        :raises IndexError: if the pool is exhausted
+        """
+        if self._free == 0:
+            raise IndexError(f"no unassigned IPs left in {self.ip_network}")
+        return self._take(random.randrange(self._free))
+
+    def lease_first(self) -> ipa.IPv4Address | ipa.IPv6Address:
+        """
+        Removes and returns the lowest unassigned address
+
+        :raises IndexError: if the pool is exhausted
+        """
+        for offset in range(self._size):
+            position = self._position(offset)
+            if position < self._free:
+                return self._take(position)
+        raise IndexError(f"no unassigned IPs left in {self.ip_network}")
+
+    def acquire(self, ip: ipa.IPv4Address | ipa.IPv6Address) -> None:
+        """
+        Marks a specific address as assigned
+
+        :raises ValueError: if the address is not unassigned in this pool
+        """
+        if ip not in self:
+            raise ValueError(f"{ip} is not an unassigned IP in {self.ip_network}")
+        self._take(self._position(int(ip) - self._first))
+
+    def release(self, ip: ipa.IPv4Address | ipa.IPv6Address) -> None:
+        """
+        Returns an assigned address to the pool. Releasing an address that is
+        already unassigned does nothing.
+
+        :raises ValueError: if the address is not a host address of this network
+        """
+        offset = int(ip) - self._first
+        if not 0 <= offset < self._size:
+            raise ValueError(f"{ip} is not a host address in {self.ip_network}")
+        position = self._position(offset)
+        if position < self._free:
+            return
+        self._swap(position, self._free)
+        self._free += 1
@@ -1,17 +1,24 @@
 from importlib.resources import files
+import hashlib
 import ipaddress as ipa
 import json
 import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
+import os
 from os import PathLike
-from pathlib import PosixPath
-from typing import Union, List, Type
+from pathlib import Path, PosixPath
+import pickle
+import tempfile
+from typing import KeysView, Union, List, Type
 import yaml
+from collections import deque
 from copy import deepcopy
 
-from .host import Host, HostType
-from .network_object import NetworkObject, FirewallRule, Route
+from .host import Host, HostType, HostTypeCatalog
+from .command import CommandLog
+from .host_state import HostState
+from .network_object import NetworkObject, FirewallRule, Route, default_firewall_rules
 from .router import Router
 from .service import Service
 from .subnet import Subnet
@@ -20,6 +27,15 @@ from tqdm import tqdm
 
 import random
 
+# Bump whenever the pickled layout of Network/Host/Subnet/Router changes so
+# that snapshots compiled by older code are rebuilt instead of loaded.
+SNAPSHOT_VERSION = 9
+
+# kinds of the (kind, host) events published to Network.subscribe_host_events() queues
+HOST_ADDED = "host_added"
+HOST_REMOVED = "host_removed"
+
+
 class Network:
 
     def __init__(
@@ -29,12 +45,28 @@ class Network:
         decoys=[],
         disconnected_nodes=[],
         isolated_hosts=[],
+        host_state: HostState | None = None,
     ):
         self.graph = nx.DiGraph(name=name) if graph == None else graph
         self.name = name
-        self.decoys = decoys
-        self.disconnected_nodes = disconnected_nodes
-        self.isolated_hosts: List[Host] = isolated_hosts
+        self.decoys = list(decoys)
+        self.disconnected_nodes = list(disconnected_nodes)
+        self.isolated_hosts: List[Host] = list(isolated_hosts)
+
+        # dynamic host flags, indexed by Host.host_id
+        self.host_state = HostState() if host_state is None else host_state
+        self._hosts_by_id: dict[int, Host] = {}
+        self._host_event_queues: list[deque] = []
+
+        # per-type node indexes kept in sync by add_node() and remove_node()
+        # so host/subnet/router queries don't scan the whole graph
+        self._hosts: dict[str, Host] = {}
+        self._nondecoy_hosts: dict[str, Host] = {}
+        self._subnets: dict[str, Subnet] = {}
+        self._routers: dict[str, Router] = {}
+        for _, node in self.graph.nodes(data="data"):
+            if node is not None:
+                self._index_node(node)
 
     def __iter__(self):
         return iter(self.graph)
@@ -45,7 +77,62 @@ class Network:
     def copy(self):
         name = self.name
         graph = self.graph.copy()
-        return Network(name=name, graph=graph)
+        return Network(name=name, graph=graph, host_state=self.host_state)
+
+    def fork(self) -> "Network":
+        """
+        Returns a copy-on-write copy of the network for another environment.
+
+        Hosts and subnets are forked into views that own only the state an
+        episode changes (host flags, command history, processes, subnet host
+        lists and IP pools) and read everything else from this network.
+        Routers, host types, services, firewall rules and routing tables are
+        shared by all forks and must be treated as read-only.
+        """
+        state = self.host_state.copy()
+        subnets = {
+            name: subnet.fork(
+                connected_hosts=[], available_ips=subnet.available_ips.copy()
+            )
+            for name, subnet in self._subnets.items()
+        }
+        hosts = {
+            name: host.fork(
+                subnet=subnets[host.subnet.name],
+                decoy=host.decoy,
+                _state=state,
+                host_id=host.host_id,
+                processes=list(host.processes),
+            )
+            for name, host in self._hosts.items()
+        }
+        for forked_host in hosts.values():
+            if forked_host.interfaces:
+                forked_host.interfaces = [
+                    hosts.get(getattr(i, "name", None), i)
+                    for i in forked_host.interfaces
+                ]
+        for name, subnet in self._subnets.items():
+            subnets[name].connected_hosts = [
+                hosts[h.name] for h in subnet.connected_hosts
+            ]
+
+        forked = {**hosts, **subnets}
+        graph = nx.DiGraph(**self.graph.graph)
+        graph.add_nodes_from(
+            (node_name, {"data": forked.get(node_name, data)})
+            for node_name, data in self.graph.nodes(data="data")
+        )
+        graph.add_edges_from(self.graph.edges)
+
+        return Network(
+            name=self.name,
+            graph=graph,
+            decoys=[hosts[d.name] for d in self.decoys],
+            disconnected_nodes=list(self.disconnected_nodes),
+            isolated_hosts=[hosts[h.name] for h in self.isolated_hosts],
+            host_state=state,
+        )
 
     def get_decoys(self):
         return self.decoys
@@ -57,11 +144,7 @@ class Network:
         return self.disconnected_nodes
 
     def get_connected(self):
-        return [
-            host
-            for _, host in self.graph.nodes(data="data")
-            if isinstance(host, Host) and not host.disconnected
-        ]
+        return [host for host in self._hosts.values() if not host.disconnected]
 
     def num_disconnected(self):
         return len(self.disconnected_nodes)
@@ -81,6 +164,7 @@ class Network:
 
     def add_node(self, node) -> None:
         self.graph.add_node(node.name, data=node)
+        self._index_node(node)
 
     def remove_node(self, node: NetworkObject) -> None:
         try:
@@ -88,6 +172,67 @@ class Network:
         except nx.NetworkXError as e:
             # TODO: raise custom exception?
             raise e
+        self._unindex_node(node)
+
+    def _index_node(self, node) -> None:
+        if isinstance(node, Host):
+            node.bind_state(self.host_state)
+            self._hosts_by_id[node.host_id] = node
+            self._hosts[node.name] = node
+            if not node.decoy:
+                self._nondecoy_hosts[node.name] = node
+        elif isinstance(node, Subnet):
+            self._subnets[node.name] = node
+        elif isinstance(node, Router):
+            self._routers[node.name] = node
+
+    def _unindex_node(self, node) -> None:
+        host = self._hosts.pop(node.name, None)
+        if host is not None:
+            del self._hosts_by_id[host.host_id]
+            host.unbind_state()
+        self._nondecoy_hosts.pop(node.name, None)
+        self._subnets.pop(node.name, None)
+        self._routers.pop(node.name, None)
+
+    def subscribe_host_events(self) -> deque:
+        """
+        Returns a queue that receives a (HOST_ADDED | HOST_REMOVED, host) event
+        whenever a host is added with add_host_to_subnet() (e.g. a decoy) or
+        removed with remove_host_from_subnet(). The subscriber pops events off
+        the queue, so keeping up costs time proportional to topology changes
+        instead of network size.
+
+        :returns deque: the subscriber's event queue
+        """
+        queue = deque()
+        self._host_event_queues.append(queue)
+        return queue
+
+    def unsubscribe_host_events(self, queue: deque) -> None:
+        self._host_event_queues = [q for q in self._host_event_queues if q is not queue]
+
+    def _publish_host_event(self, kind: str, host: Host) -> None:
+        for queue in self._host_event_queues:
+            queue.append((kind, host))
+
+    def get_host_by_id(self, host_id: int) -> Host:
+        """
+        Returns the host bound to host_id in this network's HostState
+
+        :param int host_id: Host.host_id
+        :returns Host:
+        """
+        return self._hosts_by_id[host_id]
+
+    def set_command_log(self, command_log: CommandLog) -> None:
+        """
+        Replaces the log the network's hosts record their commands in, e.g. to
+        bound it or only count commands. Commands already logged are dropped.
+
+        :param CommandLog command_log: the new log
+        """
+        self.host_state.commands = command_log
 
     def connect_nodes(self, node1, node2):
         self.graph.add_edge(node1, node2)
@@ -137,23 +282,25 @@ class Network:
         return random_host
 
     def get_hosts(self) -> list[Host]:
-        return [
-            host for _, host in self.graph.nodes(data="data") if isinstance(host, Host)
-        ]  # type:ignore
+        return list(self._hosts.values())
 
     def get_host_names(self) -> list[str]:
-        return [
-            host.name
-            for _, host in self.graph.nodes(data="data")
-            if isinstance(host, Host)
-        ]
+        return list(self._hosts)
+
+    def host_names(self) -> KeysView[str]:
+        """
+        Returns a live, read-only view of the host names in the network
+        """
+        return self._hosts.keys()
+
+    def has_host(self, host_name: str) -> bool:
+        return host_name in self._hosts
+
+    def num_hosts(self) -> int:
+        return len(self._hosts)
 
     def get_nondecoy_hosts(self) -> List[Host]:
-        return [
-            host
-            for _, host in self.graph.nodes(data="data")
-            if isinstance(host, Host) and not host.decoy
-        ]
+        return list(self._nondecoy_hosts.values())
 
     def update_host_compromised_status(self, host: str, is_compromised: bool):
         try:
@@ -235,7 +382,7 @@ class Network:
     #         index += 1
 
     def get_action_space_size(self):
-        return len(self.get_hosts())
+        return len(self._hosts)
 
     # TODO: still need to test this
     def is_any_subnet_fully_compromised(self):
@@ -313,9 +460,8 @@ class Network:
 
         conf_dir = files("cyberwheel.resources.configs.host_definitions")
         conf_file = conf_dir.joinpath(host_config)
-        with open(conf_file) as f:
-            type_config = yaml.safe_load(f)
-        types = type_config["host_types"]
+        # host types and services are parsed once per process and shared by all hosts
+        host_catalog = HostTypeCatalog.get_catalog(conf_file)
 
         ## parse topology
         # parse routers
@@ -354,7 +500,7 @@ class Network:
 
             # assign router first available IP on each subnet
             # routers have one interface for each connected subnet
-            router.set_interface_ip(subnet.name, subnet.available_ips.pop(0))
+            router.set_interface_ip(subnet.name, subnet.available_ips.lease_first())
 
             # ensure subnet.dns_server is defined
             # default to router IP if it's still None
@@ -381,11 +527,11 @@ class Network:
                     )
             else:
                 # if not fw_rules defined insert 'allow all' rule
-                fw_rules.append(FirewallRule())
+                fw_rules = default_firewall_rules()
 
             # instantiate HostType if defined
             if type_str := val.get("type"):
-                type = network.create_host_type_from_yaml(type_str, conf_file, types)  # type: ignore
+                type = host_catalog.get_host_type(type_str)
             else:
                 type = None
 
@@ -425,6 +571,148 @@ class Network:
         network.initialize_interfacing()
         return network
 
+    @staticmethod
+    def snapshot_hash(network_config, host_config="host_defs_services.yaml") -> str:
+        """
+        Returns a content hash over every file a compiled network depends on
+
+        :param PathLike network_config: network config file path
+        :param str host_config: host definitions file name
+        :returns str: hex digest
+        """
+        digest = hashlib.sha256(f"snapshot-v{SNAPSHOT_VERSION}".encode())
+        host_conf_file = files("cyberwheel.resources.configs.host_definitions").joinpath(
+            host_config
+        )
+        services_file = files("cyberwheel.resources.configs.services").joinpath(
+            "windows_exploitable_services.yaml"
+        )
+        for path in (network_config, host_conf_file, services_file):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    @staticmethod
+    def default_snapshot_path(network_config) -> PosixPath:
+        """
+        Returns where the snapshot of a network config is stored by default
+        (i.e. cyberwheel/snapshots/15-host-network.snapshot)
+        """
+        return files("cyberwheel.snapshots").joinpath(
+            f"{Path(network_config).stem}.snapshot"
+        )  # type: ignore
+
+    def save_snapshot(self, path: PathLike, content_hash: str = "") -> None:
+        """
+        Writes the network (graph, routers, subnets, hosts, host types and
+        IP leases) to a binary snapshot.
+
+        The header is pickled separately from the network so that staleness
+        can be checked without unpickling the whole graph.
+
+        :param PathLike path: snapshot file path
+        :param str content_hash: hash of the configs the network was built from
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        header = {"version": SNAPSHOT_VERSION, "hash": content_hash, "name": self.name}
+        # write a temporary file and move it into place, so concurrent readers
+        # never see a partially written snapshot
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+            try:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+
+    @staticmethod
+    def read_snapshot_header(path: PathLike) -> dict | None:
+        """
+        Returns the header of a snapshot, or None if the file is missing or unreadable
+        """
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    @classmethod
+    def compile_snapshot(
+        cls,
+        network_config=None,
+        host_config="host_defs_services.yaml",
+        snapshot_path: PathLike | None = None,
+    ) -> PathLike:
+        """
+        Builds a network from its YAML config and writes it to a snapshot
+
+        :param PathLike network_config: network config file path
+        :param str host_config: host definitions file name
+        :param PathLike snapshot_path: output path, defaults to cyberwheel/snapshots/
+        :returns PathLike: path of the written snapshot
+        """
+        network_config = cls._resolve_network_config(network_config)
+        if snapshot_path is None:
+            snapshot_path = cls.default_snapshot_path(network_config)
+        network = cls.create_network_from_yaml(network_config, host_config)
+        network.save_snapshot(
+            snapshot_path, cls.snapshot_hash(network_config, host_config)
+        )
+        return snapshot_path
+
+    @classmethod
+    def load_snapshot(
+        cls,
+        network_config=None,
+        host_config="host_defs_services.yaml",
+        snapshot_path: PathLike | None = None,
+    ) -> "Network":
+        """
+        Returns the network described by `network_config`, loaded from its
+        compiled snapshot.
+
+        If the snapshot is missing, was written by a different snapshot
+        version, or its content hash no longer matches the config files, the
+        network is rebuilt from YAML and the snapshot is rewritten.
+
+        :param PathLike network_config: network config file path
+        :param str host_config: host definitions file name
+        :param PathLike snapshot_path: snapshot path, defaults to cyberwheel/snapshots/
+        :returns Network:
+        """
+        network_config = cls._resolve_network_config(network_config)
+        if snapshot_path is None:
+            snapshot_path = cls.default_snapshot_path(network_config)
+        content_hash = cls.snapshot_hash(network_config, host_config)
+
+        header = cls.read_snapshot_header(snapshot_path)
+        if (
+            header is not None
+            and header.get("version") == SNAPSHOT_VERSION
+            and header.get("hash") == content_hash
+        ):
+            try:
+                with open(snapshot_path, "rb") as f:
+                    pickle.load(f)  # skip header
+                    return pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass  # truncated or corrupt, rebuild it
+
+        print(f"Snapshot for {Path(network_config).name} is missing or stale, rebuilding")
+        network = cls.create_network_from_yaml(network_config, host_config)
+        network.save_snapshot(snapshot_path, content_hash)
+        return network
+
+    @staticmethod
+    def _resolve_network_config(network_config):
+        if network_config is None:
+            config_dir = files("cyberwheel.resources.configs.network")
+            return config_dir.joinpath("example_config.yaml")
+        return network_config
+
     def get_node_from_name(self, node: str) -> NetworkObject | Host | Subnet | Router:
         """
         Return network object by name
@@ -440,22 +728,13 @@ class Network:
             raise e
 
     def get_all_hosts(self) -> list:
-        nodes_tuple = self.graph.nodes(data="data")  # type: ignore
-        hosts = [obj for _, obj in nodes_tuple if isinstance(obj, Host)]
-
-        return hosts
+        return list(self._hosts.values())
 
     def get_all_subnets(self) -> list:
-        nodes_tuple = self.graph.nodes(data="data")  # type: ignore
-        subnets = [obj for _, obj in nodes_tuple if isinstance(obj, Subnet)]
-
-        return subnets
+        return list(self._subnets.values())
 
     def get_all_routers(self) -> list:
-        nodes_tuple = self.graph.nodes(data="data")  # type: ignore
-        routers = [obj for _, obj in nodes_tuple if isinstance(obj, Router)]
-
-        return routers
+        return list(self._routers.values())
 
     def get_all_hosts_on_subnet(self, subnet: Subnet) -> list:
         return subnet.get_connected_hosts()
@@ -499,11 +778,29 @@ class Network:
         Hosts are only visible to ping if ICMP is allowed by the firewall(s).
         """
         subnet_hosts = self.get_all_hosts_on_subnet(subnet)
-        found_ips = []
-        for host in subnet_hosts:
-            if self.is_traffic_allowed(src, host, None, "icmp"):
-                found_ips.append(host.ip_address)
-        return found_ips
+        allowed = self.is_traffic_allowed_many(src, subnet_hosts, None, "icmp")
+        return [host.ip_address for host, ok in zip(subnet_hosts, allowed) if ok]
+
+    def _validate_traffic(self, port: Union[str, int, None], proto: str) -> None:
+        # ICMP doesn't use ports (it's considered layer 3)
+        if proto.lower() == "icmp":
+            return
+        if not self._is_valid_port_number(port):
+            raise ValueError(f"{port} is not a valid port number")
+
+    @staticmethod
+    def _firewall_chain(dest: NetworkObject) -> tuple | None:
+        """
+        Returns the objects whose firewalls traffic to dest passes through,
+        outermost first, or None if dest can't receive traffic
+        """
+        if isinstance(dest, Host):
+            return (dest.subnet.router, dest.subnet, dest)
+        elif isinstance(dest, Subnet):
+            return (dest.router, dest)
+        elif isinstance(dest, Router):
+            return (dest,)
+        return None
 
     def is_traffic_allowed(
         self,
@@ -515,118 +812,80 @@ class Network:
         """
         Checks firewall to see if network traffic should be allowed
 
+        Traffic to a host passes the router, subnet and host firewalls in that
+        order. Each firewall allows the traffic if any of its rules matches,
+        and a firewall without rules allows everything.
+
         :param str NetworkObject: source subnet or host of traffic
         :param str NetworkObject: destination subnet or host of traffic
         :param int port: destination port
         :param str proto: protocol (i.e. tcp/udp/icmp, default = tcp)
         """
-        # ICMP doesn't use ports (it's considered layer 3)
-        if proto.lower() == "icmp":
-            pass
-        elif not self._is_valid_port_number(port):
-            raise ValueError(f"{port} is not a valid port number")
-
-        def _does_src_match(src, rule: dict, type) -> bool:
-            if src.name == rule["src"] or rule["src"] == "all":
-                return True
-            if type == "host":
-                if (
-                    src.subnet.router.name == rule["src"]
-                    or src.subnet.name == rule["src"]
-                ):
-                    return True
-            elif type == "subnet":
-                if src.router.name == rule["src"]:
-                    return True
-            return False
-
-        def _does_dest_match(dest, rule: dict, type) -> bool:
-            if dest.name == rule["dest"] or rule["dest"] == "all":
-                return True
-            if type == "host":
-                if (
-                    dest.subnet.router.name == rule["dest"]
-                    or dest.subnet.name == rule["dest"]
-                ):
-                    return True
-            elif type == "subnet":
-                if dest.router.name == rule["dest"]:
-                    return True
-            return False
-
-        def _does_port_match(port: str, rule: dict) -> bool:
-            if str(rule["port"]) == port or str(rule["port"]) == "all":
-                return True
-            return False
-
-        def _does_proto_match(proto: str, rule: dict) -> bool:
-            if rule["proto"] == proto or rule["proto"] == "all":
-                return True
+        self._validate_traffic(port, proto)
+        chain = self._firewall_chain(dest)
+        if chain is None:
             return False
+        src_scopes = src.get_scope_names()
+        port = str(port)
+        for obj in chain:
+            if not obj.allows_traffic(src_scopes, port, proto):
+                return False
+        return True
 
-        def _check_rules(src, dest, port, proto, type):
-
-            # default to 'allow all' if no rules defined
-            ### this is antithetical to how firewalls work in the real world,
-            ### but seemed pragmatic in our case
-            # try:
-            #    if not dest.firewall_rules:
-            #        return True
-            # except NameError:
-            #    return True
-
-            # TODO: catch any common exceptions (KeyError, etc.)
-            # loop over each rule/element in firewall_rules
-            for rule in dest.firewall_rules:
-                # break if src doesn't match
-                if not _does_src_match(src, rule, type):
-                    break
-
-                # break if dest doesn't match
-                if not _does_dest_match(dest, rule, type):
-                    break
-
-                # break if port doesn't match
-                if not _does_port_match(str(port), rule):
-                    break
-
-                # break if proto doesn't match
-                if not _does_proto_match(proto, rule):
-                    break
-
-                # matching rule found
-                return True
-            return False
+    def is_traffic_allowed_many(
+        self,
+        src: NetworkObject,
+        dests: list[NetworkObject],
+        port: Union[str, int, None],
+        proto: str = "tcp",
+    ) -> np.ndarray:
+        """
+        Checks firewalls for traffic from src to each of dests
 
-        if isinstance(dest, Host):
-            subnet = dest.subnet
-            router = subnet.router
-            # check router fw
-            if not _check_rules(src, router, port, proto, "host"):
-                return False
-            # check subnet fw
-            if not _check_rules(src, subnet, port, proto, "host"):
-                return False
-            # check host fw
-            if not _check_rules(src, dest, port, proto, "host"):
-                return False
-            return True
-        elif isinstance(dest, Subnet):
-            router = dest.router
-            # check router fw
-            if not _check_rules(src, router, port, proto, "subnet"):
-                return False
-            # check subnet fw
-            if not _check_rules(src, dest, port, proto, "subnet"):
-                return False
-            return True
-        elif isinstance(dest, Router):
-            # check router fw
-            if not _check_rules(src, dest, port, proto, "router"):
-                return False
-            return True
+        Equivalent to calling is_traffic_allowed() for every destination, but
+        the port is validated once, each router/subnet firewall shared by the
+        destinations is only evaluated once, and destinations are grouped by
+        their compiled firewall table (shared by objects with equivalent
+        rules) so each distinct table is evaluated once into the set of
+        destination names it allows.
 
-        return False
+        :param NetworkObject src: source subnet or host of traffic
+        :param list[NetworkObject] dests: destination subnets or hosts
+        :param int port: destination port
+        :param str proto: protocol (i.e. tcp/udp/icmp, default = tcp)
+        :returns: boolean array aligned with dests
+        """
+        self._validate_traffic(port, proto)
+        src_scopes = src.get_scope_names()
+        port = str(port)
+        decisions: dict[int, bool] = {}
+
+        def decide(obj: NetworkObject) -> bool:
+            decision = decisions.get(id(obj))
+            if decision is None:
+                decision = obj.allows_traffic(src_scopes, port, proto)
+                decisions[id(obj)] = decision
+            return decision
+
+        # destinations whose outer firewalls pass, grouped by their own table
+        groups: dict[int, tuple] = {}
+        for i, dest in enumerate(dests):
+            chain = self._firewall_chain(dest)
+            if chain is None or not all(decide(obj) for obj in chain[:-1]):
+                continue
+            table = dest.get_firewall_table()
+            groups.setdefault(id(table), (table, []))[1].append(i)
+
+        allowed = np.zeros(len(dests), dtype=bool)
+        for table, indices in groups.values():
+            names = table.allowed_dests(src_scopes, port, proto)
+            if names is None:
+                allowed[indices] = True
+            elif names:
+                allowed[indices] = [
+                    not names.isdisjoint(dests[i].get_scope_names()) for i in indices
+                ]
+        return allowed
 
     def add_host_to_subnet(
         self, name: str, subnet: Subnet, host_type: HostType | None, **kwargs
@@ -640,25 +899,30 @@ class Network:
         :param str name:
         :param Subnet subnet:
         :param HostType type:
-        :param list[FirewallRule] **firewall_rules:
+        :param list[FirewallRule] **firewall_rules: defaults to the same
+            'allow all' rule as hosts from the network config
         :param list[Service] **services:
         """
+        firewall_rules = kwargs.get("firewall_rules")
+        if firewall_rules is None:
+            firewall_rules = default_firewall_rules()
         host = Host(
             name,
             subnet,
             host_type,
-            firewall_rules=kwargs.get("firewall_rules", []),
+            firewall_rules=firewall_rules,
             services=kwargs.get("services"),
         )
+        # set decoy status before indexing the host
+        host.decoy = kwargs.get("decoy", False)
+        host.interfaces = kwargs.get("interfaces", [])
         # add host to graph
         self.add_node(host)
         # connect node to parent subnet
         self.connect_nodes(host.name, subnet.name)
         # assign IP, DNS, route for subnet, and default route
         host.get_dhcp_lease()
-        # set decoy status
-        host.decoy = kwargs.get("decoy", False)
-        host.interfaces = kwargs.get("interfaces", [])
+        self._publish_host_event(HOST_ADDED, host)
         return host
 
     def initialize_interfacing(self):
@@ -674,12 +938,11 @@ class Network:
         # release DHCP lease
         if host.ip_address is not None:
             ip: ipa.IPv4Address | ipa.IPv6Address = host.ip_address
-            host.subnet.available_ips.append(ip)
-        if host in self.get_hosts():
+            host.subnet.release_dhcp_lease(ip)
+        if host.name in self._hosts:
             self.remove_node(host)
             host.subnet.remove_connected_host(host)
-        # TODO
-        pass
+            self._publish_host_event(HOST_REMOVED, host)
 
     def create_decoy_host(self, *args, **kwargs) -> Host:
         """
@@ -696,16 +959,9 @@ class Network:
         return host
 
     def remove_decoy_host(self, host: Host) -> None:
-        for _, h in self.graph.nodes(data="data"):
-            if not isinstance(h, Host):
-                continue
-            if h.name == host.name:
-                self.remove_host_from_subnet(host)
-                break
-        for i in range(len(self.decoys)):
-            if self.decoys[i].name == host.name:
-                break
-        self.decoys.remove(i)
+        if host.name in self._hosts:
+            self.remove_host_from_subnet(host)
+        self.decoys = [d for d in self.decoys if d.name != host.name]
 
     def reset(self):
         for decoy in self.decoys:
@@ -718,11 +974,10 @@ class Network:
 
         self.isolated_hosts = []
 
-        for host in self.get_all_hosts():
-            host.command_history = []
-            host.is_compromised = False
-            host.isolated = False  # For isolate action
-            host.restored = False
+        # only hosts touched during the episode need their state cleared
+        dirty = self.host_state.pop_dirty()
+        self.host_state.clear(dirty)
+        self.host_state.commands.clear()
 
     @staticmethod
     def create_host_type_from_json(name: str, config_file: PathLike) -> HostType:
@@ -766,58 +1021,19 @@ class Network:
         return HostType(name=name, services=service_objects, decoy=decoy, os=os)
 
     @staticmethod
-    def create_host_type_from_yaml(name: str, config_file: PathLike, types) -> HostType:
+    def create_host_type_from_yaml(name: str, config_file: PathLike, types=None) -> HostType:
         """
         Return a matching HostType object from yaml file
 
+        HostTypes are interned by HostTypeCatalog, so repeated calls for the
+        same type return the same object without re-reading any config file.
+
         :param str name: host type name to match against
         :param str config_file: YAML config file path
-        :raises HostTypeNotFoundError:
+        :param dict types: unused, kept for backwards compatibility
         :returns HostType:
         """
-
-        # print(config_file)
-
-        # match name to defined host_type name
-        host_type = {}
-        host_type_name = ""
-        for k, v in types.items():
-            if k == name.lower():
-                host_type_name = k
-                host_type = v
-
-        if "host_type" not in locals():
-            msg = f"Host type ({name}) not found in config file ({config_file})"
-            raise HostTypeNotFoundError(value=name, message=msg)
-
-        services_list = host_type.get("services", [])
-
-        windows_services = {}
-        config_dir = files("cyberwheel.resources.configs.services")
-        config_file_path: PosixPath = config_dir.joinpath(
-            "windows_exploitable_services.yaml"
-        )  # type:ignore
-        with open(config_file_path, "r") as f:
-            windows_services = yaml.safe_load(f)
-
-        cve_list = set()
-        running_services = []
-        for service in services_list:
-            temp_service = Service.create_service_from_yaml(windows_services, service)
-            running_services.append(temp_service)
-            cve_list.update(temp_service.vulns)
-        decoy: bool = host_type.get("decoy", False)
-        os: str = host_type.get("os", "")
-
-        host_type = HostType(
-            name=host_type_name,
-            services=running_services,
-            decoy=decoy,
-            os=os,
-            cve_list=cve_list,
-        )
-
-        return host_type
+        return HostTypeCatalog.get_catalog(config_file).get_host_type(name)
 
 
 class HostTypeNotFoundError(Exception):
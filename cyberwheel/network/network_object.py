@@ -1,6 +1,7 @@
 import ipaddress as ipa
+import weakref
 from pydantic import BaseModel
-from typing import Generator, List
+from typing import Generator, Iterable, List
 
 
 class Route(BaseModel):
@@ -11,12 +12,43 @@ class Route(BaseModel):
         return hash((self.dest, self.via))
 
 
-# Not using this just yet
-class RoutingTable(BaseModel):
-    routes: set[Route]
+class RoutingTable:
+    """
+    Set of routes indexed for longest-prefix-match lookups.
+
+    Routes are bucketed by IP version and prefix length, keyed by the integer
+    value of their network address. A lookup masks the destination once per
+    distinct prefix length (longest first) and does a dict lookup, so it costs
+    at most 33 (IPv4) or 129 (IPv6) probes no matter how many routes exist.
+    """
+    def __init__(self, routes: Iterable[Route] = ()):
+        self.routes: set[Route] = set()
+        # version -> prefixlen -> network address as int -> route
+        self._buckets: dict[int, dict[int, dict[int, Route]]] = {4: {}, 6: {}}
+        # version -> [(prefixlen, netmask as int)], longest prefix first
+        self._prefixes: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+        for route in routes:
+            self.add_route(route)
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def __repr__(self) -> str:
+        return f"RoutingTable(routes={self.routes!r})"
 
     def add_route(self, route: Route) -> None:
+        if route in self.routes:
+            return
         self.routes.add(route)
+        dest = route.dest
+        buckets = self._buckets[dest.version]
+        if dest.prefixlen not in buckets:
+            buckets[dest.prefixlen] = {}
+            prefixes = self._prefixes[dest.version]
+            prefixes.append((dest.prefixlen, int(dest.netmask)))
+            prefixes.sort(reverse=True)
+        # the first route added for a destination network wins
+        buckets[dest.prefixlen].setdefault(int(dest.network_address), route)
 
     def get_routes(self) -> set[Route]:
         return self.routes
@@ -25,6 +57,20 @@ class RoutingTable(BaseModel):
         for route in self.routes:
             yield route
 
+    def lookup(self, ip: ipa.IPv4Address | ipa.IPv6Address) -> Route | None:
+        '''
+        Returns the most specific route containing ip, or None
+
+        :param (IPv4Address | IPv6Address) ip: destination IP object
+        '''
+        buckets = self._buckets[ip.version]
+        address = int(ip)
+        for prefixlen, netmask in self._prefixes[ip.version]:
+            route = buckets[prefixlen].get(address & netmask)
+            if route is not None:
+                return route
+        return None
+
 
 class FirewallRule(BaseModel):
     name: str = 'allow all'
@@ -43,6 +89,123 @@ class FirewallRule(BaseModel):
         return False
 
 
+def default_firewall_rules() -> list[FirewallRule]:
+    '''
+    Returns the rules given to hosts that don't define any: a single
+    'allow all' rule covering every protocol, so ICMP reaches them too
+    '''
+    return [FirewallRule(proto='all')]
+
+
+class FirewallTable:
+    """
+    Precompiled form of a NetworkObject's firewall rules.
+
+    Rules are indexed by (src, port, proto) with the set of dest names each
+    one allows, so a decision is a handful of dict lookups instead of a walk
+    over every rule. An empty rule list allows all traffic.
+
+    Tables built with compile() are shared by every object with equivalent
+    rules, so a decision for many destinations only needs to evaluate each
+    distinct table once (see allowed_dests).
+    """
+    ALL = 'all'
+    _interned: 'weakref.WeakValueDictionary[frozenset, FirewallTable]' = weakref.WeakValueDictionary()
+
+    def __init__(self, rules: list):
+        self.allow_all = not rules
+        self.index: dict[tuple[str, str, str], set[str]] = {}
+        for rule in rules:
+            key = (
+                str(_rule_field(rule, 'src', self.ALL)),
+                str(_rule_field(rule, 'port', self.ALL)),
+                str(_rule_field(rule, 'proto', 'tcp')),
+            )
+            self.index.setdefault(key, set()).add(
+                str(_rule_field(rule, 'dest', self.ALL))
+            )
+        self.signature = frozenset(
+            key + (dest,) for key, dests in self.index.items() for dest in dests
+        )
+
+    @classmethod
+    def compile(cls, rules: list) -> 'FirewallTable':
+        '''
+        Returns the table for rules, reusing a live table compiled from
+        equivalent rules if there is one
+
+        :param list rules: FirewallRule objects or dicts
+        '''
+        table = cls(rules)
+        return cls._interned.setdefault(table.signature, table)
+
+    def _matching_dests(self,
+                        src_scopes: tuple[str, ...],
+                        port: str,
+                        proto: str) -> Generator[set[str], None, None]:
+        index = self.index
+        for src in src_scopes + (self.ALL,):
+            for rule_port in (port, self.ALL):
+                for rule_proto in (proto, self.ALL):
+                    dests = index.get((src, rule_port, rule_proto))
+                    if dests is not None:
+                        yield dests
+
+    def allows(self,
+               src_scopes: tuple[str, ...],
+               dest_scopes: tuple[str, ...],
+               port: str,
+               proto: str) -> bool:
+        '''
+        Returns True if any rule matches the traffic
+
+        :param tuple[str] src_scopes: names the source is known by (host, subnet, router)
+        :param tuple[str] dest_scopes: names the destination is known by
+        :param str port: destination port as str (i.e. '443' or 'None' for icmp)
+        :param str proto: protocol
+        '''
+        if self.allow_all:
+            return True
+        for dests in self._matching_dests(src_scopes, port, proto):
+            if self.ALL in dests:
+                return True
+            for dest in dest_scopes:
+                if dest in dests:
+                    return True
+        return False
+
+    def allowed_dests(self,
+                      src_scopes: tuple[str, ...],
+                      port: str,
+                      proto: str) -> set[str] | None:
+        '''
+        Returns the dest names the traffic is allowed to, or None if it is
+        allowed to every destination. A destination is allowed if any of its
+        scope names is in the returned set.
+
+        :param tuple[str] src_scopes: names the source is known by (host, subnet, router)
+        :param str port: destination port as str (i.e. '443' or 'None' for icmp)
+        :param str proto: protocol
+        '''
+        if self.allow_all:
+            return None
+        allowed = set()
+        for dests in self._matching_dests(src_scopes, port, proto):
+            if self.ALL in dests:
+                return None
+            allowed |= dests
+        return allowed
+
+
+def _rule_field(rule, field: str, default):
+    # rules may be FirewallRule objects or plain dicts from config files
+    if isinstance(rule, dict):
+        value = rule.get(field)
+    else:
+        value = getattr(rule, field, None)
+    return default if value is None else value
+
+
 class NetworkObject:
     """
     Base class for host, subnet, and router objects
@@ -56,7 +219,7 @@ class NetworkObject:
         self.firewall_rules = firewall_rules
         self.is_compromised = False
         self.default_route = None
-        self.routes = set()
+        self.routing_table = RoutingTable()
 
 
     def __eq__(self, other: object) -> bool:
@@ -65,13 +228,107 @@ class NetworkObject:
         return False
 
 
+    def __getattr__(self, name: str):
+        # only called for attributes missing from __dict__: a fork reads
+        # them from the object it was forked from
+        base = self.__dict__.get('_fork_base')
+        if base is None:
+            raise AttributeError(
+                f'{type(self).__name__!r} object has no attribute {name!r}'
+            )
+        return getattr(base, name)
+
+
+    def fork(self, **overlay):
+        '''
+        Returns a copy-on-write view of this object
+
+        The view only stores the attributes given in overlay and the ones
+        later assigned on it; every other attribute is read from this object.
+        Containers that aren't in the overlay are shared, not copied.
+
+        :param **overlay: attributes the view owns from the start
+        '''
+        view = object.__new__(type(self))
+        view.__dict__['_fork_base'] = self
+        view.__dict__['name'] = self.name
+        view.__dict__.update(overlay)
+        return view
+
+
+    @property
+    def firewall_rules(self) -> list:
+        return self._firewall_rules
+
+
+    @firewall_rules.setter
+    def firewall_rules(self, rules) -> None:
+        # copy so objects never share (and mutate) a default rule list
+        self._firewall_rules = list(rules) if rules else []
+        self._firewall_table = None
+
+
+    @property
+    def routes(self) -> set[Route]:
+        return self.routing_table.get_routes()
+
+
+    @routes.setter
+    def routes(self, routes: Iterable[Route]) -> None:
+        self.routing_table = RoutingTable(routes)
+
+
+    def get_firewall_table(self) -> FirewallTable:
+        '''
+        Returns the compiled firewall rules, compiling them on first use
+        '''
+        if self._firewall_table is None:
+            self._firewall_table = FirewallTable.compile(self._firewall_rules)
+        return self._firewall_table
+
+
+    def get_scope_names(self) -> tuple[str, ...]:
+        '''
+        Returns the names firewall rules can refer to this object by
+        '''
+        return (self.name,)
+
+
+    def allows_traffic(self,
+                       src_scopes: tuple[str, ...],
+                       port: str,
+                       proto: str) -> bool:
+        '''
+        Checks this object's firewall for traffic addressed to it
+
+        :param tuple[str] src_scopes: scope names of the traffic source
+        :param str port: destination port as str
+        :param str proto: protocol
+        '''
+        return self.get_firewall_table().allows(
+            src_scopes, self.get_scope_names(), port, proto
+        )
+
+
+    def _own_firewall_rules(self) -> list:
+        '''
+        Returns this object's rule list for mutation. A fork copies the list
+        of the object it was forked from first, so it never edits rules (or
+        leaves a stale compiled table) on that object.
+        '''
+        if '_firewall_rules' not in self.__dict__:
+            self._firewall_rules = list(self._firewall_rules)
+        return self._firewall_rules
+
+
     def add_firewall_rule(self, rule: FirewallRule) -> None:
         '''
         Adds new firewall rule
 
         :param FirewallRule rule: firewall rule
         '''
-        self.firewall_rules.append(rule)
+        self._own_firewall_rules().append(rule)
+        self._firewall_table = None
 
 
     def add_firewall_rules(self, rules: list[FirewallRule]) -> None:
@@ -80,7 +337,8 @@ class NetworkObject:
 
         :param list[FirewallRule] rules: list of firewall rule(s)
         '''
-        self.firewall_rules.extend(rules)
+        self._own_firewall_rules().extend(rules)
+        self._firewall_table = None
 
 
     # TODO: refactor for FirewallRule
@@ -91,7 +349,7 @@ class NetworkObject:
         :param str rule_name: name of existing fw rule
         """
         updated_rules = [rule for rule in self.firewall_rules if
-                rule.name != rule_name]
+                _rule_field(rule, 'name', None) != rule_name]
 
         # update firewall rules
         self.firewall_rules = updated_rules
@@ -144,13 +402,14 @@ class NetworkObject:
 
 
     def add_route(self, route: Route) -> None:
-        self.routes.add(route)
+        self.routing_table.add_route(route)
 
 
-    def get_routes(self):
+    def get_routes(self) -> set[Route]:
         # should the default route be preppended to this list?
-        routes = self.routes
-        routes.add(self.default_route)
+        routes = set(self.routing_table.get_routes())
+        if self.default_route is not None:
+            routes.add(self.default_route)
         return routes
 
 
@@ -189,18 +448,9 @@ class NetworkObject:
         :param (IPv4Address | IPv6Address) dest_ip: destination IP object
         :returns (IPv4Address | IPv6Address):
         '''
-        # sort routes
-        routes = sorted(list(self.routes))
-
-        # reverse list because ipaddress' logical operators are weird
-        # and sort by subnet mask bits instead of number of ips in subnet
-        # i.e. this should give us a list with smallest subnets first
-        routes.reverse()
-
-        # find most specific match in routes
-        for route in routes:
-            if dest_ip in route.dest.hosts():
-                return route.via
+        route = self.routing_table.lookup(dest_ip)
+        if route is not None:
+            return route.via
 
-        # return default_route if no matche
+        # return default_route if no match
         return self.default_route.via #type: ignore
@@ -57,5 +57,5 @@ class Router(NetworkObject):
 
 
     def add_subnet_interface(self, subnet) -> None:
-        ip = subnet.available_ips.pop(0)
+        ip = subnet.available_ips.lease_first()
         self.set_interface_ip(subnet.name, ip)
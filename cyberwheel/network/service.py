@@ -42,6 +42,10 @@ class Service(BaseModel):
     description: str | None = None
     decoy: bool | None = False
 
+    class Config:
+        # let HostTypes hold the interned Service objects instead of copies
+        copy_on_model_validation = "none"
+
     def __key(self):
         return (
             self.name,
@@ -1,5 +1,5 @@
 import ipaddress as ipa
-import random
+from .ip_pool import IPPool
 from .network_object import NetworkObject, Route
 from typing import Union, List
 #from .host import Host  # this is causing circular import issues
@@ -42,7 +42,8 @@ class Subnet(NetworkObject):
             print("ip_range does not represent a valid IPv4 or IPv6 address")
             raise e
         self.ip_range = ip_range
-        self.available_ips = [ip for ip in self.ip_network.hosts()]
+        # unassigned IPs are tracked lazily instead of materializing hosts()
+        self.available_ips = IPPool(self.ip_network)
         self.connected_hosts = []
         self.router = router
 
@@ -70,12 +71,16 @@ class Subnet(NetworkObject):
         return str
     
     def __deepcopy__(self, memo):
-        new_subnet = Subnet(name=self.name, ip_range=self.ip_range, router=self.router)
+        new_subnet = Subnet(name=self.name, ip_range=self.ip_range, router=self.router,
+                            firewall_rules=self.firewall_rules)
         memo[id(self)] = new_subnet
         # Deep copy hosts
         new_subnet.connected_hosts = [deepcopy(host, memo) for host in self.connected_hosts]
         return new_subnet
     
+    def get_scope_names(self) -> tuple[str, ...]:
+        return (self.name, self.router.name)
+
     def set_default_route(self):
         default_route_via = self.router.get_interface_ip(self.name)
         ip_version = default_route_via.version #type:ignore
@@ -106,7 +111,11 @@ class Subnet(NetworkObject):
         """
         return self.ip_network.num_addresses - 2
 
-    def get_unassigned_ips(self) -> list:
+    def get_unassigned_ips(self) -> IPPool:
+        """
+        Returns a lazy view of the unassigned IPs. Iterating it yields
+        IP objects in ascending order.
+        """
         return self.available_ips
 
     def get_num_unassigned_ips(self) -> int:
@@ -121,8 +130,7 @@ class Subnet(NetworkObject):
         :param Host host_obj: host requesting lease
         '''
         # get random IP from self.available_ips
-        ip_lease = random.choice(self.available_ips)
-        self.available_ips.remove(ip_lease)
+        ip_lease = self.available_ips.lease_random()
 
         # update connected hosts
         self.connected_hosts.append(host_obj)
@@ -140,6 +148,14 @@ class Subnet(NetworkObject):
         if host_obj.default_route is None:
             host_obj.default_route = self.default_route
 
+    def release_dhcp_lease(self, ip: ipa.IPv4Address | ipa.IPv6Address) -> None:
+        '''
+        Return a leased IP to the pool of unassigned IPs
+
+        :param (IPv4Address | IPv6Address) ip: IP to release
+        '''
+        self.available_ips.release(ip)
+
     def get_connected_hosts(self) -> list:
         return self.connected_hosts
 
@@ -6,26 +6,73 @@ from cyberwheel.network.host import Host
 from cyberwheel.observation.observation import Observation
 
 class HistoryObservation(Observation):
-    def __init__(self, shape: int, mapping: Dict[Host, int]) -> None:
+    """
+    Observation with two halves of one entry per host: the first half flags
+    the hosts alerted on this step, the second half every host alerted so far
+    this episode.
+    """
+    def __init__(
+        self,
+        shape: int,
+        mapping: Dict[Host, int],
+        out: np.ndarray | None = None,
+        dtype=np.float32,
+    ) -> None:
+        """
+        :param int shape: shape of the observation vector
+        :param Dict[str, int] mapping: host name to index in the first half
+        :param np.ndarray out: optional preallocated buffer to write observations
+            into, e.g. a row of a batched observation array
+        :param dtype: dtype of the observation vector if out is not given
+        """
         self.shape = shape
         self.mapping = mapping
-        self.obs_vec = np.zeros(shape)
+        if out is None:
+            out = np.zeros(shape, dtype=dtype)
+        elif out.shape != tuple(np.atleast_1d(shape)):
+            raise ValueError(f"buffer shape {out.shape} doesn't match {shape}")
+        else:
+            out[:] = 0
+        self.obs_vec = out
+        self.barrier = out.size // 2
+
+    def alert_indices(self, alerts: Iterable[Alert]) -> np.ndarray:
+        """Returns the indices of the hosts alerted on, skipping unmapped hosts"""
+        get = self.mapping.get
+        indices = [get(alert.src_host.name) for alert in alerts]
+        return np.array([i for i in indices if i is not None], dtype=np.intp)
 
     def create_obs_vector(self, alerts: Iterable[Alert]) -> Iterable:
         # Refresh the non-history portion of the obs_vec
-        obs_length = len(self.obs_vec)
-        barrier = obs_length // 2
-        for i in range(barrier):
-            self.obs_vec[i] = 0
-        for alert in alerts:
-            alerted_host = alert.src_host
-            if alerted_host.name not in self.mapping:
-                continue
-            index = self.mapping[alerted_host.name]
-            self.obs_vec[index] = 1
-            self.obs_vec[index + barrier] = 1
+        self.obs_vec[: self.barrier] = 0
+        indices = self.alert_indices(alerts)
+        if indices.size:
+            self.obs_vec[indices] = 1
+            self.obs_vec[indices + self.barrier] = 1
         return self.obs_vec
 
+    @staticmethod
+    def create_obs_batch(out: np.ndarray, alert_indices: list[np.ndarray]) -> np.ndarray:
+        """
+        Does create_obs_vector() for a batch of episodes at once: row i of out
+        is the observation of the episode whose alerted hosts are
+        alert_indices[i]. Clears the per-step half of every row and sets all
+        alerted entries with one scatter per half.
+
+        :param np.ndarray out: (num_episodes, shape) stacked observations
+        :param list[np.ndarray] alert_indices: alert_indices() of each episode
+        """
+        barrier = out.shape[1] // 2
+        out[:, :barrier] = 0
+        counts = [len(indices) for indices in alert_indices]
+        if sum(counts):
+            rows = np.repeat(np.arange(len(alert_indices)), counts)
+            cols = np.concatenate(alert_indices)
+            out[rows, cols] = 1
+            out[rows, cols + barrier] = 1
+        return out
+
     def reset_obs_vector(self) -> Iterable:
-        self.obs_vec = np.zeros(self.shape)
-        return self.obs_vec
\ No newline at end of file
+        # clear in place so a caller-provided buffer stays in use
+        self.obs_vec[:] = 0
+        return self.obs_vec
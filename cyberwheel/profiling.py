@@ -0,0 +1,120 @@
+"""
+Lightweight wall-clock instrumentation for the environment hot path.
+
+Profiling is off unless the CYBERWHEEL_PROFILE environment variable is set to
+a non-empty value other than "0"/"false". While it is off, `PROFILER.timer()`
+returns a shared no-op context manager, so instrumented code pays only for
+the call.
+
+Timings are recorded per phase name, e.g. "step/red_action" or
+"detector/d1", and exported to TensorBoard with `PROFILER.write(writer, step)`.
+"""
+import os
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+import numpy as np
+
+PROFILE_ENV_VAR = "CYBERWHEEL_PROFILE"
+
+_NULL_TIMER = nullcontext()
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV_VAR, "").lower() not in ("", "0", "false")
+
+
+class _Timer:
+    __slots__ = ("samples", "start")
+
+    def __init__(self, samples: list):
+        self.samples = samples
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+        return False
+
+
+class TimerRegistry:
+    """
+    Collects wall time samples (in seconds) per phase name.
+    """
+
+    def __init__(self, enabled: bool | None = None):
+        """
+        :param bool enabled: turn recording on or off. Defaults to the
+            CYBERWHEEL_PROFILE environment variable.
+        """
+        self.enabled = profiling_enabled() if enabled is None else enabled
+        self.samples: defaultdict[str, list[float]] = defaultdict(list)
+
+    def timer(self, name: str):
+        """
+        Returns a context manager that records the time spent inside it under name
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.samples[name])
+
+    def record(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.samples[name].append(seconds)
+
+    def drain(self) -> dict[str, list[float]]:
+        """
+        Returns the samples collected so far and starts over. Vector envs
+        running in subprocesses return this through `envs.call("drain_profile")`.
+        """
+        samples = dict(self.samples)
+        self.samples = defaultdict(list)
+        return samples
+
+    def merge(self, samples: dict[str, list[float]]) -> None:
+        for name, values in samples.items():
+            self.samples[name].extend(values)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Returns count, total, mean and p95 (seconds) per phase
+        """
+        summary = {}
+        for name, values in self.samples.items():
+            if not values:
+                continue
+            array = np.asarray(values)
+            summary[name] = {
+                "count": array.size,
+                "total": float(array.sum()),
+                "mean": float(array.mean()),
+                "p95": float(np.percentile(array, 95)),
+            }
+        return summary
+
+    def write(self, writer, global_step: int, prefix: str = "profile") -> None:
+        """
+        Writes the summary() of every phase (call count and mean, total and p95
+        milliseconds) and a histogram of milliseconds to a TensorBoard
+        SummaryWriter, then clears the samples.
+
+        :param SummaryWriter writer: the training run's writer
+        :param int global_step: step to log the values at
+        :param str prefix: tag prefix
+        """
+        for name, stats in self.summary().items():
+            writer.add_scalar(f"{prefix}/{name}/calls", stats["count"], global_step)
+            writer.add_scalar(f"{prefix}/{name}/mean_ms", stats["mean"] * 1000.0, global_step)
+            writer.add_scalar(f"{prefix}/{name}/total_ms", stats["total"] * 1000.0, global_step)
+            writer.add_scalar(f"{prefix}/{name}/p95_ms", stats["p95"] * 1000.0, global_step)
+            writer.add_histogram(
+                f"{prefix}/{name}", np.asarray(self.samples[name]) * 1000.0, global_step
+            )
+        self.samples = defaultdict(list)
+
+
+# process-wide registry used by the environment and detectors
+PROFILER = TimerRegistry()
@@ -1,7 +1,8 @@
 from cyberwheel.red_actions.red_base import ARTAction
 from cyberwheel.network.host import Host
 
-import cyberwheel.red_actions.art_techniques as art_techniques
+from cyberwheel.red_actions.technique import Technique
+from cyberwheel.red_actions.technique_catalog import technique_mapping
 import random
 
 
@@ -222,10 +223,20 @@ class ARTKillChainPhase(ARTAction):
         super().__init__(src_host, target_host)
         self.valid_techniques = valid_techniques
 
+    @staticmethod
+    def run_atomic_test(host: Host, art_technique: Technique, privilege: str) -> tuple[str, ...]:
+        """
+        Runs a random atomic test of art_technique that supports host's OS on
+        host, and returns the commands it ran.
+        """
+        chosen_test = random.choice(art_technique.get_atomic_tests(host.os))
+        for p in chosen_test.commands:
+            host.run_command(chosen_test.executor, p, privilege)
+        return chosen_test.commands
+
     def sim_execute(self):
         self.action_results.detector_alert.add_src_host(self.src_host)
         host = self.target_host
-        host_os = host.os
         self.action_results.modify_alert(dst=host)
 
         if len(self.valid_techniques) > 0:
@@ -233,24 +244,8 @@ class ARTKillChainPhase(ARTAction):
             mitre_id = random.choice(
                 self.valid_techniques
             )  # Change to look for depending on service
-            art_technique = art_techniques.technique_mapping[mitre_id]
-
-            processes = []
-            valid_tests = [
-                at
-                for at in art_technique.atomic_tests
-                if host_os in at.supported_platforms
-            ]
-            chosen_test = random.choice(valid_tests)
-            # Get prereq command, prereq command (if dependency). then run executor command(s) and cleanup command.
-            for dep in chosen_test.dependencies:
-                processes.extend(dep.get_prerequisite_command)
-                processes.extend(dep.prerequisite_command)
-            if chosen_test.executor != None:
-                processes.extend(chosen_test.executor.command)
-                processes.extend(chosen_test.executor.cleanup_command)
-            for p in processes:
-                host.run_command(chosen_test.executor, p, "root")
+            art_technique = technique_mapping[mitre_id]
+            processes = self.run_atomic_test(host, art_technique, "root")
             self.action_results.add_metadata(
                 host.name,
                 {
@@ -296,24 +291,10 @@ class ARTPingSweep(ARTKillChainPhase):
         host = self.target_host
         self.action_results.modify_alert(dst=host)
 
-        host_os = host.os
         action_type = self.name
-        art_technique = art_techniques.technique_mapping["T1018"]
+        art_technique = technique_mapping["T1018"]
         mitre_id = art_technique.mitre_id
-        processes = []
-        valid_tests = [
-            at for at in art_technique.atomic_tests if host_os in at.supported_platforms
-        ]
-        chosen_test = random.choice(valid_tests)
-        # Get prereq command, prereq command (if dependency). then run executor command(s) and cleanup command.
-        for dep in chosen_test.dependencies:
-            processes.extend(dep.get_prerequisite_command)
-            processes.extend(dep.prerequisite_command)
-        if chosen_test.executor != None:
-            processes.extend(chosen_test.executor.command)
-            processes.extend(chosen_test.executor.cleanup_command)
-        for p in processes:
-            host.run_command(chosen_test.executor, p, "user")
+        processes = self.run_atomic_test(host, art_technique, "user")
 
         self.action_results.add_successful_action()
         self.action_results.add_metadata(
@@ -372,24 +353,10 @@ class ARTPortScan(ARTKillChainPhase):
         host = self.target_host
         self.action_results.modify_alert(dst=host)
 
-        host_os = host.os
         action_type = self.name
-        art_technique = art_techniques.technique_mapping["T1046"]
+        art_technique = technique_mapping["T1046"]
         mitre_id = art_technique.mitre_id
-        processes = []
-        valid_tests = [
-            at for at in art_technique.atomic_tests if host_os in at.supported_platforms
-        ]
-        chosen_test = random.choice(valid_tests)
-        # Get prereq command, prereq command (if dependency). then run executor command(s) and cleanup command.
-        for dep in chosen_test.dependencies:
-            processes.extend(dep.get_prerequisite_command)
-            processes.extend(dep.prerequisite_command)
-        if chosen_test.executor != None:
-            processes.extend(chosen_test.executor.command)
-            processes.extend(chosen_test.executor.cleanup_command)
-        for p in processes:
-            host.run_command(chosen_test.executor, p, "user")
+        processes = self.run_atomic_test(host, art_technique, "user")
         self.action_results.add_successful_action()
         self.action_results.add_metadata(
             host.name,
@@ -199,6 +199,17 @@ class AtomicTest:
         else:
             self.dependencies = []
 
+        # Flattened command sequence run by the test: each dependency's get-prereq
+        # and prereq commands, then the executor's command(s) and cleanup command.
+        commands = []
+        for dep in self.dependencies:
+            commands.extend(dep.get_prerequisite_command)
+            commands.extend(dep.prerequisite_command)
+        if self.executor != None:
+            commands.extend(self.executor.command)
+            commands.extend(self.executor.cleanup_command)
+        self.commands: tuple[str, ...] = tuple(commands)
+
     def __str__(self):
         return f"""
         -------------------------------------------------------------
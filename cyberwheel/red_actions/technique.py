@@ -44,7 +44,9 @@ class Technique:
         self.kill_chain_phases = kill_chain_phases
         self.data_source_platforms = data_source_platforms
         self.mitigations = mitigations
-        self.description = description.decode("utf-8")
+        self.description = (
+            description.decode("utf-8") if isinstance(description, bytes) else description
+        )
         self.atomic_tests = [AtomicTest(at) for at in atomic_tests]
         self.is_subtechnique = "." in self.mitre_id
         self.parent_technique = (
@@ -55,6 +57,18 @@ class Technique:
         )
         self.cwe_list = cwe_list
         self.cve_list = cve_list
+        # OS -> atomic tests that support it, resolved once per technique
+        self.atomic_tests_by_os = {
+            os: tuple(at for at in self.atomic_tests if os in at.supported_platforms)
+            for os in self.supported_os
+        }
+
+    def get_atomic_tests(self, os: str) -> tuple[AtomicTest, ...]:
+        """
+        Returns the atomic tests that can run on os. Each test's `commands` holds
+        its flattened command sequence.
+        """
+        return self.atomic_tests_by_os.get(os, ())
 
     def get_parent_technique(self) -> str:
         return self.parent_technique
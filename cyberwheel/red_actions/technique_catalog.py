@@ -0,0 +1,211 @@
+"""
+Catalog of the Atomic Red Team techniques described in resources/metadata.
+
+The metadata JSON files are parsed once and compiled into an index file
+(cyberwheel/snapshots/art_techniques.snapshot by default) that holds one
+pickled record per technique plus a table of byte offsets and CVE sets. The
+index is memory mapped, so forked workers share its pages, and a `Technique`
+is only unpickled and built the first time its MITRE id is looked up.
+
+    from cyberwheel.red_actions.technique_catalog import technique_mapping
+    technique_mapping["T1018"].atomic_tests
+"""
+from collections.abc import Mapping
+from importlib.resources import files
+import hashlib
+import json
+import mmap
+import os
+from os import PathLike
+from pathlib import Path
+import pickle
+import tempfile
+from typing import Dict, Iterator, Tuple
+
+from cyberwheel.red_actions.technique import Technique
+
+# Bump whenever the layout of the index changes so that old indexes are rebuilt
+CATALOG_VERSION = 1
+
+METADATA_FILES = (
+    "combined_art_techniques.json",
+    "attack_to_cwe.json",
+    "cwe_to_cve.json",
+)
+
+
+def _cwes_for(mitre_id: str, mitre_to_cwe: dict) -> list:
+    # attack_to_cwe is keyed by ids without the leading 'T'. Subtechniques
+    # without their own entry inherit the CWEs of their parent technique.
+    mid = mitre_id.replace("T", "")
+    pid = mid.split(".")[0]
+    if mid in mitre_to_cwe:
+        return mitre_to_cwe[mid]
+    return mitre_to_cwe.get(pid, [])
+
+
+class TechniqueCatalog(Mapping):
+    """
+    Read-only mapping of MITRE technique id to `Technique`.
+
+    Technique objects are created lazily and cached, so every lookup of an id
+    returns the same object. CVE lists are frozensets and identical sets are
+    shared between techniques. `cve_list(mitre_id)` returns a technique's CVEs
+    without building the Technique.
+    """
+
+    def __init__(
+        self,
+        metadata_dir: PathLike | None = None,
+        index_path: PathLike | None = None,
+    ):
+        """
+        :param PathLike metadata_dir: directory with the metadata JSON files,
+            defaults to cyberwheel/resources/metadata
+        :param PathLike index_path: compiled index path, defaults to
+            cyberwheel/snapshots/art_techniques.snapshot
+        """
+        if metadata_dir is None:
+            metadata_dir = files("cyberwheel.resources.metadata")  # type: ignore
+        else:
+            metadata_dir = Path(metadata_dir)
+        if index_path is None:
+            index_path = files("cyberwheel.snapshots").joinpath("art_techniques.snapshot")  # type: ignore
+        self.metadata_dir = metadata_dir
+        self.index_path = index_path
+        self._table: Dict[str, Tuple[int, int, frozenset]] | None = None
+        self._data: memoryview | bytes = b""
+        self._techniques: Dict[str, Technique] = {}
+
+    def index_hash(self) -> str:
+        """
+        Returns a content hash over the metadata files the index is built from
+        """
+        digest = hashlib.sha256(f"art-catalog-v{CATALOG_VERSION}".encode())
+        for name in METADATA_FILES:
+            with open(self.metadata_dir.joinpath(name), "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def compile_index(self) -> bytes:
+        """
+        Parses the metadata JSON files and writes the index to `index_path`.
+        If the index can't be written (e.g. read-only install), it is only
+        kept in memory.
+
+        :returns bytes: the technique records, addressed by the offset table
+        """
+
+        def load(name):
+            with open(self.metadata_dir.joinpath(name), "r") as f:
+                return json.load(f)
+
+        techniques = load("combined_art_techniques.json")
+        mitre_to_cwe = load("attack_to_cwe.json")
+        cwe_to_cve = load("cwe_to_cve.json")
+
+        interned: Dict[frozenset, frozenset] = {}
+        table = {}
+        blobs = []
+        offset = 0
+        for t in techniques.values():
+            mitre_id = t["external_id"]
+            cwe_list = _cwes_for(mitre_id, mitre_to_cwe)
+            cves = frozenset(cve for cwe in cwe_list for cve in cwe_to_cve.get(cwe, ()))
+            cves = interned.setdefault(cves, cves)
+            record = {
+                "mitre_id": mitre_id,
+                "name": t["name"],
+                "technique_id": t["technique_id"],
+                "data_components": t["data_components"],
+                "kill_chain_phases": t["kill_chain_phases"],
+                "data_source_platforms": t["data_source_platforms"],
+                "mitigations": t["mitigations"],
+                "description": t["description"],
+                "atomic_tests": t["atomic_tests"],
+                "cwe_list": cwe_list,
+            }
+            blob = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+            table[mitre_id] = (offset, len(blob), cves)
+            blobs.append(blob)
+            offset += len(blob)
+        data = b"".join(blobs)
+
+        header = {"version": CATALOG_VERSION, "hash": self.index_hash()}
+        # Workers may compile the index concurrently while others have it
+        # mapped. Write a temporary file and move it into place so readers
+        # keep the old inode instead of seeing a truncated file.
+        tmp_path = None
+        try:
+            directory = os.path.dirname(os.path.abspath(self.index_path))
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.write(data)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Could not write technique index {self.index_path}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self._table = table
+        return data
+
+    def _load(self) -> Dict[str, Tuple[int, int, frozenset]]:
+        """
+        Maps the index file, rebuilding it if it is missing or stale
+        """
+        if self._table is not None:
+            return self._table
+        try:
+            with open(self.index_path, "rb") as f:
+                header = pickle.load(f)
+                if (
+                    header.get("version") == CATALOG_VERSION
+                    and header.get("hash") == self.index_hash()
+                ):
+                    table = pickle.load(f)
+                    start = f.tell()
+                    if os.fstat(f.fileno()).st_size > start:
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        self._data = memoryview(data)[start:]
+                    self._table = table
+                    return table
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+            pass
+        self._data = self.compile_index()
+        return self._table  # type: ignore
+
+    def cve_list(self, mitre_id: str) -> frozenset:
+        """Returns the CVEs of mitre_id without creating its Technique"""
+        return self._load()[mitre_id][2]
+
+    def __getitem__(self, mitre_id: str) -> Technique:
+        technique = self._techniques.get(mitre_id)
+        if technique is None:
+            offset, length, cves = self._load()[mitre_id]
+            record = pickle.loads(self._data[offset : offset + length])
+            technique = Technique(cve_list=cves, **record)
+            self._techniques[mitre_id] = technique
+        return technique
+
+    def __contains__(self, mitre_id) -> bool:
+        return mitre_id in self._load()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __getstate__(self):
+        # Workers re-map the index instead of receiving a copy of it
+        state = self.__dict__.copy()
+        state["_table"] = None
+        state["_data"] = b""
+        return state
+
+
+# process-wide catalog, the drop-in replacement for art_techniques.technique_mapping
+technique_mapping = TechniqueCatalog()
@@ -2,8 +2,8 @@ from typing import Type, Any, Dict, Tuple, List
 from cyberwheel.red_actions.actions.art_killchain_phases import ARTDiscovery, ARTImpact, ARTKillChainPhase, ARTLateralMovement, ARTPingSweep, ARTPortScan, ARTPrivilegeEscalation
 from cyberwheel.red_agents.red_agent_base import KnownSubnetInfo, RedAgent, AgentHistory, KnownHostInfo, RedActionResults, HybridSetList
 from cyberwheel.red_agents.strategies import RedStrategy, ServerDowntime
-from cyberwheel.network.network_base import Network, Host
-from cyberwheel.red_actions import art_techniques
+from cyberwheel.network.network_base import HOST_REMOVED, Network, Host
+from cyberwheel.red_agents.technique_validity import TechniqueValidityIndex
 
 from cyberwheel.reward import RewardMap
 
@@ -85,85 +85,59 @@ class ARTAgent(RedAgent):
         self.unknowns = HybridSetList()
         self.strategy = red_strategy
         self.all_kcps = killchain + [ARTLateralMovement]
+        self.validity_index = TechniqueValidityIndex.get_index(self.all_kcps)
         if service_mapping == {}:
-            self.services_map = {}
-            self.tracked_hosts = set()
-            for host in self.network.get_all_hosts():
-                self.tracked_hosts.add(host.name)
-                self.services_map[host.name] = {}
-                for kcp in self.all_kcps:
-                    self.services_map[host.name][kcp] = []
-                    kcp_valid_techniques = kcp.validity_mapping[host.os][kcp.get_name()]
-                    for mid in kcp_valid_techniques:
-                        technique = art_techniques.technique_mapping[mid]
-                        if len(host.host_type.cve_list & technique.cve_list) > 0:
-                            self.services_map[host.name][kcp].append(mid)
+            self.services_map = self.validity_index.service_map(
+                self.network.get_all_hosts()
+            )
+            self.tracked_hosts = set(self.services_map.keys())
         else:
-            self.services_map = service_mapping
+            # shallow copy, new hosts must not leak into other agents' mappings
+            self.services_map = dict(service_mapping)
             self.tracked_hosts = set(service_mapping.keys())
+        self._host_events = self.network.subscribe_host_events()
     
     @classmethod
     def get_service_map(cls, network: Network):
         """
         Class function to get the service mapping based on host attributes.
+        Validity is computed once per host type, see TechniqueValidityIndex.
         """
         killchain = [ARTDiscovery, ARTPrivilegeEscalation, ARTImpact, ARTLateralMovement]
-        service_mapping = {}
-        for host in network.get_all_hosts():
-            service_mapping[host.name] = {}
-            for kcp in killchain:
-                service_mapping[host.name][kcp] = []
-                kcp_valid_techniques = kcp.validity_mapping[host.os][kcp.get_name()]
-                for mid in kcp_valid_techniques:
-                    technique = art_techniques.technique_mapping[mid]
-                    if len(host.host_type.cve_list & technique.cve_list) > 0:
-                        service_mapping[host.name][kcp].append(mid)
-        return service_mapping
+        return TechniqueValidityIndex.get_index(killchain).service_map(
+            network.get_all_hosts()
+        )
 
     def get_valid_techniques_by_host(self, host, all_kcps):
         """
         Returns service mapping for a given host and killchain phases.
         """
-        valid_techniques = {}
-        for kcp in all_kcps:
-            valid_techniques[kcp] = []
-            kcp_valid_techniques = kcp.validity_mapping[host.os][kcp.get_name()]
-            for mid in kcp_valid_techniques:
-                technique = art_techniques.technique_mapping[mid]
-                if len(host.host_type.cve_list & technique.cve_list) > 0:
-                    valid_techniques[kcp].append(mid)
-        return valid_techniques
+        valid_techniques = TechniqueValidityIndex.get_index(all_kcps).valid_techniques(host)
+        return dict(valid_techniques)
 
     def handle_network_change(self):
         """
         Does a 'check' at every step to initialize any newly added decoys to view.
+        Consumes the host added/removed events the network published since the
+        last step, so the cost is proportional to topology changes.
         """
-        current_hosts = set(self.network.get_host_names())
-
-        new_hosts = current_hosts - self.tracked_hosts
-
-        new_host = None
-        network_change = False
-        for host_name in new_hosts:
-            h: Host = self.network.get_node_from_name(host_name)
+        while self._host_events:
+            kind, h = self._host_events.popleft()
+            if kind == HOST_REMOVED:
+                self.tracked_hosts.discard(h.name)
+                continue
+            if not self.network.has_host(h.name):
+                continue  # removed again before this step
             self.services_map[h.name] = self.get_valid_techniques_by_host(
                 h, self.all_kcps
             )
-            scanned_subnets = [
-                self.history.mapping[s]
-                for s, v in self.history.subnets.items()
-                if v.is_scanned()
-            ]
-            if h.subnet in scanned_subnets:
-                network_change = True
-                new_host = h
             self.tracked_hosts.add(h.name)
-        if (
-            network_change and new_host != None
-        ):  # Add the new host to self.history if the subnet is scanned. Else do nothing.
-            self.history.mapping[new_host.name] = new_host
-            self.history.hosts[new_host.name] = KnownHostInfo()
-            self.unknowns.add(new_host.name)
+            # Add the new host to self.history if the subnet is scanned. Else do nothing.
+            subnet_info = self.history.subnets.get(h.subnet.name)
+            if subnet_info is not None and subnet_info.is_scanned():
+                self.history.mapping[h.name] = h
+                self.history.hosts[h.name] = KnownHostInfo()
+                self.unknowns.add(h.name)
 
     def select_next_target(self) -> Host:
         """
@@ -324,6 +298,16 @@ class ARTAgent(RedAgent):
         """
         Resets the red agent back to blank slate.
         """
+        if network is not self.network:
+            self.network.unsubscribe_host_events(self._host_events)
+            self._host_events = network.subscribe_host_events()
+            self.services_map.update(
+                self.validity_index.service_map(
+                    network.get_node_from_name(name)
+                    for name in network.host_names() - self.tracked_hosts
+                )
+            )
+            self.tracked_hosts = set(network.host_names())
         self.network = network
         self.current_host = entry_host
         self.history: AgentHistory = AgentHistory(initial_host=entry_host)
@@ -170,29 +170,62 @@ class AgentHistory:
 
 class HybridSetList:
     """
-    Defines a Hybrid Set/List object. This allows us to take advantage of the O(1) time complexity for
-    membership checking of sets, while taking advantage of the O(1) time complexity of random.choice()
-    of lists.
+    Defines a Hybrid Set/List object: an indexed set with O(1) add, remove,
+    membership checks and random.choice().
+
+    Values are kept in a list together with a value -> position map. Removing
+    a value moves the last value into its slot (swap-and-pop), so the list
+    order is not insertion order. Every value also carries a weight (default
+    1.0) for strategies that sample with `get_random_weighted()`.
     """
     def __init__(self):
-        self.data_set = set()
         self.data_list = []
+        self.weights: list[float] = []
+        self._positions: dict[Any, int] = {}
+
+    @property
+    def data_set(self):
+        """Set-like, read-only view of the values"""
+        return self._positions.keys()
 
-    def add(self, value):
-        if value not in self.data_set:
-            self.data_set.add(value)
+    def add(self, value, weight: float = 1.0):
+        if value not in self._positions:
+            self._positions[value] = len(self.data_list)
             self.data_list.append(value)
+            self.weights.append(weight)
 
     def remove(self, value):
-        if value in self.data_set:
-            self.data_set.remove(value)
-            self.data_list.remove(value)
+        position = self._positions.pop(value, None)
+        if position is None:
+            return
+        last_value = self.data_list.pop()
+        last_weight = self.weights.pop()
+        if position < len(self.data_list):
+            self.data_list[position] = last_value
+            self.weights[position] = last_weight
+            self._positions[last_value] = position
+
+    def set_weight(self, value, weight: float):
+        self.weights[self._positions[value]] = weight
 
     def get_random(self):
         return random.choice(self.data_list)
 
+    def get_random_weighted(self):
+        """Returns a random value, chosen with probability proportional to its weight"""
+        return random.choices(self.data_list, weights=self.weights)[0]
+
     def check_membership(self, value):
-        return value in self.data_set
+        return value in self._positions
 
     def length(self):
-        return len(self.data_set)
+        return len(self.data_list)
+
+    def __contains__(self, value):
+        return value in self._positions
+
+    def __len__(self):
+        return len(self.data_list)
+
+    def __iter__(self):
+        return iter(self.data_list)
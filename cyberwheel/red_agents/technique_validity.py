@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, List, Tuple, Type
+
+from cyberwheel.network.host import Host, HostType
+from cyberwheel.red_actions.technique_catalog import technique_mapping
+from cyberwheel.red_actions.actions.art_killchain_phases import (
+    ARTDiscovery,
+    ARTImpact,
+    ARTKillChainPhase,
+    ARTLateralMovement,
+    ARTPrivilegeEscalation,
+)
+
+DEFAULT_KILLCHAIN = (ARTDiscovery, ARTPrivilegeEscalation, ARTImpact, ARTLateralMovement)
+
+
+class TechniqueValidityIndex:
+    """
+    Precomputed mapping from host type to the ART techniques of every killchain
+    phase that can be used against it.
+
+    A technique is valid on a host if it is listed for the host's OS and phase in
+    `ARTKillChainPhase.validity_mapping` and shares at least one CVE with the host
+    type. That only depends on (OS, CVE list), so validity is computed once per
+    distinct pair and stored as one bitset per phase over that phase's technique
+    ids. Hosts of the same type share the resulting technique lists, which must
+    be treated as read-only.
+
+    Use `TechniqueValidityIndex.get_index()` so an index is shared by every agent
+    in the process that uses the same killchain.
+    """
+
+    _indexes: Dict[Tuple[Type[ARTKillChainPhase], ...], "TechniqueValidityIndex"] = {}
+
+    def __init__(self, killchain: Iterable[Type[ARTKillChainPhase]] = DEFAULT_KILLCHAIN):
+        """
+        :param Iterable[Type[ARTKillChainPhase]] killchain: phases to index
+        """
+        self.killchain = tuple(killchain)
+        # (os, phase) -> technique ids, in validity_mapping order
+        self.technique_ids: Dict[Tuple[str, Type[ARTKillChainPhase]], Tuple[str, ...]] = {}
+        # (os, frozenset of CVEs) -> {phase: bitset over technique_ids[(os, phase)]}
+        self._bitsets: Dict[tuple, Dict[Type[ARTKillChainPhase], int]] = {}
+        # (os, frozenset of CVEs) -> {phase: valid technique ids}
+        self._techniques: Dict[tuple, Dict[Type[ARTKillChainPhase], List[str]]] = {}
+        # (id(host type), os) -> (host type, cached key). Holding the host type
+        # keeps its id from being reused by another object.
+        self._type_keys: Dict[Tuple[int, str], Tuple[HostType, tuple]] = {}
+
+    @classmethod
+    def get_index(
+        cls, killchain: Iterable[Type[ARTKillChainPhase]] = DEFAULT_KILLCHAIN
+    ) -> "TechniqueValidityIndex":
+        """
+        Returns the cached index for killchain, creating it on first use
+
+        :param Iterable[Type[ARTKillChainPhase]] killchain: phases to index
+        """
+        killchain = tuple(killchain)
+        index = cls._indexes.get(killchain)
+        if index is None:
+            index = cls(killchain)
+            cls._indexes[killchain] = index
+        return index
+
+    def _key(self, host: Host) -> tuple:
+        type_key = (id(host.host_type), host.os)
+        cached = self._type_keys.get(type_key)
+        if cached is None:
+            cves = frozenset(host.host_type.cve_list) if host.host_type else frozenset()
+            cached = (host.host_type, (host.os, cves))
+            self._type_keys[type_key] = cached
+        return cached[1]
+
+    def _phase_technique_ids(
+        self, os: str, kcp: Type[ARTKillChainPhase]
+    ) -> Tuple[str, ...]:
+        ids = self.technique_ids.get((os, kcp))
+        if ids is None:
+            ids = tuple(kcp.validity_mapping[os][kcp.get_name()])
+            self.technique_ids[(os, kcp)] = ids
+        return ids
+
+    def _build(self, key: tuple) -> None:
+        os, cves = key
+        bitsets = {}
+        techniques = {}
+        for kcp in self.killchain:
+            ids = self._phase_technique_ids(os, kcp)
+            bits = 0
+            for i, mid in enumerate(ids):
+                if not cves.isdisjoint(technique_mapping.cve_list(mid)):
+                    bits |= 1 << i
+            bitsets[kcp] = bits
+            techniques[kcp] = [mid for i, mid in enumerate(ids) if bits >> i & 1]
+        self._bitsets[key] = bitsets
+        self._techniques[key] = techniques
+
+    def bitsets(self, host: Host) -> Dict[Type[ARTKillChainPhase], int]:
+        """
+        Returns one bitset per phase where bit i is set if
+        `technique_ids[(host.os, phase)][i]` is valid on host
+        """
+        key = self._key(host)
+        if key not in self._bitsets:
+            self._build(key)
+        return self._bitsets[key]
+
+    def valid_techniques(self, host: Host) -> Dict[Type[ARTKillChainPhase], List[str]]:
+        """
+        Returns the valid technique ids of every phase for host. The lists are
+        shared with every host of the same type.
+        """
+        key = self._key(host)
+        techniques = self._techniques.get(key)
+        if techniques is None:
+            self._build(key)
+            techniques = self._techniques[key]
+        return techniques
+
+    def is_valid(self, host: Host, kcp: Type[ARTKillChainPhase], mitre_id: str) -> bool:
+        """Returns True if the technique mitre_id of phase kcp is valid on host"""
+        ids = self._phase_technique_ids(host.os, kcp)
+        if mitre_id not in ids:
+            return False
+        return bool(self.bitsets(host)[kcp] >> ids.index(mitre_id) & 1)
+
+    def service_map(
+        self, hosts: Iterable[Host]
+    ) -> Dict[str, Dict[Type[ARTKillChainPhase], List[str]]]:
+        """
+        Returns {host name: {phase: valid technique ids}} for hosts. Each
+        per-host dict is new but the technique lists are shared per host type.
+        """
+        return {host.name: dict(self.valid_techniques(host)) for host in hosts}
@@ -0,0 +1,100 @@
+"""
+Preallocated storage for the PPO rollouts collected by train_cyberwheel.py.
+"""
+import numpy as np
+import torch
+
+
+class RolloutBuffer:
+    """
+    Holds one rollout of num_steps x num_envs transitions in tensors that are
+    allocated once and reused for every update.
+
+    Environment outputs (observations, rewards, dones) are copied from the
+    vector env's NumPy arrays through torch.from_numpy views into host
+    tensors, without building intermediate tensors. Observations go to the
+    device every step because the policy needs them. Rewards and dones stay on
+    the host until finish() moves them to the device in one transfer per
+    rollout. Policy outputs (actions, log probs, values) are produced on the
+    device and are written there directly. On the CPU, host and device tensors
+    are the same storage.
+
+    obs and dones have num_steps + 1 rows. Row t holds the observation the
+    policy saw at step t and whether it started a new episode. The last row
+    holds the observation and done flag that follow the rollout, used to
+    bootstrap the value estimate. Its done flag carries over into the next
+    rollout.
+    """
+
+    def __init__(
+        self,
+        num_steps: int,
+        num_envs: int,
+        obs_shape: tuple,
+        action_shape: tuple,
+        device: str | torch.device = "cpu",
+        pin_memory: bool = False,
+    ):
+        """
+        :param int num_steps: steps per environment in a rollout
+        :param int num_envs: number of environments
+        :param tuple obs_shape: shape of a single observation
+        :param tuple action_shape: shape of a single action
+        :param device: device the policy runs on
+        :param bool pin_memory: use page-locked host tensors for faster,
+            asynchronous transfers. Only applies to CUDA devices.
+        """
+        self.num_steps = num_steps
+        self.device = torch.device(device)
+        self.on_device = self.device.type != "cpu"
+        pin = pin_memory and self.on_device and torch.cuda.is_available()
+
+        def device_tensor(shape):
+            return torch.zeros(shape, device=self.device)
+
+        def host_tensor(shape):
+            return torch.zeros(shape, pin_memory=pin) if self.on_device else device_tensor(shape)
+
+        self.host_obs = host_tensor((num_steps + 1, num_envs) + tuple(obs_shape))
+        self.host_rewards = host_tensor((num_steps, num_envs))
+        self.host_dones = host_tensor((num_steps + 1, num_envs))
+        if self.on_device:
+            self.obs = device_tensor(self.host_obs.shape)
+            self.rewards = device_tensor(self.host_rewards.shape)
+            self.dones = device_tensor(self.host_dones.shape)
+        else:
+            self.obs, self.rewards, self.dones = self.host_obs, self.host_rewards, self.host_dones
+        self.actions = device_tensor((num_steps, num_envs) + tuple(action_shape))
+        self.logprobs = device_tensor((num_steps, num_envs))
+        self.values = device_tensor((num_steps, num_envs))
+
+    def _store_obs(self, row: int, observations) -> None:
+        self.host_obs[row].copy_(torch.from_numpy(np.asarray(observations)))
+        if self.on_device:
+            self.obs[row].copy_(self.host_obs[row], non_blocking=True)
+
+    def start(self, observations) -> None:
+        """
+        Starts a rollout from the observations returned by the vector env's
+        reset. The done flags left by the previous rollout carry over.
+        """
+        self._store_obs(0, observations)
+        self.host_dones[0] = self.host_dones[self.num_steps]
+
+    def add_policy(self, step: int, action, logprob, value) -> None:
+        """Records the policy's outputs for the observation at step"""
+        self.actions[step] = action
+        self.logprobs[step] = logprob
+        self.values[step] = value.flatten()
+
+    def add_env(self, step: int, observations, rewards, dones) -> None:
+        """Records what the vector env returned for the actions taken at step"""
+        self._store_obs(step + 1, observations)
+        self.host_rewards[step].copy_(torch.from_numpy(np.asarray(rewards)))
+        self.host_dones[step + 1].copy_(torch.from_numpy(np.asarray(dones)))
+
+    def finish(self) -> None:
+        """Moves the rollout's rewards and dones to the device"""
+        if self.on_device:
+            self.rewards.copy_(self.host_rewards, non_blocking=True)
+            self.dones.copy_(self.host_dones, non_blocking=True)
@@ -0,0 +1,54 @@
+import unittest
+
+from cyberwheel.detectors.alert import Alert
+from cyberwheel.network.host import Host
+from cyberwheel.network.service import Service
+
+
+class TestAlertIdentity(unittest.TestCase):
+    def setUp(self):
+        self.src = Host("Host1", None, None)
+        self.dsts = [Host("Host2", None, None), Host("Host3", None, None)]
+        self.ssh = Service(name="ssh", port=22)
+
+    def test_equal_alerts_hash_equal(self):
+        a = Alert(self.src, dst_hosts=list(self.dsts), services=[self.ssh])
+        b = Alert(self.src, dst_hosts=list(reversed(self.dsts)), services=[self.ssh])
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(len({a, b}), 1)
+        self.assertNotEqual(a, Alert(self.src, dst_hosts=self.dsts[:1], services=[self.ssh]))
+
+    def test_services_compare_like_service_eq(self):
+        decoy_ssh = Service(name="decoy-ssh", port=22, decoy=True)
+        self.assertEqual(decoy_ssh, self.ssh)
+        a = Alert(self.src, services=[self.ssh])
+        b = Alert(self.src, services=[decoy_ssh])
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(a, Alert(self.src, services=[Service(name="ssh", port=2222)]))
+
+    def test_mutation_updates_hash(self):
+        a = Alert(self.src)
+        b = Alert(self.src, dst_hosts=[self.dsts[0]])
+        self.assertNotEqual(a, b)
+        a.add_dst_host(self.dsts[0])
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+
+    def test_no_shared_defaults(self):
+        a, b = Alert(), Alert()
+        a.add_dst_host(self.dsts[0])
+        self.assertListEqual(b.dst_hosts, [])
+        self.assertListEqual(b.techniques, [])
+
+    def test_to_dict_does_not_copy(self):
+        a = Alert(self.src, dst_hosts=self.dsts, services=[self.ssh])
+        d = a.to_dict()
+        self.assertSetEqual(set(d), {"src_host", "dst_hosts", "services"})
+        self.assertIs(d["src_host"], self.src)
+        self.assertIs(d["dst_hosts"], self.dsts)
+
+
+if __name__ == "__main__":
+    unittest.main()
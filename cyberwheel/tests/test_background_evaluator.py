@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+import torch
+
+from cyberwheel import train_cyberwheel
+from cyberwheel.cyberwheel_envs.worker_pool import ForkedWorkerPool
+from cyberwheel.red_agents.strategies import ServerDowntime
+
+
+class TestBackgroundEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        argv = [
+            "train_cyberwheel.py",
+            "--num-steps", "5",
+            "--eval-episodes", "1",
+            "--seed-file", os.path.join(self.tmpdir.name, "seed_log.txt"),
+        ]
+        with mock.patch("sys.argv", argv):
+            self.args = train_cyberwheel.parse_args()
+        pool = ForkedWorkerPool(self.args.network_config, self.args.red_agent)
+        self.args.network = pool.network
+        self.args.service_mapping = pool.service_mapping
+        self.args.red_strategy = ServerDowntime
+        self.context = pool.context
+
+        _, agent = train_cyberwheel._warm_evaluator(self.args)
+        self.checkpoint = os.path.join(self.tmpdir.name, "10.pt")
+        torch.save(agent.state_dict(), self.checkpoint)
+
+    def tearDown(self):
+        train_cyberwheel._eval_state = None
+        self.tmpdir.cleanup()
+
+    def evaluator(self):
+        return train_cyberwheel.BackgroundEvaluator(self.args, 1, context=self.context)
+
+    def test_close_returns_results(self):
+        evaluator = self.evaluator()
+        evaluator.submit(self.checkpoint, 10)
+        finished = evaluator.close(timeout=60)
+        self.assertEqual(len(finished), 1)
+        eval_results, eval_time = finished[0]
+        self.assertEqual(eval_results[-1], 10)
+        self.assertGreaterEqual(eval_time, 0)
+        self.assertFalse(evaluator.workers[0].is_alive())
+
+    def test_failed_evaluation_warns(self):
+        evaluator = self.evaluator()
+        evaluator.submit(os.path.join(self.tmpdir.name, "missing.pt"), 10)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertListEqual(evaluator.close(timeout=60), [])
+        self.assertTrue(any("evaluation failed" in str(w.message) for w in caught))
+
+    def test_dead_worker_does_not_hang_close(self):
+        evaluator = self.evaluator()
+        evaluator.workers[0].kill()
+        evaluator.workers[0].join()
+        evaluator.pending[0] = 1  # as if it died holding an evaluation
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.assertListEqual(evaluator.close(timeout=60), [])
+        self.assertTrue(any("lost" in str(w.message) for w in caught))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from cyberwheel.cyberwheel_envs.cyberwheel_batched import BatchedDynamicCyberwheel
+from cyberwheel.observation import HistoryObservation
+
+
+class TestBatchedEnv(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.envs = BatchedDynamicCyberwheel(
+            2,
+            num_steps=2,
+            deterministic=False,
+            seed_file=os.path.join(self.tmpdir.name, "seed_log.txt"),
+        )
+
+    def tearDown(self):
+        self.envs.close()
+        self.tmpdir.cleanup()
+
+    def step(self):
+        return self.envs.step(np.zeros(2, dtype=np.int64))
+
+    def test_shapes_and_dtypes(self):
+        obs, _ = self.envs.reset(seed=0)
+        self.assertEqual(obs.shape, (2,) + self.envs.single_observation_space.shape)
+        self.assertEqual(obs.dtype, np.float32)
+        obs, rewards, terminateds, truncateds, _ = self.step()
+        self.assertEqual(obs.shape, (2,) + self.envs.single_observation_space.shape)
+        self.assertEqual((rewards.shape, rewards.dtype), ((2,), np.float64))
+        self.assertEqual((terminateds.shape, terminateds.dtype), ((2,), np.bool_))
+        self.assertEqual((truncateds.shape, truncateds.dtype), ((2,), np.bool_))
+
+    def test_rows_are_env_observations(self):
+        self.envs.reset(seed=0)
+        for _ in range(2):
+            obs = self.step()[0]
+            for i, env in enumerate(self.envs.envs):
+                self.assertTrue(np.shares_memory(env.alert_converter.obs_vec, obs[i]))
+                np.testing.assert_array_equal(obs[i], env.alert_converter.obs_vec)
+
+    def test_autoreset_keeps_final_observation(self):
+        self.envs.reset(seed=0)
+        pre_reset = []
+        env = self.envs.envs[0]
+        env_reset = env.reset
+
+        def reset(*args, **kwargs):
+            pre_reset.append(self.envs.observations[0].copy())
+            return env_reset(*args, **kwargs)
+
+        env.reset = reset
+        # an episode is done on the step after current_step reaches num_steps
+        for _ in range(3):
+            _, _, terminateds, truncateds, infos = self.step()
+        self.assertTrue(np.all(terminateds | truncateds))
+        self.assertTrue(np.all(infos["_final_observation"]))
+        self.assertTrue(np.all(infos["_final_info"]))
+        self.assertEqual(len(pre_reset), 1)
+        np.testing.assert_array_equal(infos["final_observation"][0], pre_reset[0])
+
+    def test_drain_profile(self):
+        samples = self.envs.call("drain_profile")
+        self.assertEqual(len(samples), 2)
+        self.assertTrue(all(isinstance(s, dict) for s in samples))
+
+
+class TestObservationBatch(unittest.TestCase):
+    def test_matches_per_episode_vectors(self):
+        rng = np.random.default_rng(0)
+        batch = np.zeros((3, 10), dtype=np.float32)
+        converters = [HistoryObservation(10, {}) for _ in range(3)]
+        for _ in range(4):
+            alert_indices = [
+                rng.choice(5, size=rng.integers(0, 3), replace=False).astype(np.intp)
+                for _ in converters
+            ]
+            HistoryObservation.create_obs_batch(batch, alert_indices)
+            for row, converter, indices in zip(batch, converters, alert_indices):
+                converter.alert_indices = lambda alerts, indices=indices: indices
+                np.testing.assert_array_equal(row, converter.create_obs_vector([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
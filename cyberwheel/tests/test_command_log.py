@@ -0,0 +1,76 @@
+import pickle
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.command import Command, CommandLog
+from cyberwheel.network.network_base import Network
+
+
+class TestCommandLog(unittest.TestCase):
+    def test_unbounded_keeps_everything(self):
+        log = CommandLog()
+        for i in range(40):
+            log.append(i % 2, "sh", f"cmd{i}", "user")
+        self.assertEqual(len(log), 40)
+        self.assertEqual(log.count(1), 20)
+        self.assertListEqual(
+            [c.content for c in log.commands(1)], [f"cmd{i}" for i in range(1, 40, 2)]
+        )
+
+    def test_ring_buffer_keeps_most_recent(self):
+        log = CommandLog(capacity=3)
+        for i in range(5):
+            log.append(0, "sh", f"cmd{i}", "root")
+        self.assertEqual(len(log), 3)
+        self.assertEqual(log.count(0), 5)
+        self.assertListEqual(
+            log.commands(0),
+            [Command("sh", f"cmd{i}", "root") for i in range(2, 5)],
+        )
+
+    def test_count_only(self):
+        log = CommandLog(capacity=0)
+        log.append(4, "sh", "whoami", "user")
+        self.assertEqual(log.count(4), 1)
+        self.assertListEqual(log.commands(), [])
+
+    def test_sink_and_pickle(self):
+        seen = []
+        log = CommandLog(capacity=2, sink=lambda *row: seen.append(row))
+        for i in range(3):
+            log.append(1, "sh", f"cmd{i}", "user")
+        self.assertListEqual(seen, [(1, "sh", f"cmd{i}", "user") for i in range(3)])
+
+        copy = pickle.loads(pickle.dumps(log))
+        self.assertIsNone(copy.sink)
+        self.assertEqual(copy.count(1), 3)
+        self.assertListEqual(copy.commands(1), log.commands(1))
+
+
+class TestHostCommandHistory(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+
+    def test_hosts_log_to_network(self):
+        self.network.set_command_log(CommandLog(capacity=0))
+        host = self.network.get_hosts()[0]
+        host.run_command("sh", "whoami", "user")
+        self.assertEqual(host.command_count, 1)
+        self.assertListEqual(host.command_history, [])
+        self.network.reset()
+        self.assertEqual(host.command_count, 0)
+
+    def test_removed_decoy_keeps_its_commands(self):
+        subnet = self.network.get_all_subnets()[0]
+        decoy = self.network.create_decoy_host("decoy0", subnet, None)
+        decoy.run_command("sh", "whoami", "user")
+        decoy_id = decoy.host_id
+        self.network.remove_decoy_host(decoy)
+        self.assertListEqual(decoy.command_history, [Command("sh", "whoami", "user")])
+        self.assertEqual(self.network.host_state.commands.count(decoy_id), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
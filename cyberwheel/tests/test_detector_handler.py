@@ -0,0 +1,44 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.detectors.alert import Alert
+from cyberwheel.detectors.handler import DetectorHandler
+from cyberwheel.network.network_base import Network
+
+
+def detector_config(name):
+    return files("cyberwheel.resources.configs.detector").joinpath(name)
+
+
+class TestDetectorHandler(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+        self.hosts = self.network.get_hosts()
+
+    def test_plan_is_topological(self):
+        handler = DetectorHandler(detector_config("detector_handler.yaml"))
+        slots = {slot: node for node, slot in handler._slots.items()}
+        levels = [[slots[slot] for slot, *_ in level] for level in handler._plan]
+        # d2 has to wait for d4, which is two levels below d1
+        self.assertListEqual(levels, [["d1"], ["d3"], ["d4"], ["d2"]])
+
+    def test_alerts_are_deduplicated(self):
+        handler = DetectorHandler(detector_config("detector_handler.yaml"))
+        src, dst, other = self.hosts[:3]
+        alerts = [
+            Alert(src_host=src, dst_hosts=[dst]),
+            Alert(src_host=src, dst_hosts=[dst]),
+            Alert(src_host=src, dst_hosts=[other]),
+        ]
+        result = handler.obs(alerts)
+        self.assertEqual(len(result), 2)
+        self.assertIs(result[0], alerts[0])
+        self.assertIs(result[1], alerts[2])
+        handler.reset()
+        self.assertListEqual(handler.obs([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
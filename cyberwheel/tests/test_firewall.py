@@ -0,0 +1,99 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.network_base import Network
+from cyberwheel.network.network_object import FirewallRule
+
+
+class TestFirewall(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+        self.hosts = self.network.get_hosts()
+        self.src = self.hosts[0]
+        self.dest = next(h for h in self.hosts if h.subnet is not self.src.subnet)
+
+    def allowed(self, port=443, proto="tcp"):
+        return self.network.is_traffic_allowed(self.src, self.dest, port, proto)
+
+    def test_empty_firewalls_allow_all(self):
+        self.dest.firewall_rules = []
+        self.assertTrue(self.allowed())
+
+    def test_any_matching_rule_allows(self):
+        self.dest.firewall_rules = [
+            FirewallRule(name="ssh", src="all", port=22),
+            {"name": "web", "src": self.src.subnet.name, "dest": "all", "port": 443, "proto": "tcp"},
+        ]
+        self.assertTrue(self.allowed(443))
+        self.assertTrue(self.allowed(22))
+        self.assertFalse(self.allowed(80))
+        self.assertFalse(self.allowed(443, "udp"))
+
+    def test_rule_changes_invalidate_table(self):
+        self.dest.firewall_rules = [FirewallRule(name="ssh", port=22)]
+        self.assertFalse(self.allowed(443))
+        self.dest.add_firewall_rule(FirewallRule(name="web", port=443))
+        self.assertTrue(self.allowed(443))
+        self.dest.remove_firewall_rule("web")
+        self.assertFalse(self.allowed(443))
+
+    def test_subnet_firewall_applies_to_hosts(self):
+        self.dest.firewall_rules = []
+        self.dest.subnet.firewall_rules = [FirewallRule(name="dns", port=53, proto="udp")]
+        self.assertFalse(self.allowed(443))
+        self.assertTrue(self.allowed(53, "udp"))
+
+    def test_invalid_port(self):
+        with self.assertRaises(ValueError):
+            self.allowed(70000)
+
+    def test_many_matches_single(self):
+        self.dest.firewall_rules = [FirewallRule(name="icmp", proto="icmp", src=self.src.name)]
+        subnet_hosts = self.network.get_all_hosts_on_subnet(self.dest.subnet)
+        allowed = self.network.is_traffic_allowed_many(self.src, subnet_hosts, None, "icmp")
+        expected = [
+            self.network.is_traffic_allowed(self.src, h, None, "icmp") for h in subnet_hosts
+        ]
+        self.assertListEqual(list(allowed), expected)
+        self.assertListEqual(
+            self.network.ping_sweep_subnet(self.src, self.dest.subnet),
+            [h.ip_address for h, ok in zip(subnet_hosts, expected) if ok],
+        )
+
+    def test_equivalent_rules_share_table(self):
+        other = next(h for h in self.hosts if h is not self.dest)
+        self.dest.firewall_rules = [FirewallRule(name="ssh", port=22)]
+        other.firewall_rules = [{"name": "ssh2", "src": "all", "port": 22, "proto": "tcp"}]
+        self.assertIs(self.dest.get_firewall_table(), other.get_firewall_table())
+        other.add_firewall_rule(FirewallRule(name="web", port=443))
+        self.assertIsNot(self.dest.get_firewall_table(), other.get_firewall_table())
+        self.assertFalse(self.allowed(443))
+
+    def test_many_matches_single_with_dest_rules(self):
+        subnet_hosts = self.network.get_all_hosts_on_subnet(self.dest.subnet)
+        rules = [{"name": "icmp", "src": "all", "dest": self.dest.name, "port": "all", "proto": "icmp"}]
+        for host in subnet_hosts:
+            host.firewall_rules = rules
+        allowed = self.network.is_traffic_allowed_many(self.src, subnet_hosts, None, "icmp")
+        expected = [h is self.dest for h in subnet_hosts]
+        self.assertListEqual(list(allowed), expected)
+        self.assertListEqual(
+            expected,
+            [self.network.is_traffic_allowed(self.src, h, None, "icmp") for h in subnet_hosts],
+        )
+
+    def test_ping_sweep_sees_hosts_and_decoys(self):
+        subnet = self.dest.subnet
+        decoy = self.network.create_decoy_host("decoy0", subnet, self.dest.host_type)
+        self.assertEqual(decoy.firewall_rules, self.dest.firewall_rules)
+        sweep = self.network.ping_sweep_subnet(self.src, subnet)
+        expected = [h.ip_address for h in self.network.get_all_hosts_on_subnet(subnet)]
+        self.assertIn(decoy.ip_address, sweep)
+        self.assertIn(self.dest.ip_address, sweep)
+        self.assertCountEqual(sweep, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+import torch
+
+from cyberwheel.gae import compute_gae
+
+
+def loop_gae(rewards, values, dones, next_value, next_done, gamma, gae_lambda):
+    """The per-step loop train_cyberwheel.py used before compute_gae"""
+    num_steps = rewards.shape[0]
+    advantages = torch.zeros_like(rewards)
+    lastgaelam = 0
+    for t in reversed(range(num_steps)):
+        if t == num_steps - 1:
+            nextnonterminal = 1.0 - next_done
+            nextvalues = next_value
+        else:
+            nextnonterminal = 1.0 - dones[t + 1]
+            nextvalues = values[t + 1]
+        delta = rewards[t] + gamma * nextvalues * nextnonterminal - values[t]
+        advantages[t] = lastgaelam = (
+            delta + gamma * gae_lambda * nextnonterminal * lastgaelam
+        )
+    return advantages, advantages + values
+
+
+class TestGAE(unittest.TestCase):
+    def test_matches_loop(self):
+        generator = torch.Generator().manual_seed(0)
+        for num_steps in (1, 2, 7, 64, 1000):
+            rewards = torch.randn((num_steps, 4), generator=generator)
+            values = torch.randn((num_steps, 4), generator=generator)
+            dones = (torch.rand((num_steps, 4), generator=generator) < 0.05).float()
+            next_value = torch.randn((1, 4), generator=generator)
+            next_done = torch.tensor([0.0, 1.0, 0.0, 1.0])
+
+            expected = loop_gae(rewards, values, dones, next_value, next_done, 0.99, 0.95)
+            actual = compute_gae(rewards, values, dones, next_value, next_done, 0.99, 0.95)
+            for e, a in zip(expected, actual):
+                self.assertEqual(a.shape, e.shape)
+                self.assertTrue(torch.allclose(a, e, atol=1e-4), num_steps)
+
+
+if __name__ == "__main__":
+    unittest.main()
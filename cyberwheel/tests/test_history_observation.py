@@ -0,0 +1,42 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from cyberwheel.observation import HistoryObservation
+
+
+def alert(name):
+    return SimpleNamespace(src_host=SimpleNamespace(name=name))
+
+
+class TestHistoryObservation(unittest.TestCase):
+    def setUp(self):
+        self.mapping = {"h0": 0, "h1": 1, "h2": 2, "h3": 3}
+
+    def test_alerts_set_current_and_history(self):
+        obs = HistoryObservation((8,), self.mapping)
+        vec = obs.create_obs_vector([alert("h1"), alert("decoy"), alert("h3")])
+        np.testing.assert_array_equal(vec, [0, 1, 0, 1, 0, 1, 0, 1])
+        self.assertEqual(vec.dtype, np.float32)
+
+        vec = obs.create_obs_vector([alert("h0")])
+        np.testing.assert_array_equal(vec, [1, 0, 0, 0, 1, 1, 0, 1])
+
+        vec = obs.create_obs_vector([])
+        np.testing.assert_array_equal(vec, [0, 0, 0, 0, 1, 1, 0, 1])
+
+        np.testing.assert_array_equal(obs.reset_obs_vector(), np.zeros(8))
+
+    def test_writes_into_caller_buffer(self):
+        batch = np.ones((2, 8), dtype=np.float32)
+        obs = HistoryObservation((8,), self.mapping, out=batch[1])
+        obs.create_obs_vector([alert("h2")])
+        np.testing.assert_array_equal(batch[0], np.ones(8))
+        np.testing.assert_array_equal(batch[1], [0, 0, 1, 0, 0, 0, 1, 0])
+        with self.assertRaises(ValueError):
+            HistoryObservation((8,), self.mapping, out=np.zeros(6, dtype=np.float32))
+
+
+if __name__ == "__main__":
+    unittest.main()
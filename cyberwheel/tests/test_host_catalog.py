@@ -0,0 +1,41 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.host import HostTypeCatalog
+from cyberwheel.network.network_base import Network
+
+
+class TestHostTypeCatalog(unittest.TestCase):
+    def setUp(self):
+        self.host_config = files("cyberwheel.resources.configs.host_definitions").joinpath(
+            "host_defs_services.yaml"
+        )
+
+    def test_catalog_is_cached(self):
+        catalog = HostTypeCatalog.get_catalog(self.host_config)
+        self.assertIs(catalog, HostTypeCatalog.get_catalog(self.host_config))
+
+    def test_host_types_are_interned(self):
+        catalog = HostTypeCatalog.get_catalog(self.host_config)
+        workstation = catalog.get_host_type("Workstation")
+        self.assertIs(workstation, catalog.get_host_type("workstation"))
+        self.assertEqual(workstation.name, "workstation")
+        self.assertEqual(workstation.os, "windows")
+        self.assertTrue(workstation.cve_list)
+        for service in workstation.services:
+            self.assertIs(service, catalog.get_service(service.name))
+
+    def test_hosts_share_host_type(self):
+        network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+        workstations = [
+            h for h in network.get_hosts() if h.host_type.name == "workstation"
+        ]
+        self.assertGreater(len(workstations), 1)
+        for host in workstations:
+            self.assertIs(host.host_type, workstations[0].host_type)
+
+
+if __name__ == "__main__":
+    unittest.main()
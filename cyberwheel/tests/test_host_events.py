@@ -0,0 +1,54 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.network_base import HOST_ADDED, HOST_REMOVED, Network
+from cyberwheel.red_agents import ARTAgent
+from cyberwheel.red_agents.red_agent_base import KnownSubnetInfo
+
+
+class TestHostEvents(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+        self.subnet = self.network.get_all_subnets()[0]
+        self.host_type = self.network.get_hosts()[0].host_type
+
+    def test_decoys_publish_events(self):
+        events = self.network.subscribe_host_events()
+        decoy = self.network.create_decoy_host("decoy0", self.subnet, self.host_type)
+        self.network.reset()
+        self.assertListEqual(
+            list(events), [(HOST_ADDED, decoy), (HOST_REMOVED, decoy)]
+        )
+        self.network.unsubscribe_host_events(events)
+        self.network.create_decoy_host("decoy1", self.subnet, self.host_type)
+        self.assertEqual(len(events), 2)
+
+    def test_agent_tracks_decoys(self):
+        agent = ARTAgent(self.network.get_hosts()[0], network=self.network)
+        agent.history.mapping[self.subnet.name] = self.subnet
+        agent.history.subnets[self.subnet.name] = KnownSubnetInfo(scanned=True)
+
+        decoy = self.network.create_decoy_host("decoy0", self.subnet, self.host_type)
+        agent.handle_network_change()
+        self.assertIn("decoy0", agent.tracked_hosts)
+        self.assertIn("decoy0", agent.services_map)
+        self.assertIs(agent.history.mapping["decoy0"], decoy)
+        self.assertIn("decoy0", agent.unknowns.data_set)
+
+        self.network.remove_decoy_host(decoy)
+        agent.handle_network_change()
+        self.assertNotIn("decoy0", agent.tracked_hosts)
+
+    def test_transient_host_is_ignored(self):
+        agent = ARTAgent(self.network.get_hosts()[0], network=self.network)
+        decoy = self.network.create_decoy_host("decoy0", self.subnet, self.host_type)
+        self.network.remove_decoy_host(decoy)
+        agent.handle_network_change()
+        self.assertNotIn("decoy0", agent.tracked_hosts)
+        self.assertNotIn("decoy0", agent.services_map)
+
+
+if __name__ == "__main__":
+    unittest.main()
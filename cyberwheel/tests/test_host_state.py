@@ -0,0 +1,61 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.host_state import HostState
+from cyberwheel.network.network_base import Network
+
+
+class TestHostState(unittest.TestCase):
+    def test_ids_are_reused_and_arrays_grow(self):
+        state = HostState(capacity=2)
+        ids = [state.allocate() for _ in range(5)]
+        self.assertListEqual(ids, [0, 1, 2, 3, 4])
+        self.assertGreaterEqual(state.capacity, 5)
+        state.set("isolated", 3, True)
+        state.release(3)
+        self.assertEqual(state.allocate(), 3)
+        self.assertFalse(state.get("isolated", 3))
+
+
+class TestNetworkHostState(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+
+    def test_hosts_share_network_state(self):
+        host_ids = {host.host_id for host in self.network.get_hosts()}
+        self.assertEqual(len(host_ids), self.network.num_hosts())
+        host = self.network.get_hosts()[3]
+        host.is_compromised = True
+        self.assertTrue(self.network.host_state.is_compromised[host.host_id])
+        self.assertTrue(self.network.check_compromised_status(host.name))
+
+    def test_reset_clears_only_dirty_hosts(self):
+        self.network.reset()
+        self.assertEqual(len(self.network.host_state.dirty), 0)
+        hosts = self.network.get_hosts()
+        hosts[0].is_compromised = True
+        hosts[1].restored = True
+        hosts[2].run_command("agent", "whoami", "user")
+        self.assertSetEqual(
+            self.network.host_state.dirty, {h.host_id for h in hosts[:3]}
+        )
+        self.network.reset()
+        self.assertFalse(hosts[0].is_compromised)
+        self.assertFalse(hosts[1].restored)
+        self.assertListEqual(hosts[2].command_history, [])
+        self.assertEqual(len(self.network.host_state.dirty), 0)
+
+    def test_removed_decoy_keeps_its_flags(self):
+        subnet = self.network.get_all_subnets()[0]
+        decoy = self.network.create_decoy_host("decoy0", subnet, None)
+        decoy.isolated = True
+        decoy_id = decoy.host_id
+        self.network.remove_decoy_host(decoy)
+        self.assertTrue(decoy.isolated)
+        self.assertFalse(self.network.host_state.isolated[decoy_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import random
+import unittest
+
+from cyberwheel.red_agents.red_agent_base import HybridSetList
+
+
+class TestHybridSetList(unittest.TestCase):
+    def test_add_remove_keeps_index_consistent(self):
+        values = HybridSetList()
+        for i in range(10):
+            values.add(f"h{i}")
+        values.add("h3")
+        for name in ("h0", "h9", "h4", "missing"):
+            values.remove(name)
+        expected = {f"h{i}" for i in (1, 2, 3, 5, 6, 7, 8)}
+        self.assertEqual(values.length(), len(expected))
+        self.assertSetEqual(set(values.data_list), expected)
+        self.assertSetEqual(set(values.data_set), expected)
+        for position, value in enumerate(values.data_list):
+            self.assertEqual(values._positions[value], position)
+        self.assertFalse(values.check_membership("h4"))
+        self.assertIn(values.get_random(), expected)
+
+    def test_weighted_sampling(self):
+        values = HybridSetList()
+        values.add("never", weight=0.0)
+        values.add("always")
+        values.add("removed", weight=5.0)
+        values.remove("removed")
+        random.seed(0)
+        self.assertSetEqual(
+            {values.get_random_weighted() for _ in range(50)}, {"always"}
+        )
+        values.set_weight("never", 1.0)
+        values.set_weight("always", 0.0)
+        self.assertEqual(values.get_random_weighted(), "never")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import ipaddress as ipa
+import random
+import unittest
+
+from cyberwheel.network.ip_pool import IPPool
+
+
+class TestIPPool(unittest.TestCase):
+    def test_matches_hosts(self):
+        for net in ["192.168.0.0/24", "10.0.0.0/30", "10.0.0.0/31", "10.0.0.1/32", "fd00::/124"]:
+            ip_network = ipa.ip_network(net)
+            pool = IPPool(ip_network)
+            self.assertListEqual(list(pool), list(ip_network.hosts()))
+            self.assertEqual(len(pool), len(list(ip_network.hosts())))
+
+    def test_large_network_is_lazy(self):
+        pool = IPPool(ipa.ip_network("10.0.0.0/8"))
+        self.assertEqual(len(pool), 2**24 - 2)
+        self.assertEqual(pool.lease_first(), ipa.ip_address("10.0.0.1"))
+        self.assertNotIn(ipa.ip_address("10.0.0.1"), pool)
+        self.assertIn(ipa.ip_address("10.0.0.2"), pool)
+
+    def test_random_leases_are_unique(self):
+        random.seed(0)
+        ip_network = ipa.ip_network("192.168.0.0/26")
+        pool = IPPool(ip_network)
+        leased = [pool.lease_random() for _ in range(len(pool))]
+        self.assertEqual(len(pool), 0)
+        self.assertCountEqual(leased, list(ip_network.hosts()))
+        with self.assertRaises(IndexError):
+            pool.lease_random()
+
+    def test_release_and_acquire(self):
+        pool = IPPool(ipa.ip_network("192.168.0.0/29"))
+        first = pool.lease_first()
+        leased = pool.lease_random()
+        self.assertEqual(len(pool), 4)
+
+        pool.release(leased)
+        pool.release(leased)  # releasing twice is a no-op
+        self.assertIn(leased, pool)
+        self.assertEqual(len(pool), 5)
+
+        pool.acquire(leased)
+        self.assertNotIn(leased, pool)
+        with self.assertRaises(ValueError):
+            pool.acquire(first)
+
+        pool.release(first)
+        self.assertEqual(pool.lease_first(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.network_base import Network
+from cyberwheel.network.network_object import FirewallRule
+
+
+class TestNetworkFork(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+        self.fork = self.network.fork()
+
+    def test_fork_shares_static_state(self):
+        for host in self.fork.get_hosts():
+            original = self.network.get_node_from_name(host.name)
+            self.assertIsNot(host, original)
+            self.assertIs(host.services, original.services)
+            self.assertIs(host.routing_table, original.routing_table)
+            self.assertEqual(host.ip_address, original.ip_address)
+            self.assertIs(host.subnet, self.fork.get_node_from_name(host.subnet.name))
+            self.assertIn(host, host.subnet.connected_hosts)
+        self.assertListEqual(self.fork.get_host_names(), self.network.get_host_names())
+        self.assertListEqual(list(self.fork.graph.edges), list(self.network.graph.edges))
+
+    def test_fork_mutations_stay_local(self):
+        host = self.fork.get_hosts()[0]
+        host.is_compromised = True
+        host.run_command("agent", "whoami", "user")
+        subnet = host.subnet
+        decoy = self.fork.create_decoy_host("decoy0", subnet, host.host_type)
+        self.fork.isolate_host(host, subnet)
+
+        original = self.network.get_node_from_name(host.name)
+        self.assertFalse(original.is_compromised)
+        self.assertListEqual(original.command_history, [])
+        self.assertFalse(original.isolated)
+        self.assertFalse(self.network.has_host("decoy0"))
+        self.assertTrue(self.network.graph.has_edge(host.name, subnet.name))
+        self.assertIn(decoy.ip_address, self.network.get_node_from_name(subnet.name).available_ips)
+
+        self.fork.reset()
+        self.assertFalse(host.is_compromised)
+        self.assertFalse(self.fork.has_host("decoy0"))
+        self.assertTrue(self.fork.graph.has_edge(host.name, subnet.name))
+
+    def test_fork_firewall_rules_are_copy_on_write(self):
+        original = self.network.get_hosts()[0]
+        original.firewall_rules = [FirewallRule(name="ssh", port=22)]
+        host = self.fork.get_node_from_name(original.name)
+        scopes = ("all",)
+        self.assertFalse(original.allows_traffic(scopes, "443", "tcp"))
+
+        host.add_firewall_rule(FirewallRule(name="web", port=443))
+        self.assertTrue(host.allows_traffic(scopes, "443", "tcp"))
+        self.assertEqual(len(original.firewall_rules), 1)
+        self.assertFalse(original.allows_traffic(scopes, "443", "tcp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.host import Host, HostType
+from cyberwheel.network.network_base import Network
+from cyberwheel.network.router import Router
+from cyberwheel.network.subnet import Subnet
+
+
+def scan(network: Network, node_type):
+    return [n for _, n in network.graph.nodes(data="data") if isinstance(n, node_type)]
+
+
+class TestNetworkIndex(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+
+    def test_indexes_match_graph(self):
+        self.assertListEqual(self.network.get_hosts(), scan(self.network, Host))
+        self.assertListEqual(self.network.get_all_subnets(), scan(self.network, Subnet))
+        self.assertListEqual(self.network.get_all_routers(), scan(self.network, Router))
+        self.assertListEqual(
+            self.network.get_host_names(), [h.name for h in scan(self.network, Host)]
+        )
+        self.assertEqual(self.network.num_hosts(), 15)
+
+    def test_decoys_are_indexed(self):
+        subnet = self.network.get_all_subnets()[0]
+        decoy = self.network.create_decoy_host(
+            "decoy", subnet, HostType(name="workstation", decoy=True)
+        )
+        self.assertIn("decoy", self.network.host_names())
+        self.assertIn(decoy, self.network.get_hosts())
+        self.assertNotIn(decoy, self.network.get_nondecoy_hosts())
+        self.assertEqual(len(self.network.get_nondecoy_hosts()), 15)
+
+        self.network.remove_host_from_subnet(decoy)
+        self.assertFalse(self.network.has_host("decoy"))
+        self.assertListEqual(self.network.get_hosts(), scan(self.network, Host))
+
+    def test_copy_rebuilds_indexes(self):
+        copy = self.network.copy()
+        self.assertListEqual(copy.get_host_names(), self.network.get_host_names())
+        self.assertEqual(len(copy.get_all_subnets()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
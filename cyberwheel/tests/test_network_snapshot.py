@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.network_base import Network
+
+
+class TestNetworkSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.network_config = files("cyberwheel.resources.configs.network").joinpath(
+            "15-host-network.yaml"
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmpdir.name, "15-host.snapshot")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        Network.compile_snapshot(self.network_config, snapshot_path=self.snapshot_path)
+        original = Network.load_snapshot(
+            self.network_config, snapshot_path=self.snapshot_path
+        )
+        loaded = Network.load_snapshot(
+            self.network_config, snapshot_path=self.snapshot_path
+        )
+
+        self.assertListEqual(original.get_host_names(), loaded.get_host_names())
+        for host in loaded.get_hosts():
+            self.assertIs(loaded.get_node_from_name(host.subnet.name), host.subnet)
+            self.assertIn(host.ip_address, host.subnet.ip_network)
+            self.assertEqual(
+                host.ip_address, original.get_node_from_name(host.name).ip_address
+            )
+
+    def test_stale_snapshot_is_rebuilt(self):
+        Network.compile_snapshot(self.network_config, snapshot_path=self.snapshot_path)
+        network = Network.load_snapshot(
+            self.network_config, snapshot_path=self.snapshot_path
+        )
+        network.name = "stale"
+        network.save_snapshot(self.snapshot_path, content_hash="not-the-config-hash")
+
+        rebuilt = Network.load_snapshot(
+            self.network_config, snapshot_path=self.snapshot_path
+        )
+        self.assertNotEqual(rebuilt.name, "stale")
+        header = Network.read_snapshot_header(self.snapshot_path)
+        self.assertEqual(header["hash"], Network.snapshot_hash(self.network_config))
+
+    def test_truncated_snapshot_is_rebuilt(self):
+        Network.compile_snapshot(self.network_config, snapshot_path=self.snapshot_path)
+        # valid header, cut-off body
+        with open(self.snapshot_path, "r+b") as f:
+            f.truncate(os.path.getsize(self.snapshot_path) // 2)
+
+        rebuilt = Network.load_snapshot(
+            self.network_config, snapshot_path=self.snapshot_path
+        )
+        self.assertEqual(len(rebuilt.get_hosts()), 15)
+        self.assertListEqual(os.listdir(self.tmpdir.name), ["15-host.snapshot"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ from cyberwheel.detectors.detector import PerfectDetector
 from blueagents.observation import TestObservation
 from cyberwheel.network.network_base import Network
 from cyberwheel.network.service import Service
-from cyberwheel.red_actions.art_techniques import NetworkServiceDiscovery
+from cyberwheel.red_actions.technique_catalog import technique_mapping
 from cyberwheel.red_actions.actions.port_scan import PortScan
 from cyberwheel.red_actions.actions.ping_sweep import PingSweep
 
@@ -33,7 +33,7 @@ class TestPipeline(unittest.TestCase):
         self.assertListEqual(list(obs_vector), [0, 1, 1, 1])
 
     def test_pipeline_with_technique(self):
-        technique = NetworkServiceDiscovery()
+        technique = technique_mapping["T1046"]  # Network Service Discovery
         target_service = Service(
             "8080", "3.4.25", "IPFilter", vulnerabilities=["CVE-2002-0515"]
         )  # Port is made up, but the vulnerability is real
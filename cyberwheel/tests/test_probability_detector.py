@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from importlib.resources import files
+
+import yaml
+
+from cyberwheel.cyberwheel_envs.cyberwheel_dynamic import DynamicCyberwheel
+from cyberwheel.detectors.alert import Alert
+from cyberwheel.detectors.detectors.probability_detector import ProbabilityDetector
+from cyberwheel.network.host import Host
+
+
+class TestProbabilityDetector(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.src = Host("src", None, None)
+        self.dsts = [Host(f"dst{i}", None, None) for i in range(4)]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def detector(self, probabilities, seed=0):
+        path = os.path.join(self.tmpdir.name, "detector.yaml")
+        with open(path, "w") as f:
+            yaml.safe_dump(probabilities, f)
+        return ProbabilityDetector(path, seed=seed)
+
+    def test_certain_and_unknown_techniques(self):
+        detector = self.detector({"T1046": 1.0, "T1003": 0.0})
+        alerts = [
+            Alert(self.src, techniques=["T1046"], dst_hosts=self.dsts[:2]),
+            Alert(self.src, techniques=["T1003"], dst_hosts=self.dsts[2:3]),
+            Alert(self.src, techniques=["T9999"], dst_hosts=self.dsts[3:]),
+        ]
+        result = detector.obs(alerts)
+        self.assertListEqual([a.dst_hosts for a in result], [[self.dsts[0]], [self.dsts[1]]])
+
+    def test_any_technique_detects(self):
+        detector = self.detector({"T1": 0.5, "T2": 0.5}, seed=1)
+        alerts = [Alert(self.src, techniques=["T1", "T2"], dst_hosts=[d]) for d in self.dsts] * 2500
+        rate = len(detector.obs(alerts)) / len(alerts)
+        self.assertAlmostEqual(rate, 0.75, delta=0.03)
+
+    def test_seeded_draws_repeat(self):
+        alerts = [Alert(self.src, techniques=["T1"], dst_hosts=self.dsts)] * 10
+        first = self.detector({"T1": 0.5}, seed=7).obs(alerts)
+        second = self.detector({"T1": 0.5}, seed=7).obs(alerts)
+        self.assertListEqual(first, second)
+
+    def test_empty_config(self):
+        self.assertListEqual(self.detector({}).obs([Alert(self.src, techniques=["T1"], dst_hosts=self.dsts)]), [])
+
+
+class TestDeterministicDetections(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.seed_file = os.path.join(self.tmpdir.name, "seed_log.txt")
+        with open(self.seed_file, "w") as f:
+            f.write("\n".join(str(seed) for seed in (11, 22, 33, 44)) + "\n")
+        nids = files("cyberwheel.resources.configs.detector").joinpath("nids.yaml")
+        self.handler_config = os.path.join(self.tmpdir.name, "handler.yaml")
+        with open(self.handler_config, "w") as f:
+            yaml.safe_dump(
+                {
+                    "adjacency_list": [["start", "nids"], ["nids", "end"]],
+                    "init_info": {
+                        "nids": {"module": "probability_detector", "class": "ProbabilityDetector", "config": str(nids)}
+                    },
+                },
+                f,
+            )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_env(self):
+        return DynamicCyberwheel(
+            detector_config=self.handler_config,
+            deterministic=True,
+            seed_file=self.seed_file,
+            num_steps=15,
+        )
+
+    def detector_state(self, env):
+        ((_, detector, _, _),) = env.detector._plan[0]
+        return detector.rng.bit_generator.state
+
+    def run_episodes(self):
+        env = self.make_env()
+        detections = []
+        detector_obs = env.detector.obs
+
+        def obs(perfect_alerts):
+            # red actions don't tag their alerts with techniques, add some the
+            # NIDS config detects with probability ~0.2 and ~0.5
+            perfect_alerts = list(perfect_alerts)
+            for alert in perfect_alerts:
+                alert.add_techniques(["T1018", "T1020"])
+            alerts = detector_obs(perfect_alerts)
+            detections.append([alert.key() for alert in alerts])
+            return alerts
+
+        env.detector.obs = obs
+        for _ in range(2):
+            env.reset()
+            for _ in range(15):
+                env.step(0)
+        return detections
+
+    def test_same_seed_log_same_alerts(self):
+        first = self.run_episodes()
+        self.assertTrue(any(first))
+        self.assertFalse(all(first))
+        self.assertListEqual(first, self.run_episodes())
+
+    def test_reset_seed_seeds_detectors(self):
+        first, second = self.make_env(), self.make_env()
+        # reseeding must not shift the global stream the agents draw from
+        with mock.patch("random.getrandbits", side_effect=AssertionError):
+            first.reset(seed=5)
+            second.reset(seed=5)
+        self.assertEqual(self.detector_state(first), self.detector_state(second))
+        second.reset(seed=6)
+        self.assertNotEqual(self.detector_state(first), self.detector_state(second))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+from cyberwheel.profiling import _NULL_TIMER, TimerRegistry
+
+
+class TestTimerRegistry(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        registry = TimerRegistry(enabled=False)
+        self.assertIs(registry.timer("a"), _NULL_TIMER)
+        self.assertIs(registry.timer("b"), _NULL_TIMER)
+        with registry.timer("a"):
+            pass
+        registry.record("a", 1.0)
+        self.assertDictEqual(registry.drain(), {})
+
+    def test_timer_record_drain_merge(self):
+        registry = TimerRegistry(enabled=True)
+        with registry.timer("step"):
+            pass
+        registry.record("step", 0.5)
+        registry.record("reset", 0.25)
+        samples = registry.drain()
+        self.assertSetEqual(set(samples), {"step", "reset"})
+        self.assertEqual(len(samples["step"]), 2)
+        self.assertGreaterEqual(samples["step"][0], 0.0)
+        self.assertEqual(samples["step"][1], 0.5)
+        self.assertDictEqual(registry.drain(), {})
+
+        registry.record("step", 1.0)
+        registry.merge(samples)
+        self.assertListEqual(registry.samples["step"], [1.0] + samples["step"])
+        self.assertListEqual(registry.samples["reset"], [0.25])
+
+    def test_summary(self):
+        registry = TimerRegistry(enabled=True)
+        for seconds in (0.1, 0.2, 0.3, 0.4):
+            registry.record("step", seconds)
+        registry.samples["empty"]
+        summary = registry.summary()
+        self.assertSetEqual(set(summary), {"step"})
+        self.assertEqual(summary["step"]["count"], 4)
+        self.assertAlmostEqual(summary["step"]["total"], 1.0)
+        self.assertAlmostEqual(summary["step"]["mean"], 0.25)
+        self.assertAlmostEqual(summary["step"]["p95"], 0.385)
+
+    def test_write_emits_tags_and_clears(self):
+        registry = TimerRegistry(enabled=True)
+        registry.record("step", 0.001)
+        registry.record("step", 0.003)
+        writer = mock.Mock()
+        registry.write(writer, 10)
+
+        scalars = {c.args[0]: (c.args[1], c.args[2]) for c in writer.add_scalar.call_args_list}
+        self.assertSetEqual(
+            set(scalars),
+            {"profile/step/calls", "profile/step/mean_ms", "profile/step/total_ms", "profile/step/p95_ms"},
+        )
+        self.assertEqual(scalars["profile/step/calls"], (2, 10))
+        self.assertAlmostEqual(scalars["profile/step/mean_ms"][0], 2.0)
+        self.assertAlmostEqual(scalars["profile/step/total_ms"][0], 4.0)
+        self.assertAlmostEqual(scalars["profile/step/p95_ms"][0], 2.9)
+        writer.add_histogram.assert_called_once()
+        self.assertEqual(writer.add_histogram.call_args.args[0], "profile/step")
+        self.assertDictEqual(registry.drain(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
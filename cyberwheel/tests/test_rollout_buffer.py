@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+import torch
+
+from cyberwheel.rollout_buffer import RolloutBuffer
+
+
+class TestRolloutBuffer(unittest.TestCase):
+    def test_rollout_and_done_carry_over(self):
+        rollout = RolloutBuffer(2, 3, (4,), ())
+        env_obs = np.zeros((3, 4), dtype=np.float32)
+        rollout.start(env_obs)
+        for step in range(2):
+            rollout.add_policy(step, torch.ones(3), torch.zeros(3), torch.full((3, 1), step))
+            # vector envs reuse their output arrays between steps
+            env_obs[:] = step + 1
+            rollout.add_env(step, env_obs, np.arange(3, dtype=np.float64), np.array([False, step == 1, False]))
+        rollout.finish()
+
+        self.assertTrue(torch.equal(rollout.obs[:, 0, 0], torch.tensor([0.0, 1.0, 2.0])))
+        self.assertTrue(torch.equal(rollout.rewards[1], torch.tensor([0.0, 1.0, 2.0])))
+        self.assertTrue(torch.equal(rollout.values[:, 0], torch.tensor([0.0, 1.0])))
+        self.assertTrue(torch.equal(rollout.dones[-1], torch.tensor([0.0, 1.0, 0.0])))
+
+        rollout.start(np.zeros((3, 4), dtype=np.float32))
+        self.assertTrue(torch.equal(rollout.dones[0], torch.tensor([0.0, 1.0, 0.0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
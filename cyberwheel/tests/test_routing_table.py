@@ -0,0 +1,44 @@
+import ipaddress as ipa
+import unittest
+
+from cyberwheel.network.network_object import NetworkObject, Route, RoutingTable
+
+
+def route(dest: str, via: str) -> Route:
+    return Route(dest=ipa.ip_network(dest), via=ipa.ip_address(via))
+
+
+class TestRoutingTable(unittest.TestCase):
+    def setUp(self):
+        self.table = RoutingTable(
+            [
+                route("10.0.0.0/8", "192.168.0.1"),
+                route("10.1.0.0/16", "192.168.0.2"),
+                route("10.1.2.0/24", "192.168.0.3"),
+                route("fd00::/8", "fe80::1"),
+            ]
+        )
+
+    def test_longest_prefix_wins(self):
+        self.assertEqual(self.table.lookup(ipa.ip_address("10.1.2.3")).via, ipa.ip_address("192.168.0.3"))
+        self.assertEqual(self.table.lookup(ipa.ip_address("10.1.9.3")).via, ipa.ip_address("192.168.0.2"))
+        self.assertEqual(self.table.lookup(ipa.ip_address("10.9.9.9")).via, ipa.ip_address("192.168.0.1"))
+        self.assertEqual(self.table.lookup(ipa.ip_address("fd12::1")).via, ipa.ip_address("fe80::1"))
+        self.assertIsNone(self.table.lookup(ipa.ip_address("172.16.0.1")))
+
+    def test_duplicates_are_ignored(self):
+        self.table.add_route(route("10.0.0.0/8", "192.168.0.1"))
+        self.assertEqual(len(self.table), 4)
+
+    def test_network_object_falls_back_to_default_route(self):
+        obj = NetworkObject("router")
+        obj.default_route = route("0.0.0.0/0", "10.0.0.254")
+        obj.add_routes_from_dict([{"dest": "192.168.1.0/24", "via": "10.0.0.1"}])
+        self.assertEqual(obj.get_nexthop_from_routes(ipa.ip_address("192.168.1.7")), ipa.ip_address("10.0.0.1"))
+        self.assertEqual(obj.get_nexthop_from_routes(ipa.ip_address("8.8.8.8")), ipa.ip_address("10.0.0.254"))
+        self.assertEqual(len(obj.get_routes()), 2)
+        self.assertEqual(len(obj.routes), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
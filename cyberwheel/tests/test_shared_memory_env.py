@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from cyberwheel.cyberwheel_envs.cyberwheel_shared import SharedMemoryDynamicCyberwheel
+
+
+class TestSharedMemoryEnv(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.envs = SharedMemoryDynamicCyberwheel(
+            2,
+            num_steps=3,
+            deterministic=False,
+            seed_file=os.path.join(self.tmpdir.name, "seed_log.txt"),
+        )
+
+    def tearDown(self):
+        self.envs.close()
+        self.tmpdir.cleanup()
+
+    def test_step_and_autoreset(self):
+        obs, infos = self.envs.reset(seed=0)
+        self.assertEqual(obs.shape, (2,) + self.envs.single_observation_space.shape)
+        self.assertDictEqual(infos, {})
+
+        # an episode is done on the step after current_step reaches num_steps
+        for _ in range(4):
+            obs, rewards, terminateds, truncateds, infos = self.envs.step(np.zeros(2, dtype=np.int64))
+        self.assertEqual(rewards.shape, (2,))
+        self.assertTrue(np.all(terminateds | truncateds))
+        self.assertTrue(np.all(infos["_final_observation"]))
+        # the shared rows already hold the observations after the autoreset
+        final = np.stack(infos["final_observation"])
+        self.assertEqual(final.shape, obs.shape)
+        self.assertTrue(np.all(obs[:, obs.shape[1] // 2 :] == 0))
+
+    def test_call(self):
+        self.assertTupleEqual(self.envs.call("max_steps"), (3, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
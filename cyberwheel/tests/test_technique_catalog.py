@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from cyberwheel.red_actions.technique import Technique
+from cyberwheel.red_actions.technique_catalog import TechniqueCatalog
+
+
+class TestTechniqueCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmpdir.name, "art_techniques.snapshot")
+        self.catalog = TechniqueCatalog(index_path=self.index_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_builds_and_reuses_index(self):
+        self.assertIn("T1046", self.catalog)
+        self.assertTrue(os.path.exists(self.index_path))
+        mtime = os.path.getmtime(self.index_path)
+
+        catalog = TechniqueCatalog(index_path=self.index_path)
+        self.assertEqual(list(catalog), list(self.catalog))
+        self.assertEqual(os.path.getmtime(self.index_path), mtime)
+
+    def test_recompiling_keeps_mapped_readers_valid(self):
+        self.assertIn("T1046", self.catalog)
+        TechniqueCatalog(index_path=self.index_path).compile_index()
+        # the first catalog still reads the index file it mapped
+        self.assertEqual(self.catalog["T1018"].mitre_id, "T1018")
+        self.assertListEqual(os.listdir(self.tmpdir.name), ["art_techniques.snapshot"])
+
+    def test_techniques_are_lazy_and_cached(self):
+        self.assertNotIn("T1046", self.catalog._techniques)
+        technique = self.catalog["T1046"]
+        self.assertIsInstance(technique, Technique)
+        self.assertEqual(technique.mitre_id, "T1046")
+        self.assertEqual(technique.name, "Network Service Discovery")
+        self.assertTrue(technique.atomic_tests)
+        self.assertIs(technique, self.catalog["T1046"])
+        self.assertEqual(list(self.catalog._techniques), ["T1046"])
+
+    def test_cve_lists_are_frozensets(self):
+        cves = self.catalog.cve_list("T1046")
+        self.assertIsInstance(cves, frozenset)
+        self.assertIs(cves, self.catalog["T1046"].cve_list)
+
+    def test_atomic_tests_by_os(self):
+        technique = self.catalog["T1018"]
+        for os in ("windows", "linux", "macos"):
+            tests = technique.get_atomic_tests(os)
+            self.assertIs(tests, technique.get_atomic_tests(os))
+            self.assertEqual(
+                list(tests),
+                [at for at in technique.atomic_tests if os in at.supported_platforms],
+            )
+        self.assertEqual(technique.get_atomic_tests("plan9"), ())
+
+        test = technique.get_atomic_tests("windows")[0]
+        expected = []
+        for dep in test.dependencies:
+            expected += dep.get_prerequisite_command + dep.prerequisite_command
+        expected += test.executor.command + test.executor.cleanup_command
+        self.assertEqual(list(test.commands), expected)
+
+    def test_missing_technique(self):
+        with self.assertRaises(KeyError):
+            self.catalog["T0000"]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from importlib.resources import files
+
+from cyberwheel.network.network_base import Network
+from cyberwheel.red_actions.technique_catalog import technique_mapping
+from cyberwheel.red_agents.technique_validity import (
+    DEFAULT_KILLCHAIN,
+    TechniqueValidityIndex,
+)
+
+
+class TestTechniqueValidityIndex(unittest.TestCase):
+    def setUp(self):
+        self.network = Network.create_network_from_yaml(
+            files("cyberwheel.resources.configs.network").joinpath("15-host-network.yaml")
+        )
+        self.index = TechniqueValidityIndex()
+
+    def test_matches_cve_intersection(self):
+        for host in self.network.get_all_hosts():
+            valid = self.index.valid_techniques(host)
+            for kcp in DEFAULT_KILLCHAIN:
+                expected = [
+                    mid
+                    for mid in kcp.validity_mapping[host.os][kcp.get_name()]
+                    if host.host_type.cve_list
+                    & technique_mapping[mid].cve_list
+                ]
+                self.assertEqual(valid[kcp], expected)
+                for mid in kcp.validity_mapping[host.os][kcp.get_name()]:
+                    self.assertEqual(
+                        self.index.is_valid(host, kcp, mid), mid in expected
+                    )
+
+    def test_hosts_of_one_type_share_techniques(self):
+        service_map = self.index.service_map(self.network.get_all_hosts())
+        by_type = {}
+        for host in self.network.get_all_hosts():
+            first = by_type.setdefault(host.host_type.name, host.name)
+            for kcp in DEFAULT_KILLCHAIN:
+                self.assertIs(service_map[host.name][kcp], service_map[first][kcp])
+        self.assertLessEqual(len(self.index._techniques), len(by_type))
+
+    def test_index_is_cached(self):
+        self.assertIs(
+            TechniqueValidityIndex.get_index(),
+            TechniqueValidityIndex.get_index(list(DEFAULT_KILLCHAIN)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from cyberwheel.cyberwheel_envs.cyberwheel_dynamic import DynamicCyberwheel
+from cyberwheel.cyberwheel_envs.worker_pool import ForkedWorkerPool
+
+
+class TestForkedWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.pool = ForkedWorkerPool("15-host-network.yaml")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_env(self):
+        return DynamicCyberwheel(
+            network=self.pool.network.fork(),
+            service_mapping=self.pool.service_mapping,
+            num_steps=5,
+            deterministic=False,
+            seed_file=os.path.join(self.tmpdir.name, "seed_log.txt"),
+        )
+
+    def test_service_map_built_once(self):
+        self.assertSetEqual(
+            set(self.pool.service_mapping),
+            {host.name for host in self.pool.network.get_hosts()},
+        )
+
+    def test_async_workers_step(self):
+        envs = self.pool.vector_env([self.make_env] * 2)
+        try:
+            obs, _ = envs.reset(seed=0)
+            obs, rewards, _, _, _ = envs.step(np.zeros(2, dtype=np.int64))
+            self.assertEqual(obs.shape[0], 2)
+            self.assertEqual(rewards.shape, (2,))
+        finally:
+            envs.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,12 @@
 import argparse
+import multiprocessing as mp
+import queue
 import random
 import sys
 import os
 import time
+import traceback
+import warnings
 from distutils.util import strtobool
 from importlib.resources import files
 
@@ -17,11 +21,14 @@ from torch.distributions.categorical import Categorical
 from torch.utils.tensorboard import SummaryWriter
 
 from cyberwheel.cyberwheel_envs.cyberwheel_dynamic import DynamicCyberwheel
-from cyberwheel.network.network_base import Network
-from cyberwheel.red_agents import ARTAgent
+from cyberwheel.cyberwheel_envs.cyberwheel_batched import BatchedDynamicCyberwheel
+from cyberwheel.cyberwheel_envs.cyberwheel_shared import SharedMemoryDynamicCyberwheel
+from cyberwheel.cyberwheel_envs.worker_pool import ForkedWorkerPool
+from cyberwheel.gae import compute_gae
+from cyberwheel.profiling import PROFILER
+from cyberwheel.rollout_buffer import RolloutBuffer
 from cyberwheel.red_agents.strategies import DFSImpact, ServerDowntime
 
-from copy import deepcopy
 
 
 def parse_args():
@@ -36,6 +43,9 @@ def parse_args():
     training_group.add_argument("--seed", type=int, default=1, help="seed of the experiment")
     training_group.add_argument("--torch-not-deterministic", type=lambda x: bool(strtobool(x)), default=False, nargs="?", const=True, help="if toggled, `torch.backends.cudnn.deterministic=False`")
     training_group.add_argument("--device", type=str, default="cpu", help="Choose the device used for optimization. Choose 'cuda', 'cpu', or specify a gpu with 'cuda:0'")
+    training_group.add_argument("--pin-memory", type=lambda x: bool(strtobool(x)), default=False, nargs="?", const=True, help="if toggled, keeps rollout data in page-locked host memory for faster transfers to a CUDA device")
+    training_group.add_argument("--batched-env", type=lambda x: bool(strtobool(x)), default=False, nargs="?", const=True, help="if toggled, steps all environments in one BatchedDynamicCyberwheel over a shared network instead of a gym vector env")
+    training_group.add_argument("--shared-memory-env", type=lambda x: bool(strtobool(x)), default=False, nargs="?", const=True, help="if toggled, runs each environment in a worker process that exchanges step data with the trainer through shared memory")
     training_group.add_argument("--async-env", type=lambda x: bool(strtobool(x)), default=False, nargs="?", const=True, help="if toggled, uses AsyncVectorEnv instead of SyncVectorEnv")
     training_group.add_argument("--track", type=lambda x: bool(strtobool(x)), default=False, nargs="?", const=True, help="if toggled, this experiment will be tracked with Weights and Biases")
     training_group.add_argument("--wandb-project-name", type=str, required = "--track" in sys.argv, help="the wandb's project name")
@@ -44,6 +54,7 @@ def parse_args():
     training_group.add_argument("--num-saves", type=int, default=10, help="the number of model saves and evaluations to run throughout training")
     training_group.add_argument("--num-envs", type=int, default=1, help="the number of parallel game environments")
     training_group.add_argument("--num-steps", type=int, default=100, help="the number of steps to run in each environment per policy rollout")
+    training_group.add_argument("--eval-workers", type=int, default=0, help="number of background processes that evaluate saved checkpoints while training continues. 0 evaluates in the training process")
     training_group.add_argument('--eval-episodes', type=int, default=10, help='Number of evaluation episodes to run')
 
     # Cyberwheel Environment Parameters
@@ -58,6 +69,7 @@ def parse_args():
     env_group.add_argument("--reward-function", help="Which reward function to use. Current options: default | step_detected", type=str, default="default")
     env_group.add_argument("--reward-scaling", help="Variable used to increase rewards", type=float, default=10.0)
     env_group.add_argument("--detector-config", help="Location of detector config file.", type=str, default="detector_handler.yaml")
+    env_group.add_argument("--command-history-size", help="Number of host commands to keep per episode. 0 (default) only counts them, a negative value keeps all of them", type=int, default=0)
 
     # Deterministic Parameters
     env_group.add_argument("--deterministic", type=lambda x: bool(strtobool(x)), default=False, nargs="?", const=True, help="if toggled, the environment will operate in a deterministic mode using predefined seeds.")
@@ -90,13 +102,14 @@ def parse_args():
     return args
 
 
-def evaluate(blue_agent, args):
+def evaluate(blue_agent, args, env=None):
     """Evaluate 'blue_agent' in the 'scenario' task against the 'red_agent' strategy"""
     # We evaluate on CPU because learning is already happening on GPUs.
     # You can evaluate small architectures on CPU, but if you increase the neural network size,
     # you may need to do fewer evaluations at a time on GPU.
     eval_device = torch.device("cpu")
-    env = create_cyberwheel_env(args)
+    if env is None:
+        env = create_cyberwheel_env(args)
     episode_rewards = []
     total_reward = 0
     # Standard evaluation loop to estimate mean episodic return
@@ -114,8 +127,23 @@ def evaluate(blue_agent, args):
     return episodic_return
 
 
+# (env, agent) reused by every evaluation in this process
+_eval_state = None
+
+
+def _warm_evaluator(args):
+    """Returns the evaluation environment and agent of this process, building them on first use"""
+    global _eval_state
+    if _eval_state is None:
+        env = create_cyberwheel_env(args)
+        eval_agent = Agent(gym.vector.SyncVectorEnv([lambda: env]))
+        eval_agent.eval()
+        _eval_state = (env, eval_agent)
+    return _eval_state
+
+
 def run_evals(model, args, globalstep):
-    """Evaluate 'model' on tasks listed in 'eval_queue' in a separate process"""
+    """Evaluate the checkpoint 'model' with this process's warm environment and agent"""
     # TRY NOT TO MODIFY: seeding
     eval_device = torch.device("cpu")
 
@@ -125,15 +153,12 @@ def run_evals(model, args, globalstep):
     # torch.manual_seed(args.seed)
     # torch.backends.cudnn.deterministic = args.torch_not_deterministic
 
-    env_funcs = [make_env(i, args) for i in range(1)]
-
     # Load the agent
-    sample_env = gym.vector.SyncVectorEnv(env_funcs)
-    eval_agent = Agent(sample_env)
+    env, eval_agent = _warm_evaluator(args)
     eval_agent.load_state_dict(torch.load(model, map_location=eval_device))
-    eval_agent.eval()
     # Evaluate the agent
-    result = evaluate(eval_agent, args)
+    with torch.no_grad():
+        result = evaluate(eval_agent, args, env)
     # Store evaluation parameters and results
     return (
         args.network_config,
@@ -148,9 +173,151 @@ def run_evals(model, args, globalstep):
     )
 
 
-def create_cyberwheel_env(args):
-    """Creates a DynamicCyberwheel environment"""
-    env = DynamicCyberwheel(
+def log_eval_results(writer, eval_results, eval_time):
+    """Writes the results returned by run_evals to the SummaryWriter"""
+    (
+        eval_network_config,
+        eval_decoy_config,
+        eval_min_decoys,
+        eval_max_decoys,
+        eval_reward_scaling,
+        eval_reward_function,
+        eval_red_agent,
+        eval_return,
+        eval_step,
+    ) = eval_results
+    writer.add_scalar(
+        f"evaluation/{eval_network_config.split('.')[0]}_{eval_decoy_config}_{eval_reward_scaling}|{eval_min_decoys}-{eval_max_decoys}_{eval_reward_function}reward__{eval_red_agent}_episodic_return",
+        eval_return,
+        eval_step,
+    )
+    writer.add_scalar("charts/eval_time", int(eval_time), eval_step)
+
+
+def _eval_worker(index, args, checkpoints, results):
+    """Evaluates (checkpoint, global step) pairs from checkpoints until it receives None"""
+    # leave the cores to the training process and the environment workers
+    torch.set_num_threads(1)
+    for model, globalstep in iter(checkpoints.get, None):
+        start_eval = time.time()
+        try:
+            results.put((index, run_evals(model, args, globalstep), time.time() - start_eval))
+        except Exception:
+            results.put((index, None, traceback.format_exc()))
+
+
+class BackgroundEvaluator:
+    """
+    Evaluates saved checkpoints in worker processes while training continues.
+
+    Each worker takes checkpoint paths from its own queue and keeps one
+    environment and agent warm across evaluations, only loading the new
+    weights. Results are collected with poll() and written to the
+    SummaryWriter by the trainer. Failed evaluations and workers that die are
+    reported as warnings so they never stop training.
+    """
+
+    # seconds between liveness checks while waiting for results
+    poll_interval = 1.0
+
+    def __init__(self, args, num_workers: int, context: str | None = None):
+        """
+        :param args: training arguments, including the prebuilt network
+        :param int num_workers: number of evaluation processes
+        :param str context: multiprocessing start method
+        """
+        ctx = mp.get_context(context)
+        self.checkpoints = [ctx.SimpleQueue() for _ in range(num_workers)]
+        self.results = ctx.Queue()
+        # evaluations submitted to each worker that haven't returned yet
+        self.pending = [0] * num_workers
+        self.workers = [
+            ctx.Process(
+                target=_eval_worker,
+                args=(i, args, self.checkpoints[i], self.results),
+                daemon=True,
+            )
+            for i in range(num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, model, globalstep: int) -> None:
+        self._drop_dead_workers()
+        alive = [i for i, worker in enumerate(self.workers) if worker.is_alive()]
+        if not alive:
+            warnings.warn(f"no evaluation workers left, skipping evaluation of {model}")
+            return
+        index = min(alive, key=self.pending.__getitem__)
+        self.checkpoints[index].put((str(model), globalstep))
+        self.pending[index] += 1
+
+    def _drop_dead_workers(self) -> None:
+        for i, worker in enumerate(self.workers):
+            if self.pending[i] and not worker.is_alive():
+                warnings.warn(
+                    f"evaluation worker {i} exited with code {worker.exitcode}, "
+                    f"{self.pending[i]} evaluation(s) lost"
+                )
+                self.pending[i] = 0
+
+    def poll(self, block: bool = False, timeout: float | None = None) -> list:
+        """
+        Returns the (results, evaluation time) of finished evaluations.
+
+        :param bool block: wait for every submitted evaluation, or until the
+            workers holding them die
+        :param float timeout: with block, the most seconds to wait
+        """
+        finished = []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while sum(self.pending):
+            try:
+                index, eval_results, eval_time = self.results.get(
+                    block=block, timeout=self.poll_interval
+                )
+            except queue.Empty:
+                # the worker may have finished its last result before dying
+                self._drop_dead_workers()
+                if not block:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    warnings.warn(f"gave up waiting for {sum(self.pending)} evaluation(s)")
+                    break
+                continue
+            # a result can arrive after its worker was dropped as dead
+            self.pending[index] = max(self.pending[index] - 1, 0)
+            if eval_results is None:
+                warnings.warn(f"evaluation failed:\n{eval_time}")
+                continue
+            finished.append((eval_results, eval_time))
+        return finished
+
+    def close(self, timeout: float | None = None) -> list:
+        """
+        Waits for the submitted evaluations, stops the workers and returns the
+        remaining results
+
+        :param float timeout: the most seconds to wait for evaluations
+        """
+        try:
+            finished = self.poll(block=True, timeout=timeout)
+            for checkpoints, worker in zip(self.checkpoints, self.workers):
+                if worker.is_alive():
+                    checkpoints.put(None)
+            for worker in self.workers:
+                worker.join(self.poll_interval)
+        finally:
+            for worker in self.workers:
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+        return finished
+
+
+def cyberwheel_env_kwargs(args):
+    """Keyword arguments shared by every DynamicCyberwheel built from args"""
+    return dict(
         network_config=args.network_config,
         decoy_host_file=args.decoy_config,
         host_def_file=args.host_config,
@@ -162,12 +329,17 @@ def create_cyberwheel_env(args):
         red_agent=args.red_agent,
         blue_config=args.blue_config,
         num_steps=args.num_steps,
-        network=deepcopy(args.network),
         service_mapping=args.service_mapping,
         red_strategy=args.red_strategy,
         deterministic=args.deterministic,
         seed_file=args.seed_file,
+        command_history_size=None if args.command_history_size < 0 else args.command_history_size,
     )
+
+
+def create_cyberwheel_env(args):
+    """Creates a DynamicCyberwheel environment"""
+    env = DynamicCyberwheel(network=args.network.fork(), **cyberwheel_env_kwargs(args))
     return env
 
 
@@ -295,23 +467,15 @@ def train_cyberwheel():
     # For large neural networks you may need to use fewer environments.
     # NOTE: For debugging, you can change AsyncVectorEnv to SyncVectorEnv (and reduce num_envs) to get more helpful stack traces.
 
-    # Load network from yaml here
-    network_config = files("cyberwheel.resources.configs.network").joinpath(
-        args.network_config
-    )
-
+    # Build the network and the ART service map once. Workers are forked from
+    # this process and share both copy-on-write.
     print(f"Building network: {args.network_config} ...")
-
-    network = Network.create_network_from_yaml(network_config)
-
     print("Mapping attack validity to hosts...", end=" ")
-    service_mapping = {}
-    if args.red_agent == "art_agent":
-        service_mapping = ARTAgent.get_service_map(network)
+    pool = ForkedWorkerPool(args.network_config, args.red_agent)
     print("done")
 
-    args.network = network
-    args.service_mapping = service_mapping
+    args.network = pool.network
+    args.service_mapping = pool.service_mapping
 
     if args.red_strategy == "dfs_impact":
         args.red_strategy = DFSImpact
@@ -320,50 +484,58 @@ def train_cyberwheel():
 
     print("Defining environment(s) and beginning training:", end="\n\n")
 
-    env_funcs = [make_env(i, args) for i in range(args.num_envs)]
-
-    envs = (
-        gym.vector.AsyncVectorEnv(env_funcs)
-        if args.async_env
-        else gym.vector.SyncVectorEnv(env_funcs)
-    )
+    if args.batched_env:
+        envs = BatchedDynamicCyberwheel(
+            args.num_envs, network=args.network, **cyberwheel_env_kwargs(args)
+        )
+        envs.reset(seed=args.seed)
+    elif args.shared_memory_env:
+        with pool.forking() as context:
+            envs = SharedMemoryDynamicCyberwheel(
+                args.num_envs,
+                network=args.network,
+                context=context,
+                **cyberwheel_env_kwargs(args),
+            )
+        envs.reset(seed=args.seed)
+    else:
+        env_funcs = [make_env(i, args) for i in range(args.num_envs)]
+        envs = pool.vector_env(env_funcs, asynchronous=args.async_env)
 
     assert isinstance(
         envs.single_action_space, spaces.Discrete
     ), "only discrete action space is supported"
 
+    # Start evaluation workers before the trainer uses torch, so they fork a clean process
+    evaluator = None
+    if args.eval_workers > 0:
+        evaluator = BackgroundEvaluator(args, args.eval_workers, context=pool.context)
+
     # Create agent and optimizer
     agent = Agent(envs).to(device)
     optimizer = optim.Adam(agent.parameters(), lr=args.learning_rate, eps=1e-5)
 
     # ALGO Logic: Storage setup
-    obs = torch.zeros(
-        (args.num_steps, args.num_envs) + envs.single_observation_space.shape
-    ).to(device)
-    # print(envs.single_observation_space.shape)
-    actions = torch.zeros(
-        (args.num_steps, args.num_envs) + envs.single_action_space.shape
-    ).to(device)
-    logprobs = torch.zeros((args.num_steps, args.num_envs)).to(device)
-    rewards = torch.zeros((args.num_steps, args.num_envs)).to(device)
-    dones = torch.zeros((args.num_steps, args.num_envs)).to(device)
-    values = torch.zeros((args.num_steps, args.num_envs)).to(device)
-    step_rewards = torch.zeros((args.num_steps, args.num_envs))
+    rollout = RolloutBuffer(
+        args.num_steps,
+        args.num_envs,
+        envs.single_observation_space.shape,
+        envs.single_action_space.shape,
+        device=device,
+        pin_memory=args.pin_memory,
+    )
 
     # TRY NOT TO MODIFY: start the game
 
     global_step = 0
     start_time = time.time()
-    resets = np.array(envs.reset()[0])
-    next_obs = torch.Tensor(resets).to(device)
-    next_done = torch.zeros(args.num_envs).to(device)
+    envs.reset()
     num_updates = args.total_timesteps // args.batch_size
 
     for update in range(1, num_updates + 1):
         # We manually reset the environment for cyberwheel
         # NOTE: When a curriculum is being used, this will automatically change the environment task.
-        resets = np.array(envs.reset()[0])
-        next_obs = torch.Tensor(resets).to(device)
+        rollout.start(envs.reset()[0])
 
         # Annealing the rate if instructed to do so.
         if args.anneal_lr:
@@ -376,25 +548,28 @@ def train_cyberwheel():
         episode_start = time.time_ns()
         for step in range(0, args.num_steps):
             global_step += 1 * args.num_envs
-            obs[step] = next_obs
-            dones[step] = next_done
 
             # ALGO LOGIC: action logic
             # Select an action using the current policy and get a value estimate
-            with torch.no_grad():
-                action, logprob, _, value = agent.get_action_and_value(next_obs)
-                values[step] = value.flatten()
+            with torch.no_grad(), PROFILER.timer("train/policy"):
+                action, logprob, _, value = agent.get_action_and_value(rollout.obs[step])
+            rollout.add_policy(step, action, logprob, value)
 
-            actions[step] = action
-            logprobs[step] = logprob
             # TRY NOT TO MODIFY: execute the game and log data.
             # Execute the selected action in the environment to collect experience for training.
             temp_action = action.cpu().numpy()
-            next_obs, reward, done, _, info = envs.step(temp_action)
-            rewards[step] = torch.tensor(reward).to(device).view(-1)
-            next_obs, next_done = torch.Tensor(next_obs).to(device), torch.Tensor(
-                done
-            ).to(device)
+            with PROFILER.timer("train/env_step"):
+                next_obs, reward, done, _, info = envs.step(temp_action)
+            rollout.add_env(step, next_obs, reward, done)
+        rollout.finish()
+        obs, actions, logprobs, values = (
+            rollout.obs[:-1],
+            rollout.actions,
+            rollout.logprobs,
+            rollout.values,
+        )
+        rewards, dones = rollout.rewards, rollout.dones[:-1]
+        next_obs, next_done = rollout.obs[-1], rollout.dones[-1]
         end_time = time.time_ns()
         episode_time = (end_time - episode_start) / (10**9)
 
@@ -412,22 +587,15 @@ def train_cyberwheel():
         # Calculate advantages used to optimize the policy and returns which are compared to values to optimize the critic.
         with torch.no_grad():
             next_value = agent.get_value(next_obs).reshape(1, -1)
-            advantages = torch.zeros_like(rewards).to(device)
-            lastgaelam = 0
-            for t in reversed(range(args.num_steps)):
-                if t == args.num_steps - 1:
-                    nextnonterminal = 1.0 - next_done
-                    nextvalues = next_value
-                else:
-                    nextnonterminal = 1.0 - dones[t + 1]
-                    nextvalues = values[t + 1]
-                delta = (
-                    rewards[t] + args.gamma * nextvalues * nextnonterminal - values[t]
-                )
-                advantages[t] = lastgaelam = (
-                    delta + args.gamma * args.gae_lambda * nextnonterminal * lastgaelam
-                )
-            returns = advantages + values
+            advantages, returns = compute_gae(
+                rewards,
+                values,
+                dones,
+                next_value,
+                next_done,
+                args.gamma,
+                args.gae_lambda,
+            )
 
         # flatten the batch
         b_obs = obs.reshape((-1,) + envs.single_observation_space.shape)
@@ -536,30 +704,16 @@ def train_cyberwheel():
                 )
 
             # Run evaluation
-            print("Evaluating Agent...")
-
-            eval_results = run_evals(globalstep_path, args, global_step)
-
-            # Log eval results
-            (
-                eval_network_config,
-                eval_decoy_config,
-                eval_min_decoys,
-                eval_max_decoys,
-                eval_reward_scaling,
-                eval_reward_function,
-                eval_red_agent,
-                eval_return,
-                eval_step,
-            ) = eval_results
-            writer.add_scalar(
-                f"evaluation/{eval_network_config.split('.')[0]}_{eval_decoy_config}_{eval_reward_scaling}|{eval_min_decoys}-{eval_max_decoys}_{eval_reward_function}reward__{eval_red_agent}_episodic_return",
-                eval_return,
-                eval_step,
-            )
-            writer.add_scalar(
-                "charts/eval_time", int(time.time() - start_eval), global_step
-            )
+            if evaluator is not None:
+                evaluator.submit(globalstep_path, global_step)
+            else:
+                print("Evaluating Agent...")
+                eval_results = run_evals(globalstep_path, args, global_step)
+                log_eval_results(writer, eval_results, time.time() - start_eval)
+
+        if evaluator is not None:
+            for eval_results, eval_time in evaluator.poll():
+                log_eval_results(writer, eval_results, eval_time)
 
         # TRY NOT TO MODIFY: record rewards for plotting purposes
         writer.add_scalar(
@@ -576,7 +730,15 @@ def train_cyberwheel():
         writer.add_scalar(
             "charts/SPS", int(global_step / (time.time() - start_time)), global_step
         )
-
+        if PROFILER.enabled:
+            # collect timings recorded inside (possibly subprocess) envs
+            for samples in envs.call("drain_profile"):
+                PROFILER.merge(samples)
+            PROFILER.write(writer, global_step)
+
+    if evaluator is not None:
+        for eval_results, eval_time in evaluator.close():
+            log_eval_results(writer, eval_results, eval_time)
     envs.close()
     writer.close()
 